@@ -0,0 +1,37 @@
+"""Add trigram index on project names
+
+Revision ID: a3d6b8e2f519
+Revises: f7c3e1a94b20
+Create Date: 2026-10-19 18:20:47.301845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d6b8e2f519'
+down_revision: Union[str, Sequence[str], None] = 'f7c3e1a94b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # pg_trgm ships with the contrib package. Without it the name search still works,
+    # it just filters the caller's projects without an index.
+    available = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar()
+    if not available:
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_projects_name_trgm', 'projects', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade():
+    # The extension is left installed, other objects may depend on it.
+    op.execute("DROP INDEX IF EXISTS ix_projects_name_trgm")
@@ -0,0 +1,27 @@
+"""Add prefix index on usernames
+
+Revision ID: b7e1c4d9a2f6
+Revises: a3d6b8e2f519
+Create Date: 2026-10-19 18:51:12.664203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1c4d9a2f6'
+down_revision: Union[str, Sequence[str], None] = 'a3d6b8e2f519'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # text_pattern_ops lets LIKE 'prefix%' use the index whatever the database collation.
+    op.create_index('ix_users_username_prefix', 'users', [sa.text('lower(username) text_pattern_ops')])
+
+
+def downgrade():
+    op.drop_index('ix_users_username_prefix', table_name='users')
@@ -0,0 +1,30 @@
+"""Build the username prefix index in the C collation
+
+Revision ID: c2e8f4a6b1d3
+Revises: f3c8a1e5b972
+Create Date: 2026-10-20 09:12:47.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f4a6b1d3'
+down_revision: Union[str, Sequence[str], None] = 'f3c8a1e5b972'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # A text_pattern_ops index serves LIKE 'prefix%' but cannot return rows in ORDER BY order.
+    # In the C collation one plain index does both, whatever the database collation.
+    op.drop_index('ix_users_username_prefix', table_name='users')
+    op.create_index('ix_users_username_prefix', 'users', [sa.text('lower(username) COLLATE "C"')])
+
+
+def downgrade():
+    op.drop_index('ix_users_username_prefix', table_name='users')
+    op.create_index('ix_users_username_prefix', 'users', [sa.text('lower(username) text_pattern_ops')])
@@ -0,0 +1,26 @@
+"""Widen documents.file_type to fit full MIME types
+
+Revision ID: c41f7a2d9e10
+Revises: aed117a75179
+Create Date: 2026-10-19 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a2d9e10'
+down_revision: Union[str, Sequence[str], None] = 'aed117a75179'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.alter_column('documents', 'file_type', type_=sa.String(length=64), existing_nullable=False)
+
+
+def downgrade():
+    op.alter_column('documents', 'file_type', type_=sa.String(length=16), existing_nullable=False)
@@ -0,0 +1,29 @@
+"""Index documents and memberships by project
+
+Revision ID: c9f2d5a7e384
+Revises: b7e1c4d9a2f6
+Create Date: 2026-10-19 19:24:36.907412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f2d5a7e384'
+down_revision: Union[str, Sequence[str], None] = 'b7e1c4d9a2f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # The user_project primary key starts with user_id, so neither lookup by project was indexed.
+    op.create_index('ix_documents_project_id', 'documents', ['project_id'])
+    op.create_index('ix_user_project_project_id', 'user_project', ['project_id'])
+
+
+def downgrade():
+    op.drop_index('ix_user_project_project_id', table_name='user_project')
+    op.drop_index('ix_documents_project_id', table_name='documents')
@@ -0,0 +1,48 @@
+"""Create project stats table
+
+Revision ID: d4a8e6f1b273
+Revises: c9f2d5a7e384
+Create Date: 2026-10-19 20:02:15.448130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8e6f1b273'
+down_revision: Union[str, Sequence[str], None] = 'c9f2d5a7e384'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'project_stats',
+        sa.Column('project_id', sa.Integer, sa.ForeignKey('projects.id', ondelete="CASCADE"), primary_key=True),
+        sa.Column('document_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('member_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('total_bytes', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('last_activity_at', sa.TIMESTAMP, nullable=True),
+    )
+    # Backfill the counters of existing projects.
+    op.execute("""
+        INSERT INTO project_stats (project_id, document_count, member_count, total_bytes, last_activity_at)
+        SELECT p.id, coalesce(d.document_count, 0), coalesce(m.member_count, 0), coalesce(d.total_bytes, 0),
+               greatest(d.last_upload_at, m.last_joined_at)
+        FROM projects p
+        LEFT JOIN (
+            SELECT project_id, count(*) AS document_count, sum(size) AS total_bytes, max(created_at) AS last_upload_at
+            FROM documents GROUP BY project_id
+        ) d ON d.project_id = p.id
+        LEFT JOIN (
+            SELECT project_id, count(*) AS member_count, max(created_at) AS last_joined_at
+            FROM user_project GROUP BY project_id
+        ) m ON m.project_id = p.id
+    """)
+
+
+def downgrade():
+    op.drop_table('project_stats')
@@ -0,0 +1,45 @@
+"""Create upload sessions and upload chunks tables
+
+Revision ID: d8b25e61f3a7
+Revises: c41f7a2d9e10
+Create Date: 2026-10-19 13:40:02.771934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b25e61f3a7'
+down_revision: Union[str, Sequence[str], None] = 'c41f7a2d9e10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.String(length=32), primary_key=True),
+        sa.Column('project_id', sa.Integer, sa.ForeignKey('projects.id', ondelete="CASCADE"), nullable=False),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id', ondelete="CASCADE"), nullable=False),
+        sa.Column('filename', sa.String(length=128), nullable=False),
+        sa.Column('content_type', sa.String(length=64), nullable=False),
+        sa.Column('length', sa.BigInteger, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, server_default=sa.func.now()),
+        sa.Column('expires_at', sa.TIMESTAMP, nullable=False),
+    )
+    op.create_index('ix_upload_sessions_expires_at', 'upload_sessions', ['expires_at'])
+    op.create_table(
+        'upload_chunks',
+        sa.Column('session_id', sa.String(length=32), sa.ForeignKey('upload_sessions.id', ondelete="CASCADE"), primary_key=True),
+        sa.Column('offset', sa.BigInteger, primary_key=True),
+        sa.Column('size', sa.BigInteger, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('upload_chunks')
+    op.drop_index('ix_upload_sessions_expires_at', table_name='upload_sessions')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,57 @@
+"""Create document versions tables
+
+Revision ID: e2b7f9c1d468
+Revises: d4a8e6f1b273
+Create Date: 2026-10-19 21:14:37.602915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f9c1d468'
+down_revision: Union[str, Sequence[str], None] = 'd4a8e6f1b273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('documents', sa.Column('version', sa.Integer, nullable=False, server_default='1'))
+    op.create_table(
+        'blobs',
+        sa.Column('hash', sa.String(64), primary_key=True),
+        sa.Column('size', sa.Integer, nullable=False),
+        sa.Column('content_encoding', sa.String(16), nullable=True),
+        sa.Column('referenced_at', sa.TIMESTAMP, server_default=sa.func.now()),
+    )
+    op.create_table(
+        'document_versions',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('document_id', sa.Integer, sa.ForeignKey('documents.id', ondelete="CASCADE"), nullable=False),
+        sa.Column('version', sa.Integer, nullable=False),
+        sa.Column('filename', sa.String(128), nullable=False),
+        sa.Column('file_type', sa.String(64), nullable=False),
+        sa.Column('size', sa.BigInteger, nullable=False),
+        sa.Column('sha256', sa.String(64), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, server_default=sa.func.now()),
+        sa.UniqueConstraint('document_id', 'version', name='uq_document_versions_document_id_version'),
+    )
+    op.create_table(
+        'document_version_blocks',
+        sa.Column('version_id', sa.Integer, sa.ForeignKey('document_versions.id', ondelete="CASCADE"), primary_key=True),
+        sa.Column('position', sa.Integer, primary_key=True),
+        sa.Column('blob_hash', sa.String(64), sa.ForeignKey('blobs.hash'), nullable=False),
+    )
+    # Garbage collection looks blobs up by hash to find unreferenced ones.
+    op.create_index('ix_document_version_blocks_blob_hash', 'document_version_blocks', ['blob_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_document_version_blocks_blob_hash', table_name='document_version_blocks')
+    op.drop_table('document_version_blocks')
+    op.drop_table('document_versions')
+    op.drop_table('blobs')
+    op.drop_column('documents', 'version')
@@ -0,0 +1,29 @@
+"""Add content encoding and size to documents
+
+Revision ID: e5a90c4b7d21
+Revises: d8b25e61f3a7
+Create Date: 2026-10-19 15:05:31.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a90c4b7d21'
+down_revision: Union[str, Sequence[str], None] = 'd8b25e61f3a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Existing rows keep NULL: stored uncompressed, size read from the file.
+    op.add_column('documents', sa.Column('content_encoding', sa.String(length=16), nullable=True))
+    op.add_column('documents', sa.Column('size', sa.BigInteger, nullable=True))
+
+
+def downgrade():
+    op.drop_column('documents', 'size')
+    op.drop_column('documents', 'content_encoding')
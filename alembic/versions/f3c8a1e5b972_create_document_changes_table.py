@@ -0,0 +1,41 @@
+"""Create document changes table
+
+Revision ID: f3c8a1e5b972
+Revises: e2b7f9c1d468
+Create Date: 2026-10-19 22:31:08.274519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a1e5b972'
+down_revision: Union[str, Sequence[str], None] = 'e2b7f9c1d468'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('project_stats', sa.Column('change_seq', sa.BigInteger, nullable=False, server_default='0'))
+    op.create_table(
+        'document_changes',
+        sa.Column('project_id', sa.Integer, sa.ForeignKey('projects.id', ondelete="CASCADE"), primary_key=True),
+        sa.Column('seq', sa.BigInteger, primary_key=True),
+        sa.Column('document_id', sa.Integer, nullable=False),
+        sa.Column('action', sa.String(length=16), nullable=False),
+        sa.Column('filename', sa.String(128), nullable=False),
+        sa.Column('version', sa.Integer, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, server_default=sa.func.now()),
+        sa.CheckConstraint("action IN ('created', 'updated', 'deleted')", name='ck_document_changes_action'),
+    )
+    # Used by the retention job.
+    op.create_index('ix_document_changes_created_at', 'document_changes', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_document_changes_created_at', table_name='document_changes')
+    op.drop_table('document_changes')
+    op.drop_column('project_stats', 'change_seq')
@@ -0,0 +1,34 @@
+"""Add full-text search vector to documents
+
+Revision ID: f7c3e1a94b20
+Revises: e5a90c4b7d21
+Create Date: 2026-10-19 17:42:08.512930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3e1a94b20'
+down_revision: Union[str, Sequence[str], None] = 'e5a90c4b7d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # indexed_at stays NULL until the indexing job has processed the document.
+    op.add_column('documents', sa.Column('search_vector', postgresql.TSVECTOR, nullable=True))
+    op.add_column('documents', sa.Column('indexed_at', sa.TIMESTAMP, nullable=True))
+    op.create_index('ix_documents_search_vector', 'documents', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_documents_pending_index', 'documents', ['id'], postgresql_where=sa.text('indexed_at IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_documents_pending_index', table_name='documents')
+    op.drop_index('ix_documents_search_vector', table_name='documents')
+    op.drop_column('documents', 'indexed_at')
+    op.drop_column('documents', 'search_vector')
@@ -0,0 +1,218 @@
+import os
+import tarfile
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import IO, Iterable, Iterator, Optional, Tuple
+from compression import read_chunks
+
+ARCHIVE_FORMATS = {
+    # (format, compression) -> (media type, file extension)
+    ("zip", "stored"): ("application/zip", "zip"),
+    ("zip", "deflate"): ("application/zip", "zip"),
+    ("tar", "stored"): ("application/x-tar", "tar"),
+    ("tar", "deflate"): ("application/gzip", "tar.gz"),
+}
+
+# Limits on what an imported archive may expand to, 0 disables the entry and size limits.
+# Project exports can hold tens of thousands of files, so the number of entries is not limited
+# by default: the size and ratio limits are what stop archive bombs.
+# The ratio is taken over the whole archive; the slack lets small archives of repetitive text in.
+MAX_IMPORT_ENTRIES = int(os.getenv("MAX_IMPORT_ENTRIES", "0"))
+MAX_IMPORT_SIZE = int(os.getenv("MAX_IMPORT_SIZE", str(10 * 1024 ** 3)))
+MAX_IMPORT_RATIO = float(os.getenv("MAX_IMPORT_RATIO", "100"))
+IMPORT_RATIO_SLACK = 1024 * 1024
+
+
+@dataclass
+class ArchiveEntry:
+    name: str
+    path: str
+    modified_at: datetime | None = None
+    # Set for files compressed at rest; size is then the original size.
+    encoding: Optional[str] = None
+    size: Optional[int] = None
+
+    def get_size(self) -> int:
+        """Size of the original content; raises FileNotFoundError when the file is gone."""
+        stored_size = os.path.getsize(self.path)
+        if self.encoding is None:
+            return stored_size
+        if self.size is not None:
+            return self.size
+        return sum(len(chunk) for chunk in read_chunks(self.path, self.encoding))
+
+
+class _StreamBuffer:
+    """
+    Write-only, non-seekable sink. zipfile detects the missing `tell`/`seek` and
+    switches to data descriptors, so nothing is ever rewritten.
+    """
+
+    def __init__(self) -> None:
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_archive(entries: Iterable[ArchiveEntry], format: str = "zip", compression: str = "stored") -> Iterator[bytes]:
+    """Yield an archive of the given files chunk by chunk, holding at most one chunk in memory."""
+    chunks = _stream_zip(entries, compression) if format == "zip" else _stream_tar(entries, compression)
+    return (chunk for chunk in chunks if chunk)
+
+
+def _read_chunks(entry: ArchiveEntry, size: int | None = None) -> Iterator[bytes]:
+    """Read an entry in chunks; with `size` exactly that many bytes are produced, zero padded if the file shrank."""
+    remaining = size
+    for chunk in read_chunks(entry.path, entry.encoding):
+        if remaining is not None:
+            chunk = chunk[:remaining]
+            remaining -= len(chunk)
+        if chunk:
+            yield chunk
+        if remaining == 0:
+            break
+    if remaining:
+        yield bytes(remaining)
+
+
+def _stream_zip(entries: Iterable[ArchiveEntry], compression: str) -> Iterator[bytes]:
+    buffer = _StreamBuffer()
+    compress_type = zipfile.ZIP_DEFLATED if compression == "deflate" else zipfile.ZIP_STORED
+
+    with zipfile.ZipFile(buffer, mode="w", compression=compress_type, allowZip64=True) as archive:
+        for entry in entries:
+            try:
+                size = entry.get_size()
+            except FileNotFoundError:
+                continue
+            modified_at = entry.modified_at or datetime.now()
+            info = zipfile.ZipInfo(entry.name, date_time=modified_at.timetuple()[:6])
+            info.compress_type = compress_type
+            # Lets zipfile pick ZIP64 headers up front for files close to 4 GiB.
+            info.file_size = size
+            with archive.open(info, mode="w") as target:
+                for chunk in _read_chunks(entry):
+                    target.write(chunk)
+                    yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _stream_tar(entries: Iterable[ArchiveEntry], compression: str) -> Iterator[bytes]:
+    # gzip framing around the whole tar stream, the same as `tar czf`
+    compressor = zlib.compressobj(wbits=31) if compression == "deflate" else None
+
+    def encode(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    written = 0
+    for entry in entries:
+        try:
+            size = entry.get_size()
+        except FileNotFoundError:
+            continue
+        info = tarfile.TarInfo(entry.name)
+        info.size = size
+        info.mode = 0o644
+        info.mtime = entry.modified_at.timestamp() if entry.modified_at else time.time()
+        # PAX headers carry sizes beyond 8 GiB and non-ASCII names.
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        written += len(header)
+        yield encode(header)
+
+        # The header already promised `size` bytes.
+        for chunk in _read_chunks(entry, size):
+            written += len(chunk)
+            yield encode(chunk)
+        padding = -size % tarfile.BLOCKSIZE
+        written += padding
+        yield encode(tarfile.NUL * padding)
+
+    # End-of-archive marker, padded to a full record like tarfile does.
+    trailer = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+    written += len(trailer)
+    trailer += tarfile.NUL * (-written % tarfile.RECORDSIZE)
+    yield encode(trailer)
+    if compressor:
+        yield compressor.flush()
+
+
+def iter_archive(fileobj: IO[bytes]) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Yield (name, file object) for every regular file of a zip or (optionally compressed) tar.
+    Each file object is only readable until the next item is requested. ValueError is raised
+    once the archive has too many files or expands beyond the import limits.
+    """
+    limit = _ExpansionLimit(fileobj.seek(0, os.SEEK_END))
+    for name, source in _iter_members(fileobj):
+        yield name, limit.open(source)
+
+
+def _iter_members(fileobj: IO[bytes]) -> Iterator[Tuple[str, IO[bytes]]]:
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as source:
+                    yield info.filename, source
+        return
+
+    fileobj.seek(0)
+    try:
+        # Stream mode decompresses sequentially instead of seeking around the upload.
+        archive = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.ReadError as e:
+        raise ValueError("Not a zip or tar archive") from e
+    with archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, archive.extractfile(member)
+
+
+class _ExpansionLimit:
+    """Counts the files and bytes read out of one archive; sizes in headers are not trusted."""
+
+    def __init__(self, archive_size: int) -> None:
+        max_sizes = [MAX_IMPORT_RATIO * archive_size + IMPORT_RATIO_SLACK]
+        if MAX_IMPORT_SIZE:
+            max_sizes.append(MAX_IMPORT_SIZE)
+        self.max_size = min(max_sizes)
+        self.size = 0
+        self.entries = 0
+
+    def open(self, source: IO[bytes]) -> "_LimitedReader":
+        self.entries += 1
+        if MAX_IMPORT_ENTRIES and self.entries > MAX_IMPORT_ENTRIES:
+            raise ValueError(f"Archives may contain at most {MAX_IMPORT_ENTRIES} files")
+        return _LimitedReader(source, self)
+
+    def add(self, size: int):
+        self.size += size
+        if self.size > self.max_size:
+            raise ValueError("Archive expands beyond the import size limit")
+
+
+class _LimitedReader:
+    def __init__(self, source: IO[bytes], limit: _ExpansionLimit) -> None:
+        self.source = source
+        self.limit = limit
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.limit.add(len(data))
+        return data
@@ -0,0 +1,4 @@
+from .project_cache import ProjectCache, project_cache, PROJECT_CACHE_CHANNEL
+from .listener import ProjectCacheListener
+
+__all__ = ["ProjectCache", "project_cache", "PROJECT_CACHE_CHANNEL", "ProjectCacheListener"]
@@ -0,0 +1,64 @@
+import logging
+import select
+import threading
+import psycopg2
+from cache.project_cache import PROJECT_CACHE_CHANNEL, ProjectCache
+
+logger = logging.getLogger("app")
+
+
+class ProjectCacheListener:
+    """
+    Applies invalidations that any worker publishes with NOTIFY on the project_cache channel.
+
+    While the connection is down invalidations may be missed, so the cache is
+    deactivated until LISTEN is re-established.
+    """
+
+    RECONNECT_DELAY = 5
+    POLL_TIMEOUT = 1
+
+    def __init__(self, cache: ProjectCache, dsn: str) -> None:
+        self.cache = cache
+        self.dsn = dsn
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="project-cache-listener", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.POLL_TIMEOUT * 2)
+        self.cache.deactivate()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as e:
+                logger.warning(f"Project cache listener lost its connection, cache disabled. Reason: {str(e)}")
+            self.cache.deactivate()
+            self._stop.wait(self.RECONNECT_DELAY)
+
+    def _listen(self):
+        connection = psycopg2.connect(self.dsn)
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {PROJECT_CACHE_CHANNEL}")
+            self.cache.activate()
+            while not self._stop.is_set():
+                if select.select([connection], [], [], self.POLL_TIMEOUT) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self.handle(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def handle(self, payload: str):
+        if payload.isdigit():
+            self.cache.invalidate(int(payload))
+        else:
+            self.cache.clear()
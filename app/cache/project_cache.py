@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
+from models.enums import Role
+
+PROJECT_CACHE_SIZE = int(os.getenv("PROJECT_CACHE_SIZE", "10000"))
+PROJECT_CACHE_TTL = float(os.getenv("PROJECT_CACHE_TTL", "300"))
+PROJECT_CACHE_CHANNEL = "project_cache"
+
+
+@dataclass
+class CachedProject:
+    values: Dict[str, Any]
+    expires_at: float
+    # user_id -> role, None meaning the user is known not to be a member
+    roles: Dict[int, Role | None] = field(default_factory=dict)
+
+
+class ProjectCache:
+    """
+    Bounded LRU cache of project rows and membership roles.
+
+    The cache only serves entries while it is active, i.e. while a listener
+    receives invalidations from the other workers. Every invalidation bumps
+    `version`; writers pass the version they saw before querying the database,
+    so a row read before a concurrent invalidation is never stored.
+    """
+
+    def __init__(self, max_size: int = PROJECT_CACHE_SIZE, ttl: float = PROJECT_CACHE_TTL) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = 0
+        self.active = False
+        self._entries: OrderedDict[int, CachedProject] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def activate(self):
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+            self.active = self.enabled
+
+    def deactivate(self):
+        with self._lock:
+            self.active = False
+            self._entries.clear()
+            self.version += 1
+
+    def get_project(self, project_id: int) -> Dict[str, Any] | None:
+        with self._lock:
+            entry = self._get_entry(project_id)
+            return dict(entry.values) if entry is not None else None
+
+    def set_project(self, project_id: int, values: Dict[str, Any], version: int):
+        with self._lock:
+            if not self.active or version != self.version:
+                return
+            self._entries[project_id] = CachedProject(values=dict(values), expires_at=time.monotonic() + self.ttl)
+            self._entries.move_to_end(project_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_role(self, project_id: int, user_id: int) -> Tuple[bool, Role | None]:
+        """Return (hit, role); roles are only cached for projects that are cached themselves."""
+        with self._lock:
+            entry = self._get_entry(project_id)
+            if entry is None or user_id not in entry.roles:
+                return False, None
+            return True, entry.roles[user_id]
+
+    def set_role(self, project_id: int, user_id: int, role: Role | None, version: int):
+        with self._lock:
+            if not self.active or version != self.version:
+                return
+            entry = self._entries.get(project_id)
+            if entry is not None:
+                entry.roles[user_id] = role
+
+    def invalidate(self, project_id: int):
+        with self._lock:
+            self._entries.pop(project_id, None)
+            self.version += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+    def _get_entry(self, project_id: int) -> CachedProject | None:
+        if not self.active:
+            return None
+        entry = self._entries.get(project_id)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[project_id]
+            return None
+        self._entries.move_to_end(project_id)
+        return entry
+
+
+project_cache = ProjectCache()
@@ -0,0 +1,286 @@
+import logging
+import os
+import random
+import zlib
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # in requirements.txt; without it gzip is used and a warning logged at startup
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional, responses fall back to gzip
+    brotli = None
+
+# gzip | zstd | none
+STORAGE_COMPRESSION = os.getenv("STORAGE_COMPRESSION", "gzip").lower()
+COMPRESSION_CHUNK_SIZE = 1024 * 1024
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/csv",
+    "application/yaml",
+    "application/x-yaml",
+    "image/svg+xml",
+)
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+logger = logging.getLogger("app")
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("gzip", "zstd") if zstandard is not None else ("gzip",)
+
+
+def check_storage_compression():
+    """Log at startup when the configured at-rest compression cannot be used as configured."""
+    if STORAGE_COMPRESSION == "zstd" and zstandard is None:
+        logger.warning("STORAGE_COMPRESSION is zstd but the zstandard package is not installed; documents are stored with gzip.")
+    elif STORAGE_COMPRESSION not in ("gzip", "zstd", "none"):
+        logger.warning(f"Unknown STORAGE_COMPRESSION {STORAGE_COMPRESSION!r}; documents are stored uncompressed.")
+
+
+def storage_encoding(content_type: Optional[str]) -> Optional[str]:
+    """Pick the at-rest encoding for a document, None to store it as is."""
+    if STORAGE_COMPRESSION not in ("gzip", "zstd") or not content_type:
+        return None
+    if not is_compressible(content_type):
+        return None
+    if STORAGE_COMPRESSION == "zstd" and zstandard is not None:
+        return "zstd"
+    return "gzip"
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def response_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the encoding for a response body: brotli when available, then gzip."""
+    if brotli is not None and accepts_encoding(accept_encoding, "br"):
+        return "br"
+    if accepts_encoding(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """Check an Accept-Encoding header for `encoding` (or `*`) with a non-zero q-value."""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() not in (encoding, "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def compressor(encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    if encoding == "br":
+        brotli_compressor = brotli.Compressor(quality=4)
+        return brotli_compressor.process, brotli_compressor.finish
+    if encoding == "zstd":
+        compressobj = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        compressobj = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressobj.compress, compressobj.flush
+
+
+def iter_file(source: BinaryIO) -> Iterator[bytes]:
+    while chunk := source.read(COMPRESSION_CHUNK_SIZE):
+        yield chunk
+
+
+def iter_blocks(chunks: Iterable[bytes], block_size: int) -> Iterator[bytes]:
+    """Regroup chunks of any size into blocks of exactly `block_size` bytes, the last one shorter."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= block_size:
+            yield bytes(buffer[:block_size])
+            del buffer[:block_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+# Content-defined blocks end after a window of bytes whose hash matches, so an insertion only
+# changes the blocks around it instead of shifting every later one. A cheap filter over the last
+# 4 bytes, computed for a whole scan at once with byte tables and integer xors, picks about one
+# position in 256; CRC-32 of the window decides among those. The tables are fixed so the same
+# content splits the same way in every process.
+CONTENT_BLOCK_WINDOW = 48
+CONTENT_BLOCK_SCAN_SIZE = 1024 * 1024
+_block_random = random.Random(0x0B10C)
+
+
+def _block_table(no_fixed_points: bool = False) -> bytes:
+    while True:
+        table = bytes(_block_random.randrange(256) for _ in range(256))
+        # Without fixed points in the last table, runs of one or two repeating bytes never pass
+        # the filter, so they are not checked position by position.
+        if not no_fixed_points or all(table[value] != value for value in range(256)):
+            return table
+
+
+_BLOCK_FILTER_TABLES = (_block_table(), _block_table(), _block_table(no_fixed_points=True))
+
+
+def iter_content_blocks(chunks: Iterable[bytes], average_size: int) -> Iterator[bytes]:
+    """
+    Regroup chunks into blocks cut where the content matches, about `average_size` bytes long
+    and between a quarter and four times that.
+    """
+    min_size, max_size = average_size // 4, average_size * 4
+    # The filter passes about 1 position in 2**8; the CRC bits make up the rest.
+    mask = (1 << max(average_size.bit_length() - 9, 0)) - 1
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= max_size:
+            end = _find_block_end(buffer, min_size, max_size, mask)
+            yield bytes(buffer[:end])
+            del buffer[:end]
+    while buffer:
+        end = _find_block_end(buffer, min_size, max_size, mask)
+        yield bytes(buffer[:end])
+        del buffer[:end]
+
+
+def _find_block_end(data: bytearray, min_size: int, max_size: int, mask: int) -> int:
+    end = min(len(data), max_size)
+    start = max(min_size, CONTENT_BLOCK_WINDOW)
+    while start < end:
+        stop = min(start + CONTENT_BLOCK_SCAN_SIZE, end)
+        # Scanned in pieces that start a window early, so a block only hashes what it covers.
+        piece = bytes(data[start - CONTENT_BLOCK_WINDOW:stop])
+        flags = _block_filter(piece)
+        position = flags.find(0, CONTENT_BLOCK_WINDOW)
+        while position != -1:
+            if not zlib.crc32(piece[position - CONTENT_BLOCK_WINDOW + 1:position + 1]) & mask:
+                return start - CONTENT_BLOCK_WINDOW + position + 1
+            position = flags.find(0, position + 1)
+        start = stop
+    return end
+
+
+def _block_filter(piece: bytes) -> bytes:
+    """One byte per position, a hash of the 4 bytes ending there; positions with 0 pass."""
+    size = len(piece)
+    first, *rest = _BLOCK_FILTER_TABLES
+    hashed = piece.translate(first)
+    for shift, table in enumerate(rest, start=1):
+        # Each position is mixed with the table lookup of the hash `shift` positions before it.
+        mixed = int.from_bytes(hashed, "little") ^ (int.from_bytes(hashed.translate(table), "little") << (8 * shift))
+        hashed = mixed.to_bytes(size + shift, "little")[:size]
+    return hashed
+
+
+def write_chunks(target: BinaryIO, chunks: Iterable[bytes], encoding: Optional[str] = None) -> int:
+    """Write chunks to `target`, compressing them with `encoding`. Returns the uncompressed size."""
+    size = 0
+    if encoding is None:
+        for chunk in chunks:
+            size += len(chunk)
+            target.write(chunk)
+        return size
+
+    compress, flush = compressor(encoding)
+    for chunk in chunks:
+        size += len(chunk)
+        target.write(compress(chunk))
+    target.write(flush())
+    return size
+
+
+def read_chunks(path: str, encoding: Optional[str] = None) -> Iterator[bytes]:
+    """Yield the original bytes of a stored file, decompressing on the fly."""
+    with open(path, "rb") as source:
+        yield from decompress_stream(source, encoding)
+
+
+def decompress_stream(source: BinaryIO, encoding: Optional[str] = None) -> Iterator[bytes]:
+    """Decompress a file object into chunks of at most COMPRESSION_CHUNK_SIZE bytes."""
+    if encoding is None:
+        yield from iter_file(source)
+    elif encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd is not supported")
+        yield from zstandard.ZstdDecompressor().read_to_iter(source, write_size=COMPRESSION_CHUNK_SIZE)
+    elif encoding == "gzip":
+        decompressobj = zlib.decompressobj(31)
+        for chunk in iter_file(source):
+            # max_length keeps highly compressed input from expanding in one go
+            while chunk:
+                data = decompressobj.decompress(chunk, COMPRESSION_CHUNK_SIZE)
+                if data:
+                    yield data
+                chunk = decompressobj.unconsumed_tail
+        tail = decompressobj.flush()
+        if tail:
+            yield tail
+    else:
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+class StreamDecompressor:
+    """
+    Incremental gzip/zstd decoder for data that arrives in pieces. `read` never returns
+    more than `max_output` bytes, so a tiny, highly compressed input cannot expand in one call.
+    """
+
+    # zstd has no output limit per call, so input is fed in slices this small.
+    ZSTD_SLICE = 128
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "gzip":
+            self._gzip = zlib.decompressobj(31)
+        elif encoding == "zstd" and zstandard is not None:
+            self._zstd = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+        self.encoding = encoding
+        # Input not decompressed yet starts at _offset; it is sliced without copying.
+        self._input = memoryview(b"")
+        self._offset = 0
+        self._output = bytearray()
+
+    def feed(self, data: bytes):
+        remaining = self._input[self._offset:]
+        self._input = memoryview(bytes(remaining) + data if remaining else data)
+        self._offset = 0
+
+    def read(self, max_output: int) -> bytes:
+        """Return up to `max_output` decompressed bytes; b"" once more input is needed."""
+        if self.encoding == "gzip":
+            data = self._gzip.decompress(self._input[self._offset:], max_output)
+            self._input = memoryview(self._gzip.unconsumed_tail)
+            self._offset = 0
+            return data
+
+        while len(self._output) < max_output and self._offset < len(self._input):
+            piece = self._input[self._offset:self._offset + self.ZSTD_SLICE]
+            self._offset += len(piece)
+            self._output += self._zstd.decompress(piece)
+        data = bytes(self._output[:max_output])
+        del self._output[:max_output]
+        return data
+
+    def truncated(self) -> bool:
+        """After the last input: whether the stream stopped before the end of its frame."""
+        if self.encoding == "gzip":
+            return not self._gzip.eof
+        return not self._zstd.eof
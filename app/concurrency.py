@@ -0,0 +1,17 @@
+from typing import Callable, TypeVar
+from starlette.concurrency import run_in_threadpool as starlette_run_in_threadpool
+from profiling import profile_thread
+
+T = TypeVar("T")
+
+
+async def run_in_threadpool(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run blocking request work in a worker thread, keeping the event loop free for other
+    requests. The worker is sampled for the request's profile while it runs `func`.
+    """
+    def run() -> T:
+        with profile_thread():
+            return func(*args, **kwargs)
+
+    return await starlette_run_in_threadpool(run)
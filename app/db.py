@@ -2,6 +2,7 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from instrumentation import enable_strict_loading, instrument_engine
 
 load_dotenv()
 
@@ -11,13 +12,18 @@ POSTGRES_DB = os.getenv("POSTGRES_DB")
 POSTGRES_TEST_DB = os.getenv("POSTGRES_TEST_DB")
 POSTGRES_USER = os.getenv("POSTGRES_USER")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD")
+STRICT_LOADING = os.getenv("STRICT_LOADING", "false").lower() == "true"
 
 DB_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
 engine = create_engine(DB_URL)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+if STRICT_LOADING:
+    enable_strict_loading(SessionLocal)
+
 
 def get_db():
     db = SessionLocal()
@@ -28,6 +34,7 @@ def get_db():
 
 TEST_DB_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_TEST_DB}"
 test_engine = create_engine(TEST_DB_URL)
+instrument_engine(test_engine)
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 def get_test_db():
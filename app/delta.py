@@ -0,0 +1,156 @@
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import zlib
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from compression import COMPRESSION_CHUNK_SIZE, iter_blocks, read_chunks
+
+# Default and bounds of the block size clients may request signatures for.
+DELTA_BLOCK_SIZE = int(os.getenv("DELTA_BLOCK_SIZE", str(256 * 1024)))
+DELTA_MIN_BLOCK_SIZE = 4 * 1024
+DELTA_MAX_BLOCK_SIZE = 16 * 1024 * 1024
+DELTA_MEDIA_TYPE = "application/vnd.document-delta"
+
+# A delta is a sequence of instructions, integers big-endian:
+#   b"C" block:u64 count:u32   copy `count` blocks of the current content, starting at `block`
+#   b"L" length:u32 data       append `length` literal bytes
+COPY = b"C"
+LITERAL = b"L"
+_COPY_ARGUMENTS = struct.Struct(">QI")
+_LITERAL_LENGTH = struct.Struct(">I")
+
+
+def weak_checksum(block: bytes) -> int:
+    """Rolling checksum of a block (Adler-32, which clients can roll one byte at a time)."""
+    return zlib.adler32(block)
+
+
+def strong_checksum(block: bytes) -> str:
+    return hashlib.sha256(block).hexdigest()
+
+
+def signature(chunks: Iterable[bytes], block_size: int) -> Tuple[int, List[Dict]]:
+    """Return the size of the content and the weak and strong checksum of each of its blocks."""
+    size = 0
+    blocks = []
+    for block in iter_blocks(chunks, block_size):
+        size += len(block)
+        blocks.append({"weak": weak_checksum(block), "strong": strong_checksum(block)})
+    return size, blocks
+
+
+class BaseReader:
+    """
+    Reads ranges of a stored file's original content. Compressed files cannot seek, so their
+    content is decompressed once, as far as reads need it, into a temporary file that later
+    reads seek in; copies going back never decompress the file again.
+    """
+
+    def __init__(self, path: str, encoding: Optional[str] = None) -> None:
+        self.path = path
+        self.encoding = encoding
+        self._file: Optional[BinaryIO] = None
+        self._chunks: Optional[Iterator[bytes]] = None
+        # Bytes of the original content written to the temporary file so far.
+        self._spooled = 0
+
+    def __enter__(self) -> "BaseReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Read up to `length` bytes at `offset`; shorter at the end of the content."""
+        if self._file is None:
+            if self.encoding is None:
+                self._file = open(self.path, "rb")
+            else:
+                self._file = tempfile.TemporaryFile()
+                self._chunks = read_chunks(self.path, self.encoding)
+        if self._chunks is not None:
+            self._spool(offset + length)
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+
+    def _spool(self, end: int) -> None:
+        self._file.seek(0, os.SEEK_END)
+        while self._spooled < end:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._chunks.close()
+                self._chunks = None
+                return
+            self._file.write(chunk)
+            self._spooled += len(chunk)
+
+
+def apply_delta(delta: BinaryIO, base: BaseReader, block_size: int, expected_sha256: str) -> Iterator[bytes]:
+    """
+    Yield the content described by `delta` on top of `base`. The sha256 of the result is
+    checked once the delta is consumed; ValueError is raised for a malformed delta or a
+    result that does not match.
+    """
+    digest = hashlib.sha256()
+    while instruction := delta.read(1):
+        if instruction == COPY:
+            start, count = _COPY_ARGUMENTS.unpack(_read_exact(delta, _COPY_ARGUMENTS.size))
+            for index in range(start, start + count):
+                data = base.read(index * block_size, block_size)
+                if not data:
+                    raise ValueError(f"Delta copies block {index}, past the end of the document")
+                digest.update(data)
+                yield data
+        elif instruction == LITERAL:
+            remaining, = _LITERAL_LENGTH.unpack(_read_exact(delta, _LITERAL_LENGTH.size))
+            while remaining:
+                data = delta.read(min(remaining, COMPRESSION_CHUNK_SIZE))
+                if not data:
+                    raise ValueError("Delta ends inside a literal")
+                remaining -= len(data)
+                digest.update(data)
+                yield data
+        else:
+            raise ValueError(f"Unknown delta instruction {instruction!r}")
+
+    if digest.hexdigest() != expected_sha256.lower():
+        raise ValueError("Rebuilt document does not match the expected sha256")
+
+
+class ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("Delta ends inside an instruction")
+    return data
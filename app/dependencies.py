@@ -1,10 +1,16 @@
-from typing import Optional
-from fastapi import Depends, File, HTTPException, Header, UploadFile, status
-from services import UserService, AuthService, ProjectService, DocumentService
+import tempfile
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+from fastapi import Depends, File, HTTPException, Header, Request, UploadFile, status
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+from services import UserService, AuthService, ProjectService, DocumentService, UploadService
 from sqlalchemy.orm import Session
-from repositories import UserRepository, ProjectRepository, DocumentRepository
+from repositories import UserRepository, ProjectRepository, DocumentRepository, UploadRepository
 from db import get_db
+from cache import project_cache
 from schemas import UploadedDocument
+from models import User
+from profiling import verify_profile_token
 
 
 def get_user_service(db: Session = Depends(get_db)):
@@ -18,7 +24,7 @@ def get_auth_service(db: Session = Depends(get_db)):
 
 
 def get_project_service(db: Session = Depends(get_db)):
-    project_repo = ProjectRepository(db)
+    project_repo = ProjectRepository(db, project_cache)
     user_repo = UserRepository(db)
     return ProjectService(project_repo, user_repo)
 
@@ -38,6 +44,22 @@ def get_document_service(
     return DocumentService(document_repo, project_service)
 
 
+def get_upload_repository(db: Session = Depends(get_db)):
+    return UploadRepository(db)
+
+
+def get_test_upload_repository(db: Session = Depends(get_db)):
+    return UploadRepository(db, True)
+
+
+def get_upload_service(
+    upload_repo: UploadRepository = Depends(get_upload_repository),
+    document_service: DocumentService = Depends(get_document_service),
+    project_service: ProjectService = Depends(get_project_service)
+):
+    return UploadService(upload_repo, document_service, project_service)
+
+
 def get_current_user(
     token: Optional[str] = Header(None),
     db: Session = Depends(get_db)
@@ -59,11 +81,143 @@ def get_current_user(
         )
 
 
-def load_file_stream(file: UploadFile = File(...)) -> UploadedDocument:
-    content = file.file.read()
-    return UploadedDocument(
-        filename=file.filename,
-        content_type=file.content_type,
-        content=content
+def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    if not x_profile_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing profile token"
+        )
+    if not verify_profile_token(x_profile_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid profile token"
+        )
+
+
+# Allowance for multipart boundaries and part headers on top of the file contents when a
+# request body is compared with the remaining quota.
+MULTIPART_OVERHEAD = 1024 * 1024
+
+
+def multipart_openapi(field: str, multiple: bool = False) -> Dict:
+    """Request body schema for routes whose form is parsed by the upload dependencies below."""
+    schema = {"type": "string", "format": "binary"}
+    if multiple:
+        schema = {"type": "array", "items": schema}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {
+        "schema": {"type": "object", "required": [field], "properties": {field: schema}}}}}}
+
+
+async def _parse_upload_form(request: Request, max_size: Optional[int]) -> FormData:
+    """
+    Parse a multipart body, refusing it as soon as it is larger than `max_size` plus framing:
+    up front from Content-Length, otherwise (chunked or decompressed bodies) while it is read.
+    """
+    limit = max_size + MULTIPART_OVERHEAD if max_size is not None else None
+    content_length = request.headers.get("content-length")
+    if limit is not None and content_length and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Storage quota exceeded")
 
-    )
+    async def limited_stream():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if limit is not None and received > limit:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Storage quota exceeded")
+            yield chunk
+
+    try:
+        return await MultiPartParser(request.headers, limited_stream()).parse()
+    except MultiPartException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
+
+
+def _form_files(form: FormData, field: str) -> List:
+    files = [value for value in form.getlist(field) if not isinstance(value, str)]
+    if not files:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Missing file field '{field}'")
+    return files
+
+
+def _uploaded_document(file: UploadFile) -> UploadedDocument:
+    # The part is already spooled to a temporary file (decompressed if it was sent encoded),
+    # so it is copied to storage from there instead of being read into memory.
+    return UploadedDocument(filename=file.filename, content_type=file.content_type, stream=file.file)
+
+
+async def load_file_stream(
+    request: Request,
+    project_id: int,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+) -> AsyncIterator[UploadedDocument]:
+    # Declared on the current user, so unauthenticated uploads are refused before the body is read.
+    form = await _parse_upload_form(request, document_service.get_upload_limit(project_id))
+    try:
+        yield _uploaded_document(_form_files(form, "file")[0])
+    finally:
+        await form.close()
+
+
+async def load_file_streams(
+    request: Request,
+    project_id: int,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+) -> AsyncIterator[List[UploadedDocument]]:
+    # One limit for the whole batch; the sum of the files is checked again when they are stored.
+    form = await _parse_upload_form(request, document_service.get_upload_limit(project_id))
+    try:
+        yield [_uploaded_document(file) for file in _form_files(form, "files")]
+    finally:
+        await form.close()
+
+
+async def load_replacement_stream(
+    request: Request,
+    project_id: int,
+    document_id: int,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+) -> AsyncIterator[UploadedDocument]:
+    # The replaced content is freed, so its size is available to the new one.
+    form = await _parse_upload_form(request, document_service.get_upload_limit(project_id, document_id))
+    try:
+        yield _uploaded_document(_form_files(form, "file")[0])
+    finally:
+        await form.close()
+
+
+def load_archive_stream(file: UploadFile = File(...)) -> UploadedDocument:
+    # Archives are not limited by their own size: what counts is their expanded content,
+    # which is checked against the quota entry by entry.
+    return _uploaded_document(file)
+
+
+async def spool_request_body(request: Request, max_size: Optional[int] = None, detail: str = "Request body too large") -> BinaryIO:
+    """
+    Copy the request body to a temporary file, refusing it with a 413 once it is larger than
+    `max_size`. Bodies that roll over to disk are written from a worker thread.
+    """
+    body = UploadFile(tempfile.SpooledTemporaryFile(max_size=1024 * 1024))
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if max_size is not None and received > max_size:
+                raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            await body.write(chunk)
+        await body.seek(0)
+    except BaseException:
+        await body.close()
+        raise
+    return body.file
+
+
+async def load_request_body(request: Request) -> AsyncIterator[BinaryIO]:
+    # Spooled to a temporary file like multipart parts, so large bodies are not held in memory.
+    body = await spool_request_body(request)
+    try:
+        yield body
+    finally:
+        body.close()
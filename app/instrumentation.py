@@ -0,0 +1,88 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, raiseload, sessionmaker
+
+# 0 disables the budget. In "log" mode offending requests are logged once they finish,
+# in "raise" mode the query that exceeds the budget fails.
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "0"))
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "log")
+
+logger = logging.getLogger("app")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class RequestStats:
+    db_time: float = 0.0
+    query_count: int = 0
+    storage_time: float = 0.0
+
+
+# Set by the metrics middleware for the lifetime of a request, None outside of requests.
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+def instrument_engine(engine: Engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def enable_strict_loading(session_factory: sessionmaker):
+    """Make every lazy relationship load raise instead of silently emitting a query."""
+    event.listen(session_factory, "do_orm_execute", _raise_on_lazy_load)
+
+
+def check_query_budget(stats: RequestStats, method: str, route: str):
+    if QUERY_BUDGET and stats.query_count > QUERY_BUDGET:
+        logger.warning(
+            f"Request {method} {route} executed {stats.query_count} queries, exceeding the budget of {QUERY_BUDGET}.")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats.get()
+    if stats is not None and QUERY_BUDGET and QUERY_BUDGET_MODE == "raise" and stats.query_count >= QUERY_BUDGET:
+        raise QueryBudgetExceeded(f"Request exceeded the budget of {QUERY_BUDGET} queries")
+    # Kept on the execution context rather than the connection: nothing is left behind on
+    # pooled connections when a statement fails and the after hook never runs.
+    if context is not None:
+        context.query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats.get()
+    if stats is not None:
+        start = getattr(context, "query_start_time", None)
+        if start is not None:
+            stats.db_time += time.perf_counter() - start
+        stats.query_count += 1
+
+
+def _raise_on_lazy_load(orm_execute_state: ORMExecuteState):
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        # Explicit selectinload()/joinedload() options are more specific than the
+        # wildcard, so eager loads requested by the repositories still work.
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+@contextmanager
+def track_storage_io():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.storage_time += time.perf_counter() - start
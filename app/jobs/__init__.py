@@ -0,0 +1,20 @@
+from .runner import run_periodically
+from .upload_expiry import expire_upload_sessions, UPLOAD_EXPIRY_INTERVAL
+from .document_indexing import index_documents, SEARCH_INDEX_INTERVAL
+from .stats_reconciliation import reconcile_project_stats, STATS_RECONCILE_INTERVAL
+from .version_retention import prune_document_versions, VERSION_PRUNE_INTERVAL
+from .change_retention import prune_document_changes, CHANGE_PRUNE_INTERVAL
+
+__all__ = [
+    "run_periodically",
+    "expire_upload_sessions",
+    "UPLOAD_EXPIRY_INTERVAL",
+    "index_documents",
+    "SEARCH_INDEX_INTERVAL",
+    "reconcile_project_stats",
+    "STATS_RECONCILE_INTERVAL",
+    "prune_document_versions",
+    "VERSION_PRUNE_INTERVAL",
+    "prune_document_changes",
+    "CHANGE_PRUNE_INTERVAL",
+]
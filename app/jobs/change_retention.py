@@ -0,0 +1,24 @@
+import logging
+import os
+from datetime import timedelta
+from db import SessionLocal
+from repositories import DocumentChangeRepository
+
+CHANGE_PRUNE_INTERVAL = int(os.getenv("CHANGE_PRUNE_INTERVAL", "3600"))
+# Sync clients offline for longer than this have to resync from the document list.
+CHANGE_RETENTION_DAYS = int(os.getenv("CHANGE_RETENTION_DAYS", "30"))
+CHANGE_PRUNE_BATCH_SIZE = int(os.getenv("CHANGE_PRUNE_BATCH_SIZE", "5000"))
+
+logger = logging.getLogger("app")
+
+
+def prune_document_changes(session_factory=SessionLocal) -> int:
+    """Delete change feed entries older than the retention period, batch by batch."""
+    pruned = 0
+    with session_factory() as db:
+        change_repo = DocumentChangeRepository(db)
+        while deleted := change_repo.prune(timedelta(days=CHANGE_RETENTION_DAYS), CHANGE_PRUNE_BATCH_SIZE):
+            pruned += deleted
+    if pruned:
+        logger.info(f"Pruned {pruned} document changes.")
+    return pruned
@@ -0,0 +1,57 @@
+import logging
+import os
+from typing import Dict, Optional
+from compression import is_compressible
+from db import SessionLocal
+from repositories import DocumentRepository
+
+SEARCH_INDEX_INTERVAL = int(os.getenv("SEARCH_INDEX_INTERVAL", "30"))
+SEARCH_INDEX_BATCH_SIZE = int(os.getenv("SEARCH_INDEX_BATCH_SIZE", "100"))
+# Only the beginning of larger documents is indexed; a tsvector is limited to 1 MB.
+SEARCH_MAX_TEXT_SIZE = int(os.getenv("SEARCH_MAX_TEXT_SIZE", str(256 * 1024)))
+
+logger = logging.getLogger("app")
+
+
+def index_documents(session_factory=SessionLocal, use_test_dir: bool = False) -> int:
+    """Extract the text of documents not indexed yet and store their search vectors, batch by batch."""
+    indexed = 0
+    with session_factory() as db:
+        document_repo = DocumentRepository(db, use_test_dir)
+        while documents := document_repo.get_unindexed_documents(SEARCH_INDEX_BATCH_SIZE):
+            texts: Dict[int, Optional[str]] = {}
+            for document in documents:
+                texts[document.id] = _extract_text(document_repo, document)
+            try:
+                document_repo.set_search_texts(texts)
+            except Exception:
+                db.rollback()
+                # Store the batch one by one, so a document that cannot be indexed does not
+                # keep the others from it.
+                for document_id, text in texts.items():
+                    _set_search_text(db, document_repo, document_id, text)
+            indexed += len(documents)
+    if indexed:
+        logger.info(f"Indexed {indexed} documents for search.")
+    return indexed
+
+
+def _extract_text(document_repo: DocumentRepository, document) -> Optional[str]:
+    # The compressible types are the text formats.
+    if not is_compressible(document.file_type):
+        return None
+    try:
+        return document_repo.read_text(document, SEARCH_MAX_TEXT_SIZE)
+    except Exception as e:
+        logger.warning(f"Could not index document {document.id}. Reason: {str(e)}")
+        return None
+
+
+def _set_search_text(db, document_repo: DocumentRepository, document_id: int, text: Optional[str]):
+    try:
+        document_repo.set_search_texts({document_id: text})
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not index document {document_id}. Reason: {str(e)}")
+        # Marked as indexed without content, so it is not picked up again.
+        document_repo.set_search_texts({document_id: None})
@@ -0,0 +1,15 @@
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger("app")
+
+
+async def run_periodically(job: Callable[..., object], interval: float, **kwargs):
+    """Run a blocking job (called with `kwargs`) in a worker thread every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(job, **kwargs)
+        except Exception as e:
+            logger.error(f"Background job {job.__name__} failed. Reason: {str(e)}")
@@ -0,0 +1,29 @@
+import logging
+import os
+from db import SessionLocal
+from repositories import DocumentRepository, ProjectStatsRepository
+
+STATS_RECONCILE_INTERVAL = int(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+STATS_RECONCILE_BATCH_SIZE = int(os.getenv("STATS_RECONCILE_BATCH_SIZE", "500"))
+
+logger = logging.getLogger("app")
+
+
+def reconcile_project_stats(session_factory=SessionLocal, use_test_dir: bool = False) -> int:
+    """
+    Recount every project's counters batch by batch and fix the ones that drifted. Documents
+    stored before their size was recorded get it from their files first, so they are counted.
+    """
+    corrected = 0
+    last_id = 0
+    with session_factory() as db:
+        document_repo = DocumentRepository(db, use_test_dir)
+        while document_repo.fill_missing_sizes(STATS_RECONCILE_BATCH_SIZE):
+            pass
+        stats_repo = ProjectStatsRepository(db)
+        while last_id is not None:
+            last_id, fixed = stats_repo.reconcile(last_id, STATS_RECONCILE_BATCH_SIZE)
+            corrected += fixed
+    if corrected:
+        logger.warning(f"Corrected the counters of {corrected} projects.")
+    return corrected
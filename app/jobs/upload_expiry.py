@@ -0,0 +1,17 @@
+import logging
+import os
+from db import SessionLocal
+from repositories import UploadRepository
+
+UPLOAD_EXPIRY_INTERVAL = int(os.getenv("UPLOAD_EXPIRY_INTERVAL", "600"))
+
+logger = logging.getLogger("app")
+
+
+def expire_upload_sessions(session_factory=SessionLocal, use_test_dir: bool = False) -> int:
+    """Delete upload sessions nobody has written to within the TTL, along with their staging files."""
+    with session_factory() as db:
+        expired = UploadRepository(db, use_test_dir).delete_expired_sessions()
+    if expired:
+        logger.info(f"Expired {expired} abandoned upload sessions.")
+    return expired
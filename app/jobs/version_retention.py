@@ -0,0 +1,31 @@
+import logging
+import os
+from datetime import timedelta
+from db import SessionLocal
+from repositories import DocumentRepository
+
+VERSION_PRUNE_INTERVAL = int(os.getenv("VERSION_PRUNE_INTERVAL", "3600"))
+# Versions kept per document and their maximum age in days; 0 keeps them regardless.
+VERSION_RETENTION_COUNT = int(os.getenv("VERSION_RETENTION_COUNT", "20"))
+VERSION_RETENTION_DAYS = int(os.getenv("VERSION_RETENTION_DAYS", "0"))
+# Unreferenced blobs are only deleted once they have not been used for this long.
+BLOB_GC_GRACE = int(os.getenv("BLOB_GC_GRACE", "3600"))
+VERSION_PRUNE_BATCH_SIZE = int(os.getenv("VERSION_PRUNE_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger("app")
+
+
+def prune_document_versions(session_factory=SessionLocal, use_test_dir: bool = False) -> int:
+    """Apply the retention policy to document versions, then delete the blobs no version uses."""
+    pruned = 0
+    collected = 0
+    max_age = timedelta(days=VERSION_RETENTION_DAYS) if VERSION_RETENTION_DAYS else None
+    with session_factory() as db:
+        versions = DocumentRepository(db, use_test_dir).versions
+        while deleted := versions.prune(VERSION_RETENTION_COUNT, max_age, VERSION_PRUNE_BATCH_SIZE):
+            pruned += deleted
+        while deleted := versions.collect_garbage(timedelta(seconds=BLOB_GC_GRACE), VERSION_PRUNE_BATCH_SIZE):
+            collected += deleted
+    if pruned or collected:
+        logger.info(f"Pruned {pruned} document versions and {collected} unused blobs.")
+    return pruned
@@ -1,14 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routes import auth_router, project_router, document_router
+from fastapi.responses import ORJSONResponse
+from cache import ProjectCacheListener, project_cache
+from compression import check_storage_compression
+from db import SessionLocal
+from jobs import (
+    CHANGE_PRUNE_INTERVAL,
+    SEARCH_INDEX_INTERVAL,
+    STATS_RECONCILE_INTERVAL,
+    UPLOAD_EXPIRY_INTERVAL,
+    VERSION_PRUNE_INTERVAL,
+    expire_upload_sessions,
+    index_documents,
+    prune_document_changes,
+    prune_document_versions,
+    reconcile_project_stats,
+    run_periodically,
+)
+from routes import auth_router, project_router, document_router, metrics_router, profile_router, upload_router, user_router
+from middleware import MetricsMiddleware, ProfilerMiddleware, RequestDecompressionMiddleware, ResponseCompressionMiddleware
 from logger import setup_logging
+from profiling import instrument_threadpool
 
 
 setup_logging()
+instrument_threadpool()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_storage_compression()
+    # The database and storage directory the listener and jobs use; tests point them at theirs.
+    session_factory = app.state.session_factory
+    storage = {"session_factory": session_factory, "use_test_dir": app.state.use_test_dir}
+    listener = None
+    if project_cache.enabled:
+        listener = ProjectCacheListener(project_cache, session_factory.kw["bind"].url.render_as_string(hide_password=False))
+        listener.start()
+    jobs = [
+        asyncio.create_task(run_periodically(expire_upload_sessions, UPLOAD_EXPIRY_INTERVAL, **storage)),
+        asyncio.create_task(run_periodically(index_documents, SEARCH_INDEX_INTERVAL, **storage)),
+        asyncio.create_task(run_periodically(reconcile_project_stats, STATS_RECONCILE_INTERVAL, **storage)),
+        asyncio.create_task(run_periodically(prune_document_versions, VERSION_PRUNE_INTERVAL, **storage)),
+        asyncio.create_task(run_periodically(prune_document_changes, CHANGE_PRUNE_INTERVAL, session_factory=session_factory))
+    ]
+    yield
+    for job in jobs:
+        job.cancel()
+    if listener is not None:
+        listener.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.state.session_factory = SessionLocal
+app.state.use_test_dir = False
+
+app.add_middleware(RequestDecompressionMiddleware)
+app.add_middleware(ResponseCompressionMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
+app.include_router(user_router)
 app.include_router(project_router)
 app.include_router(document_router)
+app.include_router(upload_router)
+app.include_router(metrics_router)
+app.include_router(profile_router)
 
 
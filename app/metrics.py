@@ -0,0 +1,58 @@
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest, REGISTRY
+from prometheus_client import multiprocess
+from instrumentation import RequestStats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Total time spent handling a request.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing database queries per request.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of database queries executed per request.",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_STORAGE_TIME = Histogram(
+    "http_request_storage_seconds",
+    "Time spent on document storage I/O per request.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the response body.",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+
+
+def observe_request(method: str, route: str, status: int, duration: float, stats: RequestStats, response_size: int):
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(duration)
+    REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+    REQUEST_DB_QUERIES.labels(method, route).observe(stats.query_count)
+    REQUEST_STORAGE_TIME.labels(method, route).observe(stats.storage_time)
+    RESPONSE_SIZE.labels(method, route).observe(response_size)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    # With several uvicorn/gunicorn workers every process writes its samples
+    # to PROMETHEUS_MULTIPROC_DIR and they are merged at scrape time.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
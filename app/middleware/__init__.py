@@ -0,0 +1,6 @@
+from .metrics_middleware import MetricsMiddleware
+from .profiler_middleware import ProfilerMiddleware
+from .decompression_middleware import RequestDecompressionMiddleware
+from .compression_middleware import ResponseCompressionMiddleware
+
+__all__ = ["MetricsMiddleware", "ProfilerMiddleware", "RequestDecompressionMiddleware", "ResponseCompressionMiddleware"]
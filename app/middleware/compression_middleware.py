@@ -0,0 +1,94 @@
+import os
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from compression import compressor, is_compressible, response_encoding
+
+# Responses smaller than this are sent as is; compressing them costs more than it saves.
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+
+
+class ResponseCompressionMiddleware:
+    """
+    Compresses text and JSON responses with brotli or gzip, whichever the client accepts.
+    Bodies below the size threshold, already encoded responses (stored documents sent with
+    their at-rest encoding) and partial content are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = response_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, CompressingSend(send, encoding, self.minimum_size))
+
+
+class CompressingSend:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compress = None
+        self.flush = None
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message["type"] == "http.response.start":
+            # Held back until the first body message shows whether compressing is worth it.
+            self.start = message
+            return
+        if self.start is None:
+            await self._send_compressed(message)
+            return
+
+        start, self.start = self.start, None
+        if message["type"] != "http.response.body" or not self._should_compress(start, message):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        self.compress, self.flush = compressor(self.encoding)
+        if not message.get("more_body", False):
+            body = self.compress(message.get("body", b"")) + self.flush()
+            headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        await self.send(start)
+        await self._send_compressed(message)
+
+    def _should_compress(self, start: Message, message: Message) -> bool:
+        headers = MutableHeaders(raw=start["headers"])
+        if start["status"] == 206 or "content-encoding" in headers or "content-range" in headers:
+            return False
+        if not is_compressible(headers.get("content-type")):
+            return False
+        return message.get("more_body", False) or len(message.get("body", b"")) >= self.minimum_size
+
+    async def _send_compressed(self, message: Message):
+        more_body = message.get("more_body", False)
+        body = self.compress(message.get("body", b""))
+        if not more_body:
+            body += self.flush()
+        if body or not more_body:
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
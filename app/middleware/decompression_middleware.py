@@ -0,0 +1,122 @@
+import os
+from typing import Optional
+from fastapi import status
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from compression import StreamDecompressor, supported_encodings
+
+# Highest accepted decompressed/compressed ratio; the slack lets small bodies of very
+# repetitive text through.
+MAX_DECOMPRESSION_RATIO = float(os.getenv("MAX_DECOMPRESSION_RATIO", "100"))
+DECOMPRESSION_RATIO_SLACK = 1024 * 1024
+# Upper bound for a decompressed body in bytes, 0 for none.
+MAX_DECOMPRESSED_BODY_SIZE = int(os.getenv("MAX_DECOMPRESSED_BODY_SIZE", "0"))
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+class RequestDecompressionMiddleware:
+    """
+    Decodes request bodies sent with Content-Encoding: gzip/zstd while they are received,
+    so handlers and multipart parsing see the plain body without it being buffered.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = headers.get(b"content-encoding", b"").decode("latin-1").strip().lower()
+        if not encoding or encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+        if encoding not in supported_encodings():
+            response = PlainTextResponse(f"Unsupported content encoding: {encoding}", status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+            await response(scope, receive, send)
+            return
+
+        # The body length changes, so drop the headers describing the encoded body. The scope is
+        # changed in place: outer middleware read what routing stores in it, e.g. the route.
+        scope["headers"] = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        decompressing_receive = DecompressingReceive(receive, StreamDecompressor(encoding))
+        response_started = False
+
+        async def send_unless_body_rejected(message: Message) -> None:
+            # Whatever the app makes of a body that failed to decode (form parsing turns it into
+            # a 400, handlers into a 500), the rejection is answered here instead.
+            nonlocal response_started
+            if not response_started and decompressing_receive.error is not None:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, decompressing_receive, send_unless_body_rejected)
+        except Exception:
+            if response_started or decompressing_receive.error is None:
+                raise
+        error = decompressing_receive.error
+        if error is not None and not response_started:
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+
+
+class BodyRejected(Exception):
+    """Raised to the app when the encoded body is malformed or expands too far."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class DecompressingReceive:
+    def __init__(self, receive: Receive, decompressor: StreamDecompressor) -> None:
+        self.receive = receive
+        self.decompressor = decompressor
+        self.compressed_size = 0
+        self.decompressed_size = 0
+        self.more_body = True
+        self.error: Optional[BodyRejected] = None
+
+    async def __call__(self) -> Message:
+        if self.error is not None:
+            raise self.error
+        while True:
+            try:
+                data = self.decompressor.read(BODY_CHUNK_SIZE)
+            except Exception:
+                self._reject(status.HTTP_400_BAD_REQUEST, "Malformed compressed body")
+            if data:
+                self._check_size(len(data))
+                return {"type": "http.request", "body": data, "more_body": True}
+            if not self.more_body:
+                if self.decompressor.truncated():
+                    self._reject(status.HTTP_400_BAD_REQUEST, "Truncated compressed body")
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            message = await self.receive()
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            self.more_body = message.get("more_body", False)
+            self.compressed_size += len(body)
+            self.decompressor.feed(body)
+
+    def _check_size(self, size: int):
+        self.decompressed_size += size
+        if self.decompressed_size > MAX_DECOMPRESSION_RATIO * self.compressed_size + DECOMPRESSION_RATIO_SLACK:
+            self._reject(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Decompressed body is too large for its compressed size")
+        if MAX_DECOMPRESSED_BODY_SIZE and self.decompressed_size > MAX_DECOMPRESSED_BODY_SIZE:
+            self._reject(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Decompressed body is too large")
+
+    def _reject(self, status_code: int, detail: str):
+        # Kept, so the middleware answers with it even if the app catches the exception.
+        self.error = BodyRejected(status_code, detail)
+        raise self.error
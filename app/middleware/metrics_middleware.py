@@ -0,0 +1,40 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from instrumentation import RequestStats, check_query_budget, current_request_stats
+from metrics import observe_request
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        response_size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            duration = time.perf_counter() - start
+            # Label by route template (/projects/{project_id}) rather than the raw path
+            # to keep the number of time series bounded.
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            observe_request(scope["method"], route_path, status_code, duration, stats, response_size)
+            check_query_budget(stats, scope["method"], route_path)
+            current_request_stats.reset(token)
@@ -0,0 +1,52 @@
+import asyncio
+import random
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from profiling import PROFILE_SAMPLE_RATE, SamplingProfiler, current_profiler, new_profile, profile_store, verify_profile_token
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+EXCLUDED_PATH_PREFIX = "/admin/profiles"
+
+
+class ProfilerMiddleware:
+    """Profiles requests that carry a valid profile token, or a random sample of all requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = new_profile(scope["method"], scope["path"])
+        profiler = SamplingProfiler(loop=asyncio.get_running_loop())
+        profiler.add_task(asyncio.current_task())
+
+        async def send_with_profile_id(message: Message) -> None:
+            # Response bodies may be sent from a task of their own.
+            profiler.add_task(asyncio.current_task())
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile.id.encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        profiler.start()
+        token = current_profiler.set(profiler)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            current_profiler.reset(token)
+            profile.stacks = profiler.stop()
+            profile.duration = time.perf_counter() - start
+            profile_store.add(profile)
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if scope["path"].startswith(EXCLUDED_PATH_PREFIX):
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                return verify_profile_token(value.decode("latin-1"))
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
@@ -2,5 +2,12 @@ from .user import User
 from .project import Project
 from .user_project import UserProject
 from .document import Document
+from .upload_session import UploadSession
+from .upload_chunk import UploadChunk
+from .project_stats import ProjectStats
+from .blob import Blob
+from .document_version import DocumentVersion
+from .document_version_block import DocumentVersionBlock
+from .document_change import DocumentChange
 
-__all__ = ["User", "Project", "UserProject", "Document"]
+__all__ = ["User", "Project", "UserProject", "Document", "UploadSession", "UploadChunk", "ProjectStats", "Blob", "DocumentVersion", "DocumentVersionBlock", "DocumentChange"]
@@ -0,0 +1,16 @@
+from db import Base
+from datetime import datetime
+from sqlalchemy import Integer, String, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class Blob(Base):
+    """A content-addressed block of document history, shared by every version containing it."""
+    __tablename__ = "blobs"
+
+    # sha256 of the uncompressed block, hex encoded.
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    content_encoding: Mapped[str|None] = mapped_column(String(16), nullable=True)
+    # Refreshed whenever a version references the blob; garbage collection skips recent blobs.
+    referenced_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
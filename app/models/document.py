@@ -1,7 +1,8 @@
 import typing
 from db import Base
 from datetime import datetime
-from sqlalchemy import String, TIMESTAMP, func, ForeignKey
+from sqlalchemy import BigInteger, Index, Integer, String, TIMESTAMP, func, ForeignKey, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if typing.TYPE_CHECKING:
@@ -10,14 +11,27 @@ if typing.TYPE_CHECKING:
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_documents_pending_index", "id", postgresql_where=text("indexed_at IS NULL")),
+    )
 
     DOCUMENTS_URL = "/projects/{project_id}/documents"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), index=True)
     filename: Mapped[str] = mapped_column(String(128), nullable=False)
-    file_type: Mapped[str] = mapped_column(String(16), nullable=False)
+    file_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Encoding of the stored file (gzip, zstd), None when it is stored as uploaded.
+    content_encoding: Mapped[str|None] = mapped_column(String(16), nullable=True)
+    # Original size in bytes, before compression at rest.
+    size: Mapped[int|None] = mapped_column(BigInteger, nullable=True)
+    # Number of the current content; earlier ones are kept in document_versions.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
+    # Filled by the indexing job for text documents; deferred so listings never load it.
+    search_vector: Mapped[str|None] = mapped_column(TSVECTOR, nullable=True, deferred=True)
+    indexed_at: Mapped[datetime|None] = mapped_column(TIMESTAMP, nullable=True)
 
     project: Mapped["Project"] = relationship(back_populates="documents")
 
@@ -0,0 +1,21 @@
+from db import Base
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, Integer, String, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+from models.enums import ChangeAction
+
+
+class DocumentChange(Base):
+    """
+    An entry of a project's change feed. `seq` grows by one per change within a project, in
+    commit order. `document_id` has no foreign key, so deletions stay in the feed.
+    """
+    __tablename__ = "document_changes"
+
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    document_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[ChangeAction] = mapped_column(nullable=False)
+    filename: Mapped[str] = mapped_column(String(128), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), index=True)
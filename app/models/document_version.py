@@ -0,0 +1,22 @@
+from db import Base
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, Integer, String, TIMESTAMP, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class DocumentVersion(Base):
+    """Immutable earlier content of a document, stored as a list of blobs."""
+    __tablename__ = "document_versions"
+    __table_args__ = (
+        UniqueConstraint("document_id", "version", name="uq_document_versions_document_id_version"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    filename: Mapped[str] = mapped_column(String(128), nullable=False)
+    file_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    # When this content was replaced by a newer version.
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
@@ -1,3 +1,4 @@
 from .role import Role
+from .change_action import ChangeAction
 
-__all__ = ["Role"]
+__all__ = ["Role", "ChangeAction"]
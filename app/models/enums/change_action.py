@@ -0,0 +1,6 @@
+from enum import Enum
+
+class ChangeAction(str, Enum):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
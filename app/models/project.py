@@ -14,13 +14,16 @@ class Project(Base):
     __tablename__ = "projects"
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    # Searched through the ix_projects_name_trgm GIN index where pg_trgm is installed.
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     description: Mapped[str|None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
-    documents: Mapped[List["Document"]] = relationship(back_populates="project", cascade="all, delete-orphan")
-    users_assoc: Mapped[List["UserProject"]] = relationship(back_populates="project", cascade="all, delete-orphan")
+    # The database cascades deletes (ON DELETE CASCADE), so deleting a project
+    # does not need to load these collections first.
+    documents: Mapped[List["Document"]] = relationship(back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    users_assoc: Mapped[List["UserProject"]] = relationship(back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
     users: Mapped[List["User"]] = relationship(
         secondary="user_project",
@@ -30,7 +33,7 @@ class Project(Base):
 
     admins: Mapped[List["User"]] = relationship(
         secondary="user_project",
-        primaryjoin=f"and_(Project.id == UserProject.project_id, UserProject.role == '{Role.admin}')",
+        primaryjoin=f"and_(Project.id == UserProject.project_id, UserProject.role == '{Role.admin.value}')",
         secondaryjoin="UserProject.user_id == User.id",
         back_populates="own_projects",
         viewonly=True
@@ -38,7 +41,7 @@ class Project(Base):
 
     participants: Mapped[List["User"]] = relationship(
         secondary="user_project",
-        primaryjoin=f"and_(Project.id == UserProject.project_id, UserProject.role == '{Role.participant}')",
+        primaryjoin=f"and_(Project.id == UserProject.project_id, UserProject.role == '{Role.participant.value}')",
         secondaryjoin="UserProject.user_id == User.id",
         back_populates="participant_projects",
         viewonly=True
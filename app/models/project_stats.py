@@ -0,0 +1,17 @@
+from db import Base
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, Integer, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ProjectStats(Base):
+    """Per-project counters, changed in the same transaction as the rows they count."""
+    __tablename__ = "project_stats"
+
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    document_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    member_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_activity_at: Mapped[datetime|None] = mapped_column(TIMESTAMP, nullable=True)
+    # Sequence number of the last entry in the project's document change feed.
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,12 @@
+from db import Base
+from sqlalchemy import BigInteger, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class UploadChunk(Base):
+    """A byte range of an upload session that has been written to its staging file."""
+    __tablename__ = "upload_chunks"
+
+    session_id: Mapped[str] = mapped_column(String(32), ForeignKey("upload_sessions.id", ondelete="CASCADE"), primary_key=True)
+    offset: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
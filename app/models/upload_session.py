@@ -0,0 +1,17 @@
+from db import Base
+from datetime import datetime
+from sqlalchemy import BigInteger, ForeignKey, String, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    filename: Mapped[str] = mapped_column(String(128), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    length: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
+    expires_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, index=True)
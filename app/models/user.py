@@ -14,6 +14,7 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True)
+    # Prefix searches use the ix_users_username_prefix index on lower(username) COLLATE "C".
     username: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
     password: Mapped[str] = mapped_column(String(256), nullable=False)
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
@@ -29,7 +30,7 @@ class User(Base):
 
     own_projects: Mapped[list["Project"]] = relationship(
         secondary="user_project",
-        primaryjoin=f"and_(User.id == UserProject.user_id, UserProject.role == '{Role.admin}')",
+        primaryjoin=f"and_(User.id == UserProject.user_id, UserProject.role == '{Role.admin.value}')",
         secondaryjoin="UserProject.project_id == Project.id",
         viewonly=True,
         back_populates="admins"
@@ -37,7 +38,7 @@ class User(Base):
 
     participant_projects: Mapped[list["Project"]] = relationship(
         secondary="user_project",
-        primaryjoin=f"and_(User.id == UserProject.user_id, UserProject.role == '{Role.participant}')",
+        primaryjoin=f"and_(User.id == UserProject.user_id, UserProject.role == '{Role.participant.value}')",
         secondaryjoin="UserProject.project_id == Project.id",
         viewonly=True,
         back_populates="participants"
@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import anyio.to_thread
+import jwt
+
+PROFILER_KEY = os.getenv("PROFILER_KEY") or os.getenv("APP_KEY")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "50"))
+PROFILE_TOKEN_EXPIRE_MINUTES = 60
+ALGORITHM = "HS256"
+
+# Innermost frames of threads that are parked waiting for work. Samples ending in
+# one of these are dropped so idle event loop and threadpool time is not reported.
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("_asyncio_backend.py", "run"),
+}
+
+
+def create_profile_token(expire_minutes: int = PROFILE_TOKEN_EXPIRE_MINUTES) -> str:
+    expire = datetime.now() + timedelta(minutes=expire_minutes)
+    return jwt.encode({"scope": "profile", "exp": expire}, PROFILER_KEY, algorithm=ALGORITHM)
+
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, PROFILER_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return False
+    return payload.get("scope") == "profile"
+
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    started_at: datetime
+    duration: float = 0.0
+    status: int | None = None
+    stacks: Counter = field(default_factory=Counter)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format understood by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """
+    Periodically records the Python stacks of one request from a background thread. Only the
+    request's own work is sampled: the event loop thread while it runs one of the request's
+    tasks, and threads attached with `attach_thread` while they work for it.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.interval = interval
+        self.loop = loop
+        self.stacks: Counter = Counter()
+        self._loop_thread_id = threading.get_ident() if loop is not None else None
+        self._tasks: set[asyncio.Task] = set()
+        self._thread_ids: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def add_task(self, task: asyncio.Task | None):
+        """Sample the event loop thread while it runs `task`."""
+        if task is not None:
+            with self._lock:
+                self._tasks.add(task)
+
+    @contextmanager
+    def attach_thread(self):
+        """Sample the calling thread until the block exits."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._thread_ids[thread_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._thread_ids[thread_id] -= 1
+                if not self._thread_ids[thread_id]:
+                    del self._thread_ids[thread_id]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                thread_ids = set(self._thread_ids)
+                if self.loop is not None and asyncio.current_task(self.loop) in self._tasks:
+                    thread_ids.add(self._loop_thread_id)
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                if thread_id in frames:
+                    self._record(frames[thread_id])
+
+    def _record(self, frame):
+        if (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Keeps the most recent profiles in memory."""
+
+    def __init__(self, max_size: int = PROFILE_STORE_SIZE) -> None:
+        self.max_size = max_size
+        self._profiles: OrderedDict[str, Profile] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Profile | None:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore()
+# Profiler of the request being handled, if it is profiled.
+current_profiler: ContextVar[SamplingProfiler | None] = ContextVar("current_profiler", default=None)
+
+
+def new_profile(method: str, path: str) -> Profile:
+    return Profile(id=uuid.uuid4().hex, method=method, path=path, started_at=datetime.now())
+
+
+@contextmanager
+def profile_thread():
+    """Attach the calling thread to the current request's profiler, if the request is profiled."""
+    profiler = current_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.attach_thread():
+        yield
+
+
+def instrument_threadpool():
+    """
+    Attach anyio worker threads to the profiler of the request that hands them work. Starlette
+    and FastAPI run sync routes, sync dependencies and sync response iterators through
+    anyio.to_thread.run_sync, so wrapping it samples that work as well.
+    """
+    run_sync = anyio.to_thread.run_sync
+    if getattr(run_sync, "profiled", False):
+        return
+
+    @functools.wraps(run_sync)
+    async def profiled_run_sync(func, *args, **kwargs):
+        profiler = current_profiler.get()
+        if profiler is not None:
+            work = func
+
+            def func(*args):
+                with profiler.attach_thread():
+                    return work(*args)
+
+        return await run_sync(func, *args, **kwargs)
+
+    profiled_run_sync.profiled = True
+    anyio.to_thread.run_sync = profiled_run_sync
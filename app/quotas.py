@@ -0,0 +1,70 @@
+import os
+import threading
+from typing import Dict, Optional
+
+# Hard storage limits, 0 disables a limit. User limits cover every project the user owns
+# (is admin of), since documents are charged to the owner of their project.
+PROJECT_MAX_BYTES = int(os.getenv("PROJECT_MAX_BYTES", "0"))
+PROJECT_MAX_DOCUMENTS = int(os.getenv("PROJECT_MAX_DOCUMENTS", "0"))
+USER_MAX_BYTES = int(os.getenv("USER_MAX_BYTES", "0"))
+USER_MAX_DOCUMENTS = int(os.getenv("USER_MAX_DOCUMENTS", "0"))
+
+
+class QuotaExceededError(Exception):
+    pass
+
+
+class ByteBudget:
+    """Bytes that writes may still add; shared by the files of one batch written concurrently."""
+
+    def __init__(self, remaining: int) -> None:
+        self.remaining = remaining
+        self._lock = threading.Lock()
+
+    def take(self, size: int):
+        with self._lock:
+            if size > self.remaining:
+                raise QuotaExceededError("Storage quota exceeded")
+            self.remaining -= size
+
+
+def quotas_enabled() -> bool:
+    return bool(PROJECT_MAX_BYTES or PROJECT_MAX_DOCUMENTS or user_quotas_enabled())
+
+
+def user_quotas_enabled() -> bool:
+    return bool(USER_MAX_BYTES or USER_MAX_DOCUMENTS)
+
+
+def byte_quotas_enabled() -> bool:
+    return bool(PROJECT_MAX_BYTES or USER_MAX_BYTES)
+
+
+def remaining_bytes(project_bytes: int, owner_bytes: Optional[int] = None) -> Optional[int]:
+    """Bytes that may still be stored in a project, None when no byte limit applies."""
+    remaining = []
+    if PROJECT_MAX_BYTES:
+        remaining.append(PROJECT_MAX_BYTES - project_bytes)
+    if USER_MAX_BYTES and owner_bytes is not None:
+        remaining.append(USER_MAX_BYTES - owner_bytes)
+    return max(min(remaining), 0) if remaining else None
+
+
+def check_usage(project_documents: int, project_bytes: int,
+                owner_documents: Optional[int] = None, owner_bytes: Optional[int] = None):
+    """Raise QuotaExceededError when the given usage is over any of the limits."""
+    if PROJECT_MAX_DOCUMENTS and project_documents > PROJECT_MAX_DOCUMENTS:
+        raise QuotaExceededError(f"Projects are limited to {PROJECT_MAX_DOCUMENTS} documents")
+    if PROJECT_MAX_BYTES and project_bytes > PROJECT_MAX_BYTES:
+        raise QuotaExceededError(f"Projects are limited to {PROJECT_MAX_BYTES} bytes")
+    if USER_MAX_DOCUMENTS and owner_documents is not None and owner_documents > USER_MAX_DOCUMENTS:
+        raise QuotaExceededError(f"Users are limited to {USER_MAX_DOCUMENTS} documents across their projects")
+    if USER_MAX_BYTES and owner_bytes is not None and owner_bytes > USER_MAX_BYTES:
+        raise QuotaExceededError(f"Users are limited to {USER_MAX_BYTES} bytes across their projects")
+
+
+def usage_report(documents: int, total_bytes: int, max_documents: int, max_bytes: int) -> Dict:
+    return {
+        "documents": {"used": documents, "limit": max_documents or None},
+        "bytes": {"used": total_bytes, "limit": max_bytes or None}
+    }
@@ -1,5 +1,9 @@
 from .user_repository import UserRepository
 from .project_repository import ProjectRepository
 from .document_repository import DocumentRepository
+from .upload_repository import UploadRepository
+from .project_stats_repository import ProjectStatsRepository
+from .document_version_repository import DocumentVersionRepository
+from .document_change_repository import DocumentChangeRepository
 
-__all__ = ["UserRepository", "ProjectRepository", "DocumentRepository"]
+__all__ = ["UserRepository", "ProjectRepository", "DocumentRepository", "UploadRepository", "ProjectStatsRepository", "DocumentVersionRepository", "DocumentChangeRepository"]
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from typing import List, Tuple
+from models import DocumentChange, ProjectStats
+from models.enums import ChangeAction
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+
+class DocumentChangeRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def record(self, project_id: int, changes: List[Tuple[int, ChangeAction, str, int]]):
+        """
+        Append (document id, action, filename, version) entries to the project's change feed.
+        Does not commit. Sequence numbers come from the project's project_stats row, which stays
+        locked until commit, so writers to one project commit in sequence order and a reader
+        that saw `n` never finds a smaller number appear later.
+        """
+        if not changes:
+            return
+        statement = pg_insert(ProjectStats).values(project_id=project_id, change_seq=len(changes))
+        last_seq = self.db.execute(statement.on_conflict_do_update(
+            index_elements=[ProjectStats.project_id],
+            set_={"change_seq": ProjectStats.change_seq + statement.excluded.change_seq}
+        ).returning(ProjectStats.change_seq)).scalar_one()
+
+        first_seq = last_seq - len(changes) + 1
+        self.db.execute(insert(DocumentChange).values([
+            {
+                "project_id": project_id,
+                "seq": first_seq + offset,
+                "document_id": document_id,
+                "action": action,
+                "filename": filename,
+                "version": version
+            }
+            for offset, (document_id, action, filename, version) in enumerate(changes)
+        ]))
+
+    def get_cursor(self, project_id: int) -> int:
+        """Sequence number of the project's latest change, 0 before the first one."""
+        return self.db.query(ProjectStats.change_seq).filter(ProjectStats.project_id == project_id).scalar() or 0
+
+    def get_changes(self, project_id: int, since: int, limit: int) -> List[DocumentChange]:
+        return self.db.query(DocumentChange).filter(
+            DocumentChange.project_id == project_id, DocumentChange.seq > since
+        ).order_by(DocumentChange.seq).limit(limit).all()
+
+    def prune(self, max_age: timedelta, limit: int) -> int:
+        """Delete up to `limit` changes older than `max_age`."""
+        expired = select(DocumentChange.project_id, DocumentChange.seq).where(
+            DocumentChange.created_at < func.now() - max_age).limit(limit)
+        result = self.db.execute(
+            delete(DocumentChange)
+            .where(tuple_(DocumentChange.project_id, DocumentChange.seq).in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
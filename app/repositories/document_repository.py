@@ -1,69 +1,411 @@
 import os
-from models import Document, Project
-from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from models import Document, DocumentChange, DocumentVersion, Project
+from models.enums import ChangeAction
+from sqlalchemy import cast, func, insert, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session, load_only
 from schemas import UploadedDocument
+from instrumentation import track_storage_io
+from compression import iter_file, read_chunks, storage_encoding, write_chunks
+from delta import BaseReader, ChunkReader, apply_delta, signature
+from quotas import ByteBudget
+from .document_change_repository import DocumentChangeRepository
+from .document_version_repository import DocumentVersionRepository
+from .project_stats_repository import ProjectStatsRepository
+from .streaming import stream_scalars
+
+
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "8"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Text search configuration used for both indexing and queries.
+SEARCH_LANGUAGE = os.getenv("SEARCH_LANGUAGE", "english")
 
 
 class DocumentRepository:
     STORAGE_PATH = "./{storage_directory}/documents/{project_id}"
+    # Response fields computed from other columns.
+    DERIVED_FIELDS = {"url": ("id", "project_id")}
 
     def __init__(self, db: Session, use_test_dir: bool = False) -> None:
         self.db = db
         self.storage_dir = os.getenv("TEST_STORAGE_DIR", "data-test") if use_test_dir else os.getenv("STORAGE_DIR", "data")
+        self.stats = ProjectStatsRepository(db)
+        self.versions = DocumentVersionRepository(db, self.storage_dir)
+        self.changes = DocumentChangeRepository(db)
 
-    def get_project_document_by_id(self, project_id: int, document_id: int) -> Document:
-        return self.db.query(Document).filter(Document.project_id == project_id, Document.id == document_id).first()
+    def get_project_document_by_id(self, project_id: int, document_id: int, lock: bool = False) -> Document:
+        """With `lock` the row stays locked until commit, so concurrent updates apply one after the other."""
+        query = self.db.query(Document).filter(Document.project_id == project_id, Document.id == document_id)
+        if lock:
+            query = query.with_for_update()
+        return query.first()
 
     def get_project_document_by_filename(self, project_id: int, filename):
         return self.db.query(Document).filter(Document.project_id == project_id, Document.filename == filename).first()
 
-    def get_documents_of_project(self, project: Project):
-        return project.documents
+    def get_documents_of_project(self, project: Project, fields: Optional[Sequence[str]] = None):
+        return self.db.query(Document).options(*self._load_only(fields)).filter(
+            Document.project_id == project.id).order_by(Document.id).all()
+
+    def stream_documents_of_project(self, project: Project, fields: Optional[Sequence[str]] = None) -> Iterator[Document]:
+        statement = select(Document).options(*self._load_only(fields)).where(
+            Document.project_id == project.id).order_by(Document.id)
+        return stream_scalars(self.db, statement)
+
+    def filter_documents_of_project(self, project: Project, document_ids: Optional[List[int]] = None, file_type: Optional[str] = None):
+        query = self.db.query(Document).filter(Document.project_id == project.id)
+        if document_ids:
+            query = query.filter(Document.id.in_(document_ids))
+        if file_type:
+            query = query.filter(Document.file_type == file_type)
+        return query.order_by(Document.id).all()
+
+    def get_filenames_of_project(self, project_id: int) -> Set[str]:
+        rows = self.db.query(Document.filename).filter(Document.project_id == project_id).all()
+        return {filename for filename, in rows}
+
+    def get_existing_filenames(self, project_id: int, filenames: List[str]) -> Set[str]:
+        rows = self.db.query(Document.filename).filter(
+            Document.project_id == project_id, Document.filename.in_(filenames)).all()
+        return {filename for filename, in rows}
+
+    def check_quota(self, project_id: int, documents: int = 0, total_bytes: int = 0):
+        self.stats.check_quota(project_id, documents, total_bytes)
+
+    def remaining_bytes(self, project_id: int) -> Optional[int]:
+        return self.stats.remaining_bytes(project_id)
 
     def create_project_document(self, project_id: int, file: UploadedDocument):
         new_document = Document(
             project_id=project_id,
             filename=file.filename,
-            file_type=file.content_type
+            file_type=file.content_type,
+            content_encoding=storage_encoding(file.content_type)
         )
+        path = self.get_document_path(new_document)
+        max_size = self.stats.remaining_bytes(project_id)
 
-        self.db.add(new_document)
-        self.db.commit()
-        self.db.refresh(new_document)
+        try:
+            with track_storage_io():
+                os.makedirs(DocumentRepository.STORAGE_PATH.format(
+                    storage_directory=self.storage_dir, project_id=project_id), exist_ok=True)
 
-        os.makedirs(DocumentRepository.STORAGE_PATH.format(
-            storage_directory=self.storage_dir, project_id=project_id), exist_ok=True)
+                new_document.size = self._write_file(path, file, new_document.content_encoding, max_size)
 
-        with open(self.get_document_path(new_document), "wb") as buffer:
-            buffer.write(file.content)
+            self.db.add(new_document)
+            self.stats.add(project_id, documents=1, total_bytes=new_document.size, enforce_quota=True)
+            self.db.flush()
+            self.changes.record(project_id, [(new_document.id, ChangeAction.created, new_document.filename, 1)])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self._remove_files([path])
+            raise
+        self.db.refresh(new_document)
 
         return new_document
 
+    def create_project_documents(self, project_id: int, files: List[UploadedDocument]) -> List[Document]:
+        """
+        Store many uploads at once: all rows go in with one transaction and the files
+        are written concurrently. If any write fails nothing is kept.
+        """
+        new_documents = [
+            Document(
+                project_id=project_id,
+                filename=file.filename,
+                file_type=file.content_type,
+                content_encoding=storage_encoding(file.content_type)
+            )
+            for file in files
+        ]
+        if not new_documents:
+            return []
+
+        self.db.add_all(new_documents)
+        self.db.flush()
+
+        paths = [self.get_document_path(document) for document in new_documents]
+        encodings = [document.content_encoding for document in new_documents]
+        # The files draw on one budget, so together they stop at the remaining quota; the sum is
+        # checked again with the counters.
+        remaining = self.stats.remaining_bytes(project_id)
+        budgets = [ByteBudget(remaining) if remaining is not None else None] * len(files)
+        try:
+            with track_storage_io():
+                os.makedirs(DocumentRepository.STORAGE_PATH.format(
+                    storage_directory=self.storage_dir, project_id=project_id), exist_ok=True)
+                with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+                    # list() re-raises the first failed write
+                    sizes = list(executor.map(self._write_file, paths, files, encodings, budgets))
+
+            for document, size in zip(new_documents, sizes):
+                document.size = size
+            ids = [document.id for document in new_documents]
+            self.stats.add(project_id, documents=len(new_documents), total_bytes=sum(sizes), enforce_quota=True)
+            self.changes.record(project_id, [
+                (document.id, ChangeAction.created, document.filename, 1) for document in new_documents])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self._remove_files(paths)
+            raise
+
+        # Reload the expired rows with one query instead of one refresh per document.
+        self.db.query(Document).filter(Document.id.in_(ids)).all()
+        return new_documents
+
+    def import_project_documents(self, project_id: int, files: Iterable[UploadedDocument]) -> int:
+        """
+        Write each file to storage as it is produced and insert the rows with one multi-row
+        INSERT per batch. Every batch is committed on its own, so an interrupted import keeps
+        what it already stored and can be re-run for the rest.
+        """
+        with track_storage_io():
+            os.makedirs(DocumentRepository.STORAGE_PATH.format(
+                storage_directory=self.storage_dir, project_id=project_id), exist_ok=True)
+
+        imported = 0
+        rows: List[Dict] = []
+        paths: List[str] = []
+        remaining = self.stats.remaining_bytes(project_id)
+        try:
+            for file in files:
+                path = self._get_storage_path(project_id, file.filename)
+                paths.append(path)
+                encoding = storage_encoding(file.content_type)
+                with track_storage_io():
+                    size = self._write_file(path, file, encoding, remaining)
+                if remaining is not None:
+                    remaining -= size
+                rows.append({
+                    "project_id": project_id,
+                    "filename": file.filename,
+                    "file_type": file.content_type,
+                    "content_encoding": encoding,
+                    "size": size
+                })
+
+                if len(rows) >= IMPORT_BATCH_SIZE:
+                    self._insert_batch(rows)
+                    imported += len(rows)
+                    rows, paths = [], []
+            if rows:
+                self._insert_batch(rows)
+                imported += len(rows)
+        except Exception:
+            self.db.rollback()
+            self._remove_files(paths)
+            raise
+
+        return imported
+
+    def _load_only(self, fields: Optional[Sequence[str]]) -> List:
+        """Loader options narrowing the SELECT to the requested fields, none to load every column."""
+        if not fields:
+            return []
+        columns: Dict[str, None] = {}
+        for name in fields:
+            columns.update(dict.fromkeys(self.DERIVED_FIELDS.get(name, (name,))))
+        return [load_only(*(getattr(Document, column) for column in columns))]
+
+    def _insert_batch(self, rows: List[Dict]):
+        project_id = rows[0]["project_id"]
+        inserted = self.db.execute(insert(Document).values(rows).returning(Document.id, Document.filename)).all()
+        self.stats.add(project_id, documents=len(rows), total_bytes=sum(row["size"] for row in rows), enforce_quota=True)
+        self.changes.record(project_id, [
+            (document_id, ChangeAction.created, filename, 1) for document_id, filename in sorted(inserted)])
+        self.db.commit()
+
+    def search_documents(self, project: Project, query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[Document, float]]]:
+        """Return the number of matches and one page of (document, rank), best match first."""
+        ts_query = func.websearch_to_tsquery(cast(SEARCH_LANGUAGE, REGCONFIG), query)
+        matches = self.db.query(Document).filter(
+            Document.project_id == project.id, Document.search_vector.op("@@")(ts_query))
+        total = matches.count()
+        if not total:
+            return 0, []
+
+        rank = func.ts_rank_cd(Document.search_vector, ts_query)
+        rows = matches.add_columns(rank).order_by(rank.desc(), Document.id).limit(limit).offset(offset).all()
+        return total, [(document, score) for document, score in rows]
+
+    def fill_missing_sizes(self, limit: int) -> int:
+        """
+        Record the size of up to `limit` documents stored before sizes were, read from their
+        files; a missing file counts as empty. Returns the number of documents filled in.
+        """
+        documents = self.db.query(Document.id, Document.project_id, Document.filename, Document.content_encoding).filter(
+            Document.size.is_(None)).order_by(Document.id).limit(limit).all()
+        for document in documents:
+            with track_storage_io():
+                size = self._get_stored_size(self._get_storage_path(document.project_id, document.filename), document.content_encoding)
+            # Skipped if the document was replaced meanwhile and already has its new size.
+            self.db.query(Document).filter(Document.id == document.id, Document.size.is_(None)).update(
+                {Document.size: size}, synchronize_session=False)
+        self.db.commit()
+        return len(documents)
+
+    @staticmethod
+    def _get_stored_size(path: str, encoding: Optional[str]) -> int:
+        try:
+            if encoding is None:
+                return os.path.getsize(path)
+            return sum(len(chunk) for chunk in read_chunks(path, encoding))
+        except FileNotFoundError:
+            return 0
+
+    def get_unindexed_documents(self, limit: int) -> List[Document]:
+        return self.db.query(Document).filter(Document.indexed_at.is_(None)).order_by(Document.id).limit(limit).all()
+
+    def read_text(self, document: Document, max_size: int) -> str:
+        """Read up to `max_size` bytes of a stored document as text."""
+        data = bytearray()
+        with track_storage_io():
+            chunks = read_chunks(self.get_document_path(document), document.content_encoding)
+            try:
+                for chunk in chunks:
+                    data += chunk
+                    if len(data) >= max_size:
+                        break
+            finally:
+                chunks.close()
+        # Postgres text cannot hold NUL characters.
+        return data[:max_size].decode("utf-8", errors="ignore").replace("\x00", " ")
+
+    def set_search_texts(self, texts: Dict[int, Optional[str]]):
+        """Index the given text per document id; None marks a document as indexed without content."""
+        for document_id, content in texts.items():
+            vector = func.to_tsvector(cast(SEARCH_LANGUAGE, REGCONFIG), content) if content else None
+            self.db.query(Document).filter(Document.id == document_id).update(
+                {Document.search_vector: vector, Document.indexed_at: func.now()}, synchronize_session=False)
+        self.db.commit()
+
     def update_project_document(self, document: Document, file: UploadedDocument):
-        os.remove(self.get_document_path(document))
+        """
+        Replace the content of a document. The new content goes to a temporary file first, so
+        the stored version survives a failed or over-quota upload. The replaced content is kept
+        as an immutable version.
+        """
+        previous_size = document.size or 0
+        previous_path = self.get_document_path(document)
+        previous = (document.version, document.filename, document.file_type, document.content_encoding)
+        remaining = self.stats.remaining_bytes(document.project_id)
+        # The old content is freed by the replacement.
+        max_size = remaining + previous_size if remaining is not None else None
 
         if file.filename is not None:
             document.filename = file.filename
         if file.content_type is not None:
             document.file_type = file.content_type
+        document.content_encoding = storage_encoding(document.file_type)
+        # Picked up again by the indexing job.
+        document.search_vector = None
+        document.indexed_at = None
+        document.version += 1
 
-        self.db.commit()
-        self.db.refresh(document)
+        path = self.get_document_path(document)
+        temporary_path = f"{path}.uploading"
+        try:
+            with track_storage_io():
+                document.size = self._write_file(temporary_path, file, document.content_encoding, max_size)
 
-        with open(self.get_document_path(document), "wb") as buffer:
-            buffer.write(file.content)
+            self.stats.add(document.project_id, total_bytes=document.size - previous_size, enforce_quota=True)
+            self._create_version(document.id, previous_path, *previous)
+            self.changes.record(document.project_id, [(document.id, ChangeAction.updated, document.filename, document.version)])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self._remove_files([temporary_path])
+            raise
+
+        with track_storage_io():
+            os.replace(temporary_path, path)
+            if previous_path != path:
+                self._remove_files([previous_path])
+        self.db.refresh(document)
 
         return document
 
+    def get_signature(self, document: Document, block_size: int) -> Dict:
+        """Checksums of the current content in blocks of `block_size`, for clients building a delta."""
+        with track_storage_io():
+            size, blocks = signature(read_chunks(self.get_document_path(document), document.content_encoding), block_size)
+        return {"size": size, "blocks": blocks}
+
+    def apply_delta(self, document: Document, delta: BinaryIO, block_size: int, sha256: str) -> Document:
+        """
+        Replace the content of a document with the result of a delta against its current content.
+        The result is streamed into the regular update, so it is checked against the quota and
+        kept only if its sha256 matches.
+        """
+        with BaseReader(self.get_document_path(document), document.content_encoding) as base:
+            content = ChunkReader(apply_delta(delta, base, block_size, sha256))
+            return self.update_project_document(document, UploadedDocument(filename=None, content_type=None, stream=content))
+
+    def get_change_cursor(self, project_id: int) -> int:
+        return self.changes.get_cursor(project_id)
+
+    def get_changes(self, project_id: int, since: int, limit: int) -> List[DocumentChange]:
+        return self.changes.get_changes(project_id, since, limit)
+
+    def get_versions(self, document: Document) -> List[DocumentVersion]:
+        return self.versions.get_versions(document.id)
+
+    def get_version(self, document: Document, version: int) -> DocumentVersion|None:
+        return self.versions.get_version(document.id, version)
+
+    def read_version(self, version: DocumentVersion) -> Iterator[bytes]:
+        return self.versions.read_version(version)
+
+    def _create_version(self, document_id: int, path: str, version: int, filename: str, file_type: str, encoding: Optional[str]):
+        if not os.path.exists(path):
+            return
+        with track_storage_io():
+            self.versions.create_version(document_id, version, filename, file_type, read_chunks(path, encoding))
+
     def delete_project_document(self, document: Document):
         try:
-            os.remove(self.get_document_path(document))
+            with track_storage_io():
+                os.remove(self.get_document_path(document))
         except FileNotFoundError:
             pass
 
+        self.stats.add(document.project_id, documents=-1, total_bytes=-(document.size or 0))
+        self.changes.record(document.project_id, [(document.id, ChangeAction.deleted, document.filename, document.version)])
         self.db.delete(document)
         self.db.commit()
 
+    def _write_file(self, path: str, file: UploadedDocument, encoding: Optional[str] = None, max_size: Optional[int | ByteBudget] = None) -> int:
+        """
+        Write an upload to `path`, compressed with `encoding`, and return its original size.
+        Stops with QuotaExceededError as soon as more than `max_size` bytes came in, or more
+        than a budget shared with other writes has left.
+        """
+        chunks = iter_file(file.stream) if file.stream is not None else [file.content]
+        if max_size is not None:
+            chunks = self._limit_size(chunks, max_size if isinstance(max_size, ByteBudget) else ByteBudget(max_size))
+        with open(path, "wb") as buffer:
+            return write_chunks(buffer, chunks, encoding)
+
+    @staticmethod
+    def _limit_size(chunks: Iterable[bytes], budget: ByteBudget) -> Iterator[bytes]:
+        for chunk in chunks:
+            budget.take(len(chunk))
+            yield chunk
+
+    def _remove_files(self, paths: Iterable[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
     def get_document_path(self, document: Document) -> str:
+        return self._get_storage_path(document.project_id, document.filename)
+
+    def _get_storage_path(self, project_id: int, filename: str) -> str:
         return os.path.join(self.STORAGE_PATH.format(
-            storage_directory=self.storage_dir, project_id=document.project_id), f"{document.filename}")
+            storage_directory=self.storage_dir, project_id=project_id), f"{filename}")
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import uuid
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from models import Blob, DocumentVersion, DocumentVersionBlock
+from sqlalchemy import delete, exists, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from instrumentation import track_storage_io
+from compression import iter_content_blocks, read_chunks, storage_encoding, write_chunks
+
+
+# History is deduplicated in content-defined blocks of about this size: a version only adds the
+# blocks that changed, and an insertion or deletion does not shift the blocks after it.
+VERSION_BLOCK_SIZE = int(os.getenv("VERSION_BLOCK_SIZE", str(1024 * 1024)))
+VERSION_INSERT_BATCH_SIZE = 1000
+
+
+class DocumentVersionRepository:
+    BLOB_PATH = "./{storage_directory}/blobs/{prefix}"
+
+    def __init__(self, db: Session, storage_dir: str) -> None:
+        self.db = db
+        self.storage_dir = storage_dir
+
+    def get_versions(self, document_id: int) -> List[DocumentVersion]:
+        return self.db.query(DocumentVersion).filter(
+            DocumentVersion.document_id == document_id).order_by(DocumentVersion.version.desc()).all()
+
+    def get_version(self, document_id: int, version: int) -> DocumentVersion|None:
+        return self.db.query(DocumentVersion).filter(
+            DocumentVersion.document_id == document_id, DocumentVersion.version == version).first()
+
+    def create_version(self, document_id: int, version: int, filename: str, file_type: str, chunks: Iterable[bytes]) -> DocumentVersion:
+        """
+        Record the content in `chunks` as `version` of a document. Blocks already stored for any
+        version are referenced instead of written again. Does not commit: the version belongs
+        to the transaction that replaces the content.
+        """
+        encoding = storage_encoding(file_type)
+        digest = hashlib.sha256()
+        size = 0
+        hashes: List[str] = []
+        stored: Set[str] = set()
+        for block in iter_content_blocks(chunks, VERSION_BLOCK_SIZE):
+            digest.update(block)
+            size += len(block)
+            block_hash = hashlib.sha256(block).hexdigest()
+            if block_hash not in stored:
+                self._store_blob(block_hash, block, encoding)
+                stored.add(block_hash)
+            hashes.append(block_hash)
+
+        document_version = DocumentVersion(
+            document_id=document_id,
+            version=version,
+            filename=filename,
+            file_type=file_type,
+            size=size,
+            sha256=digest.hexdigest()
+        )
+        self.db.add(document_version)
+        self.db.flush()
+
+        block_rows = [{"version_id": document_version.id, "position": position, "blob_hash": block_hash}
+                      for position, block_hash in enumerate(hashes)]
+        for start in range(0, len(block_rows), VERSION_INSERT_BATCH_SIZE):
+            self.db.execute(insert(DocumentVersionBlock).values(block_rows[start:start + VERSION_INSERT_BATCH_SIZE]))
+        return document_version
+
+    def read_version(self, version: DocumentVersion) -> Iterator[bytes]:
+        """
+        Yield the content of a version. The block list is loaded right away, so the returned
+        iterator only reads files and can outlive the session.
+        """
+        blocks = self.db.query(Blob.hash, Blob.content_encoding).join(
+            DocumentVersionBlock, DocumentVersionBlock.blob_hash == Blob.hash).filter(
+            DocumentVersionBlock.version_id == version.id).order_by(DocumentVersionBlock.position).all()
+        return self._read_blocks([(self.get_blob_path(block_hash), encoding) for block_hash, encoding in blocks])
+
+    def prune(self, keep: int, max_age: Optional[timedelta], limit: int) -> int:
+        """
+        Delete up to `limit` versions beyond the newest `keep` of their document or older than
+        `max_age` (0 and None disable either rule). Their blobs are left to `collect_garbage`.
+        """
+        ranked = select(
+            DocumentVersion.id,
+            DocumentVersion.created_at,
+            func.row_number().over(
+                partition_by=DocumentVersion.document_id, order_by=DocumentVersion.version.desc()).label("rank")
+        ).subquery()
+        conditions = []
+        if keep:
+            conditions.append(ranked.c.rank > keep)
+        if max_age is not None:
+            conditions.append(ranked.c.created_at < func.now() - max_age)
+        if not conditions:
+            return 0
+
+        expired = select(ranked.c.id).where(or_(*conditions)).limit(limit)
+        result = self.db.execute(
+            delete(DocumentVersion).where(DocumentVersion.id.in_(expired)).execution_options(synchronize_session=False))
+        self.db.commit()
+        return result.rowcount
+
+    def collect_garbage(self, grace: timedelta, limit: int) -> int:
+        """
+        Delete up to `limit` blobs no version refers to. Blobs referenced within `grace` or locked
+        by a version being written are kept. Files are removed while the rows are still locked,
+        so a writer waiting to reuse one of them finds the row gone and stores the block again.
+        """
+        hashes = [blob_hash for blob_hash, in self.db.query(Blob.hash).filter(
+            Blob.referenced_at < func.now() - grace,
+            ~exists().where(DocumentVersionBlock.blob_hash == Blob.hash)
+        ).limit(limit).with_for_update(skip_locked=True)]
+        if not hashes:
+            return 0
+
+        self.db.execute(delete(Blob).where(Blob.hash.in_(hashes)).execution_options(synchronize_session=False))
+        with track_storage_io():
+            self._remove_files(self.get_blob_path(blob_hash) for blob_hash in hashes)
+        self.db.commit()
+        return len(hashes)
+
+    def get_blob_path(self, blob_hash: str) -> str:
+        return os.path.join(self.BLOB_PATH.format(storage_directory=self.storage_dir, prefix=blob_hash[:2]), blob_hash)
+
+    def _store_blob(self, blob_hash: str, block: bytes, encoding: Optional[str]):
+        """
+        Make sure a block is stored and lock its row until commit. A locked row is skipped by
+        `collect_garbage`, so the file of a reused blob cannot be removed before the version
+        referencing it is committed.
+        """
+        path = self.get_blob_path(blob_hash)
+        while True:
+            reused = self.db.execute(update(Blob).where(Blob.hash == blob_hash).values(
+                referenced_at=func.now()).returning(Blob.content_encoding)).first()
+            if reused is not None:
+                with track_storage_io():
+                    if os.path.exists(path):
+                        return
+                # The row outlived its file, left over from an interrupted garbage collection.
+                self._write_blob(path, block, encoding)
+                self.db.execute(update(Blob).where(Blob.hash == blob_hash).values(content_encoding=encoding))
+                return
+
+            inserted = self.db.execute(pg_insert(Blob).values(
+                hash=blob_hash, size=len(block), content_encoding=encoding
+            ).on_conflict_do_nothing().returning(Blob.hash)).first()
+            if inserted is not None:
+                # A file without a row is left over from a rolled back version and is rewritten.
+                self._write_blob(path, block, encoding)
+                return
+            # Inserted by a concurrent writer that has committed since; reuse it on the next pass.
+
+    @staticmethod
+    def _write_blob(path: str, block: bytes, encoding: Optional[str]):
+        with track_storage_io():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a unique name and renamed, so concurrent writers of one block never
+            # expose a partial file.
+            temporary_path = f"{path}.{uuid.uuid4().hex}"
+            with open(temporary_path, "wb") as buffer:
+                write_chunks(buffer, [block], encoding)
+            os.replace(temporary_path, path)
+
+    @staticmethod
+    def _remove_files(paths: Iterable[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _read_blocks(blocks: List[Tuple[str, Optional[str]]]) -> Iterator[bytes]:
+        for path, encoding in blocks:
+            yield from read_chunks(path, encoding)
+
@@ -0,0 +1,3 @@
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so `value` only matches itself; use with escape="\\"."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
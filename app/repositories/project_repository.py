@@ -1,16 +1,35 @@
-from typing import List
-from models import Project, UserProject, User
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from cache import ProjectCache, PROJECT_CACHE_CHANNEL
+from models import Project, ProjectStats, UserProject, User
 from models.enums import Role
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, load_only, make_transient_to_detached
 from schemas import CreateProjectRequest
+from .patterns import escape_like
+from .project_stats_repository import ProjectStatsRepository
+from .streaming import stream_scalars
 
 
 class ProjectRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: Session, cache: ProjectCache|None = None) -> None:
         self.db = db
+        self.cache = cache
+        self.stats = ProjectStatsRepository(db)
 
     def get_by_id(self, project_id: int) -> Project|None:
-        return self.db.query(Project).filter(Project.id == project_id).first()
+        if self.cache is None:
+            return self.db.query(Project).filter(Project.id == project_id).first()
+
+        values = self.cache.get_project(project_id)
+        if values is not None:
+            return self._attach(values)
+
+        version = self.cache.version
+        project = self.db.query(Project).filter(Project.id == project_id).first()
+        if project is not None:
+            self.cache.set_project(project_id, self._snapshot(project), version)
+        return project
 
     def create_for_user(self, project_data: CreateProjectRequest, user: User):
         new_project = Project(
@@ -28,23 +47,91 @@ class ProjectRepository:
         )
 
         self.db.add(admin_assoc)
+        self.stats.add(new_project.id, members=1)
         self.db.commit()
 
         return new_project
     
-    def get_user_projects(self, user: User) -> List[Project]:
-        return user.projects
+    def get_user_projects(self, user: User, fields: Optional[Sequence[str]] = None) -> List[Project]:
+        return (
+            self.db.query(Project)
+            .options(*self._load_only(fields))
+            .join(UserProject, UserProject.project_id == Project.id)
+            .filter(UserProject.user_id == user.id)
+            .order_by(Project.id)
+            .all()
+        )
+
+    def get_user_project_summaries(self, user: User, limit: int, offset: int) -> List[Any]:
+        """
+        One page of the user's projects with their role, member and document counts, stored bytes
+        and last activity, read from the project_stats counters in a single query.
+        """
+        return (
+            self.db.query(
+                Project.id,
+                Project.name,
+                UserProject.role,
+                func.coalesce(ProjectStats.member_count, 0).label("member_count"),
+                func.coalesce(ProjectStats.document_count, 0).label("document_count"),
+                func.coalesce(ProjectStats.total_bytes, 0).label("total_bytes"),
+                func.greatest(Project.updated_at, ProjectStats.last_activity_at).label("last_activity_at")
+            )
+            .join(UserProject, and_(UserProject.project_id == Project.id, UserProject.user_id == user.id))
+            .outerjoin(ProjectStats, ProjectStats.project_id == Project.id)
+            .order_by(Project.id)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+
+    def search_user_projects(self, user: User, query: str, limit: int, offset: int, fields: Optional[Sequence[str]] = None) -> List[Project]:
+        """
+        Projects of `user` whose name contains `query`, case-insensitively. Names starting with
+        the query rank first, then shorter (closer) names.
+        """
+        pattern = escape_like(query)
+        starts_with = case((Project.name.ilike(f"{pattern}%", escape="\\"), 0), else_=1)
+        return (
+            self.db.query(Project)
+            .options(*self._load_only(fields))
+            .join(UserProject, UserProject.project_id == Project.id)
+            .filter(UserProject.user_id == user.id, Project.name.ilike(f"%{pattern}%", escape="\\"))
+            .order_by(starts_with, func.length(Project.name), Project.id)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+
+    def stream_user_projects(self, user: User, fields: Optional[Sequence[str]] = None) -> Iterator[Project]:
+        statement = (
+            select(Project)
+            .options(*self._load_only(fields))
+            .join(UserProject, UserProject.project_id == Project.id)
+            .where(UserProject.user_id == user.id)
+            .order_by(Project.id)
+        )
+        return stream_scalars(self.db, statement)
+
+    def _load_only(self, fields: Optional[Sequence[str]]) -> List:
+        """Loader options narrowing the SELECT to the requested fields, none to load every column."""
+        return [load_only(*(getattr(Project, name) for name in fields))] if fields else []
     
     def update(self, project: Project, project_data: CreateProjectRequest) -> Project:
         project.name = project_data.name
         project.description = project_data.description
+        self._notify_change(project.id)
         self.db.commit()
+        self._invalidate(project.id)
         self.db.refresh(project)
         return project
     
     def delete(self, project: Project):
+        project_id = project.id
         self.db.delete(project)
+        self._notify_change(project_id)
         self.db.commit()
+        self._invalidate(project_id)
 
     def add_participant(self, project: Project, participant: User):
         new_assoc = UserProject(
@@ -53,11 +140,102 @@ class ProjectRepository:
             role=Role.participant
         )
         self.db.add(new_assoc)
+        self.stats.add(project.id, members=1)
+        self._notify_change(project.id)
         self.db.commit()
+        self._invalidate(project.id)
     
+    def add_participants(self, project: Project, user_ids: List[int]) -> Set[int]:
+        """Insert participant rows in one statement and return the ids that were not members yet."""
+        if not user_ids:
+            return set()
+        statement = (
+            insert(UserProject)
+            .values([{"user_id": user_id, "project_id": project.id, "role": Role.participant} for user_id in user_ids])
+            .on_conflict_do_nothing(index_elements=[UserProject.user_id, UserProject.project_id])
+            .returning(UserProject.user_id)
+        )
+        added = set(self.db.execute(statement).scalars())
+        if added:
+            self.stats.add(project.id, members=len(added))
+            self._notify_change(project.id)
+        self.db.commit()
+        self._invalidate(project.id)
+        return added
+
+    def remove_participants(self, project: Project, user_ids: List[int]) -> Set[int]:
+        """Delete the participant rows of the given users and return the ids that were removed."""
+        if not user_ids:
+            return set()
+        statement = (
+            delete(UserProject)
+            .where(
+                UserProject.project_id == project.id,
+                UserProject.user_id.in_(user_ids),
+                UserProject.role == Role.participant
+            )
+            .returning(UserProject.user_id)
+        )
+        removed = set(self.db.execute(statement).scalars())
+        if removed:
+            self.stats.add(project.id, members=-len(removed))
+            self._notify_change(project.id)
+        self.db.commit()
+        self._invalidate(project.id)
+        return removed
+
+    def get_roles(self, project: Project, user_ids: List[int]) -> Dict[int, Role]:
+        rows = self.db.query(UserProject.user_id, UserProject.role).filter(
+            UserProject.project_id == project.id, UserProject.user_id.in_(user_ids)).all()
+        return {user_id: role for user_id, role in rows}
+
     def is_user_participant(self, project: Project, user: User) -> bool:
-        return user in project.users
+        return self.get_user_role(project, user) is not None
     
     def is_user_admin(self, project: Project, user: User) -> bool:
-        return user in project.admins
+        return self.get_user_role(project, user) == Role.admin
+
+    def get_storage_usage(self, project_id: int) -> Tuple[int, int]:
+        return self.stats.get_usage(project_id)
+
+    def get_owner_id(self, project_id: int) -> Optional[int]:
+        return self.stats.get_owner_id(project_id)
+
+    def get_owner_storage_usage(self, user_id: int) -> Tuple[int, int]:
+        return self.stats.get_owner_usage(user_id)
+
+    def get_user_role(self, project: Project, user: User) -> Role|None:
+        if self.cache is not None:
+            hit, role = self.cache.get_role(project.id, user.id)
+            if hit:
+                return role
+            version = self.cache.version
+
+        # Look up the single membership row instead of loading the whole member list.
+        role = self.db.query(UserProject.role).filter(
+            UserProject.project_id == project.id, UserProject.user_id == user.id).scalar()
+
+        if self.cache is not None:
+            self.cache.set_role(project.id, user.id, role, version)
+        return role
+
+    def _notify_change(self, project_id: int):
+        # Delivered to every listening worker when the surrounding transaction commits.
+        self.db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": PROJECT_CACHE_CHANNEL, "payload": str(project_id)}
+        )
+
+    def _invalidate(self, project_id: int):
+        if self.cache is not None:
+            self.cache.invalidate(project_id)
+
+    def _snapshot(self, project: Project) -> Dict[str, Any]:
+        return {column.key: getattr(project, column.key) for column in Project.__table__.columns}
+
+    def _attach(self, values: Dict[str, Any]) -> Project:
+        # Rebuild the row from the snapshot and attach it to the session without a query.
+        project = Project(**values)
+        make_transient_to_detached(project)
+        return self.db.merge(project, load=False)
 
@@ -0,0 +1,175 @@
+from typing import Optional, Tuple
+from models import Document, Project, ProjectStats, User, UserProject
+from models.enums import Role
+from sqlalchemy import BigInteger, cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+import quotas
+
+
+class ProjectStatsRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get(self, project_id: int) -> ProjectStats|None:
+        return self.db.query(ProjectStats).filter(ProjectStats.project_id == project_id).first()
+
+    def get_usage(self, project_id: int) -> Tuple[int, int]:
+        """Documents and bytes stored in a project."""
+        row = self.db.query(ProjectStats.document_count, ProjectStats.total_bytes).filter(
+            ProjectStats.project_id == project_id).first()
+        return (row.document_count, row.total_bytes) if row else (0, 0)
+
+    def get_owner_usage(self, user_id: int) -> Tuple[int, int]:
+        """Documents and bytes stored across the projects a user owns."""
+        owned = select(UserProject.project_id).where(UserProject.user_id == user_id, UserProject.role == Role.admin)
+        documents, total_bytes = self.db.query(
+            cast(func.coalesce(func.sum(ProjectStats.document_count), 0), BigInteger),
+            cast(func.coalesce(func.sum(ProjectStats.total_bytes), 0), BigInteger)
+        ).filter(ProjectStats.project_id.in_(owned)).one()
+        return documents, total_bytes
+
+    def get_owner_id(self, project_id: int) -> Optional[int]:
+        return self.db.query(UserProject.user_id).filter(
+            UserProject.project_id == project_id, UserProject.role == Role.admin).scalar()
+
+    def lock_owner(self, project_id: int) -> Optional[int]:
+        """
+        Lock the row of the project's owner until commit and return the owner's id. FOR NO KEY
+        UPDATE does not block inserts referencing the user, only other writers charging the owner.
+        """
+        owner_id = self.get_owner_id(project_id)
+        if owner_id is not None:
+            self.db.query(User.id).filter(User.id == owner_id).with_for_update(key_share=True).one()
+        return owner_id
+
+    def remaining_bytes(self, project_id: int) -> Optional[int]:
+        """Bytes a write to the project may still add, None when no byte quota is configured."""
+        if not quotas.byte_quotas_enabled():
+            return None
+        _, project_bytes = self.get_usage(project_id)
+        owner_bytes = None
+        if quotas.USER_MAX_BYTES:
+            owner_id = self.get_owner_id(project_id)
+            if owner_id is not None:
+                _, owner_bytes = self.get_owner_usage(owner_id)
+        return quotas.remaining_bytes(project_bytes, owner_bytes)
+
+    def check_quota(self, project_id: int, documents: int = 0, total_bytes: int = 0):
+        """Raise QuotaExceededError if adding `documents` and `total_bytes` would go over a quota."""
+        if not quotas.quotas_enabled():
+            return
+        project_documents, project_bytes = self.get_usage(project_id)
+        owner_documents = owner_bytes = None
+        if quotas.user_quotas_enabled():
+            owner_id = self.get_owner_id(project_id)
+            if owner_id is not None:
+                owner_documents, owner_bytes = self.get_owner_usage(owner_id)
+                owner_documents, owner_bytes = owner_documents + documents, owner_bytes + total_bytes
+        quotas.check_usage(project_documents + documents, project_bytes + total_bytes, owner_documents, owner_bytes)
+
+    def add(self, project_id: int, documents: int = 0, members: int = 0, total_bytes: int = 0, enforce_quota: bool = False):
+        """
+        Apply a delta to the counters of a project. Does not commit: it is meant to run in the
+        transaction that changes the counted rows, so both are kept or rolled back together.
+
+        With `enforce_quota` the new totals are checked against the storage quotas and
+        QuotaExceededError is raised when they are over; the caller rolls back. The upsert
+        holds the project's row lock until then, so concurrent writers to one project cannot
+        both slip under its limit. With user quotas the owner's row is locked first, so writers
+        to different projects of one owner cannot both slip under the owner's limit either.
+        """
+        statement = insert(ProjectStats).values(
+            project_id=project_id,
+            document_count=documents,
+            member_count=members,
+            total_bytes=total_bytes,
+            last_activity_at=func.now()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[ProjectStats.project_id],
+            set_={
+                "document_count": ProjectStats.document_count + statement.excluded.document_count,
+                "member_count": ProjectStats.member_count + statement.excluded.member_count,
+                "total_bytes": ProjectStats.total_bytes + statement.excluded.total_bytes,
+                "last_activity_at": statement.excluded.last_activity_at
+            }
+        )
+        if not (enforce_quota and quotas.quotas_enabled() and (documents > 0 or total_bytes > 0)):
+            self.db.execute(statement)
+            return
+
+        owner_id = self.lock_owner(project_id) if quotas.user_quotas_enabled() else None
+        project_documents, project_bytes = self.db.execute(
+            statement.returning(ProjectStats.document_count, ProjectStats.total_bytes)).one()
+        owner_documents = owner_bytes = None
+        if owner_id is not None:
+            # Read after the lock: earlier writers for this owner have committed by now.
+            owner_documents, owner_bytes = self.get_owner_usage(owner_id)
+        quotas.check_usage(project_documents, project_bytes, owner_documents, owner_bytes)
+
+    def reconcile(self, after_id: int, limit: int) -> Tuple[Optional[int], int]:
+        """
+        Recount the next `limit` projects after `after_id` from documents and user_project and
+        correct counters that drifted. Returns the last project id of the batch (None once all
+        projects are done) and the number of corrected rows.
+        """
+        project_ids = [project_id for project_id, in self.db.query(Project.id).filter(
+            Project.id > after_id).order_by(Project.id).limit(limit)]
+        if not project_ids:
+            return None, 0
+
+        self.db.execute(insert(ProjectStats).values(
+            [{"project_id": project_id} for project_id in project_ids]).on_conflict_do_nothing())
+        # Lock the rows before counting: writers incrementing meanwhile wait and apply their
+        # delta on top of the recount instead of being overwritten by it.
+        self.db.query(ProjectStats.project_id).filter(ProjectStats.project_id.in_(project_ids)).order_by(
+            ProjectStats.project_id).with_for_update().all()
+
+        documents = (
+            select(
+                Document.project_id,
+                func.count().label("document_count"),
+                cast(func.coalesce(func.sum(Document.size), 0), BigInteger).label("total_bytes")
+            )
+            .where(Document.project_id.in_(project_ids))
+            .group_by(Document.project_id)
+            .subquery()
+        )
+        members = (
+            select(UserProject.project_id, func.count().label("member_count"))
+            .where(UserProject.project_id.in_(project_ids))
+            .group_by(UserProject.project_id)
+            .subquery()
+        )
+        counts = (
+            select(
+                Project.id.label("project_id"),
+                func.coalesce(documents.c.document_count, 0).label("document_count"),
+                func.coalesce(members.c.member_count, 0).label("member_count"),
+                func.coalesce(documents.c.total_bytes, 0).label("total_bytes")
+            )
+            .outerjoin(documents, documents.c.project_id == Project.id)
+            .outerjoin(members, members.c.project_id == Project.id)
+            .where(Project.id.in_(project_ids))
+            .subquery()
+        )
+        result = self.db.execute(
+            update(ProjectStats)
+            .where(
+                ProjectStats.project_id == counts.c.project_id,
+                or_(
+                    ProjectStats.document_count != counts.c.document_count,
+                    ProjectStats.member_count != counts.c.member_count,
+                    ProjectStats.total_bytes != counts.c.total_bytes
+                )
+            )
+            .values(
+                document_count=counts.c.document_count,
+                member_count=counts.c.member_count,
+                total_bytes=counts.c.total_bytes
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return project_ids[-1], result.rowcount
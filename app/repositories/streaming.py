@@ -0,0 +1,16 @@
+import os
+from typing import Any, Iterator
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+
+def stream_scalars(db: Session, statement: Select) -> Iterator[Any]:
+    """
+    Yield the results of `statement` from a server-side cursor, STREAM_BATCH_SIZE rows at a time.
+    A streamed response is sent after the request's session has been closed, so the cursor
+    gets a session of its own on the same engine.
+    """
+    with Session(db.get_bind()) as stream_db:
+        yield from stream_db.scalars(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
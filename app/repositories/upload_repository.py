@@ -0,0 +1,115 @@
+import os
+import uuid
+from datetime import timedelta
+from typing import BinaryIO, List, Tuple
+from models import UploadChunk, UploadSession
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from instrumentation import track_storage_io
+
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 60 * 60)))
+
+
+class UploadRepository:
+    STAGING_PATH = "./{storage_directory}/uploads"
+    COPY_BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, db: Session, use_test_dir: bool = False) -> None:
+        self.db = db
+        self.storage_dir = os.getenv("TEST_STORAGE_DIR", "data-test") if use_test_dir else os.getenv("STORAGE_DIR", "data")
+
+    def get_active_session(self, upload_id: str) -> UploadSession|None:
+        return self.db.query(UploadSession).filter(
+            UploadSession.id == upload_id, UploadSession.expires_at > func.now()).first()
+
+    def create_session(self, project_id: int, user_id: int, filename: str, content_type: str, length: int) -> UploadSession:
+        new_session = UploadSession(
+            id=uuid.uuid4().hex,
+            project_id=project_id,
+            user_id=user_id,
+            filename=filename,
+            content_type=content_type,
+            length=length,
+            expires_at=func.now() + timedelta(seconds=UPLOAD_SESSION_TTL)
+        )
+        self.db.add(new_session)
+        self.db.flush()
+
+        # Reserve the whole file up front so chunks can land at any offset.
+        with track_storage_io():
+            os.makedirs(self.STAGING_PATH.format(storage_directory=self.storage_dir), exist_ok=True)
+            with open(self.get_staging_path(new_session), "wb") as staging:
+                staging.truncate(length)
+
+        self.db.commit()
+        self.db.refresh(new_session)
+        return new_session
+
+    def write_chunk(self, upload_session: UploadSession, offset: int, chunk: BinaryIO):
+        size = 0
+        with track_storage_io():
+            fd = os.open(self.get_staging_path(upload_session), os.O_WRONLY)
+            try:
+                # Copied in pieces, so a chunk is never held in memory as a whole.
+                while piece := chunk.read(self.COPY_BUFFER_SIZE):
+                    written = 0
+                    while written < len(piece):
+                        written += os.pwrite(fd, piece[written:], offset + size + written)
+                    size += len(piece)
+            finally:
+                os.close(fd)
+
+        # A re-sent chunk replaces the range recorded for the same offset.
+        statement = insert(UploadChunk).values(session_id=upload_session.id, offset=offset, size=size)
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[UploadChunk.session_id, UploadChunk.offset],
+            set_={"size": func.greatest(UploadChunk.size, statement.excluded.size)}
+        ))
+        upload_session.expires_at = func.now() + timedelta(seconds=UPLOAD_SESSION_TTL)
+        self.db.commit()
+
+    def get_received_ranges(self, upload_session: UploadSession) -> List[Tuple[int, int]]:
+        """Return the received bytes as sorted, merged (start, end) ranges."""
+        rows = self.db.query(UploadChunk.offset, UploadChunk.size).filter(
+            UploadChunk.session_id == upload_session.id).order_by(UploadChunk.offset).all()
+
+        ranges: List[Tuple[int, int]] = []
+        for offset, size in rows:
+            end = offset + size
+            if ranges and offset <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((offset, end))
+        return ranges
+
+    def open_staging_file(self, upload_session: UploadSession) -> BinaryIO:
+        return open(self.get_staging_path(upload_session), "rb")
+
+    def delete_session(self, upload_session: UploadSession):
+        self._remove_staging_file(self.get_staging_path(upload_session))
+        self.db.delete(upload_session)
+        self.db.commit()
+
+    def delete_expired_sessions(self) -> int:
+        expired = self.db.query(UploadSession.id).filter(UploadSession.expires_at <= func.now()).all()
+        for upload_id, in expired:
+            self._remove_staging_file(self._get_staging_path(upload_id))
+        if expired:
+            self.db.query(UploadSession).filter(
+                UploadSession.id.in_([upload_id for upload_id, in expired])).delete(synchronize_session=False)
+            self.db.commit()
+        return len(expired)
+
+    def get_staging_path(self, upload_session: UploadSession) -> str:
+        return self._get_staging_path(upload_session.id)
+
+    def _get_staging_path(self, upload_id: str) -> str:
+        return os.path.join(self.STAGING_PATH.format(storage_directory=self.storage_dir), upload_id)
+
+    def _remove_staging_file(self, path: str):
+        try:
+            with track_storage_io():
+                os.remove(path)
+        except FileNotFoundError:
+            pass
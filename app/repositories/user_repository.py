@@ -1,6 +1,9 @@
+from typing import List
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from models import User
 from schemas import CreateUserRequest
+from .patterns import escape_like
 
 
 class UserRepository:
@@ -13,6 +16,23 @@ class UserRepository:
     def get_by_id(self, id):
         return self.db.query(User).filter(User.id == id).first()
 
+    def find_by_ids_or_usernames(self, ids: List[int], usernames: List[str]) -> List[tuple]:
+        """Return (id, username) rows for every user matching one of the ids or usernames."""
+        return self.db.query(User.id, User.username).filter(
+            or_(User.id.in_(ids), User.username.in_(usernames))).all()
+
+    def search_by_username_prefix(self, prefix: str, limit: int, offset: int) -> List[tuple]:
+        """
+        (id, username) rows of users whose username starts with `prefix`, ignoring case, ordered
+        by the lowercased username byte by byte.
+        """
+        # Both the filter and the order match the lower(username) COLLATE "C" index, so a page
+        # is read off the index instead of sorting every match.
+        username = func.lower(User.username).collate("C")
+        return self.db.query(User.id, User.username).filter(
+            username.like(f"{escape_like(prefix.lower())}%", escape="\\")
+        ).order_by(username, User.id).limit(limit).offset(offset).all()
+
     def create(self, user_data: CreateUserRequest, hashed_password: str):
         new_user = User(
             username=user_data.username,
@@ -1,5 +1,9 @@
 from .auth_routes import auth_router
 from .project_routes import project_router
 from .document_routes import document_router
+from .metrics_routes import metrics_router
+from .profile_routes import profile_router
+from .upload_routes import upload_router
+from .user_routes import user_router
 
-__all__ = ["auth_router", "project_router", "document_router"]
\ No newline at end of file
+__all__ = ["auth_router", "project_router", "document_router", "metrics_router", "profile_router", "upload_router", "user_router"]
@@ -1,16 +1,23 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
-from typing import List
-from dependencies import get_current_user, get_document_service, load_file_stream
-from schemas import UploadedDocument, ProjectDocumentOut
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from typing import BinaryIO, List, Literal, Optional
+from archive import ARCHIVE_FORMATS, ArchiveEntry, stream_archive
+from compression import accepts_encoding, read_chunks
+from concurrency import run_in_threadpool
+from delta import DELTA_BLOCK_SIZE, DELTA_MAX_BLOCK_SIZE, DELTA_MIN_BLOCK_SIZE
+from dependencies import get_current_user, get_document_service, load_archive_stream, load_file_stream, load_file_streams, load_replacement_stream, load_request_body, multipart_openapi
+from schemas import DocumentImportResult, DocumentSearchResult, DocumentSignature, DocumentUploadResult, DocumentVersionOut, UploadedDocument, ProjectDocumentOut
 from models import User
+from quotas import QuotaExceededError
 from services import DocumentService
+from serialization import accepts_ndjson, ndjson_response, orm_list_response, orm_response, parse_fields
 
 document_router = APIRouter(prefix="/projects/{project_id}/documents", tags=["Documents"])
 logger = logging.getLogger("app")
 
-@document_router.post("", status_code=status.HTTP_201_CREATED, response_model=ProjectDocumentOut)
+@document_router.post("", status_code=status.HTTP_201_CREATED, response_model=ProjectDocumentOut, openapi_extra=multipart_openapi("file"))
 async def upload_project_file(
     project_id: int,
     file: UploadedDocument = Depends(load_file_stream),
@@ -31,21 +38,88 @@ async def upload_project_file(
     except ValueError:
         logger.warning(f"User {current_user.id} failed to upload document. Reason: This project already has a document with this name.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="This project already has a document with this name")
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to upload document. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"User {current_user.id} failed to upload document. Reason: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
 
+@document_router.post("/batch", response_model=List[DocumentUploadResult], openapi_extra=multipart_openapi("files", multiple=True))
+async def upload_project_files(
+    project_id: int,
+    files: List[UploadedDocument] = Depends(load_file_streams),
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested to upload {len(files)} documents to project {project_id}.")
+    try:
+        results = await run_in_threadpool(document_service.create_documents_for_project, project_id, files, current_user)
+        created = sum(1 for result in results if result["status"] == "created")
+        logger.info(f"User {current_user.id} successfully uploaded {created} of {len(files)} documents to project {project_id}.")
+        return results
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to upload documents. Reason: Project {project_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to upload documents. Reason: Permission denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to upload documents to this project")
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to upload documents. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to upload documents. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+@document_router.post("/import", status_code=status.HTTP_201_CREATED, response_model=DocumentImportResult)
+async def import_project_archive(
+    project_id: int,
+    archive: UploadedDocument = Depends(load_archive_stream),
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested to import archive {archive.filename} into project {project_id}.")
+    try:
+        result = await run_in_threadpool(document_service.import_documents_for_project, project_id, archive, current_user)
+        logger.info(f"User {current_user.id} successfully imported {result['imported']} documents into project {project_id}, skipped {len(result['skipped'])}.")
+        return result
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to import archive. Reason: Project {project_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to import archive. Reason: Permission denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to upload documents to this project")
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to import archive. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to import archive into project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to import archive into project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
 @document_router.get("", response_model=List[ProjectDocumentOut])
 async def list_project_documents(
     project_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated fields to include, e.g. id,filename"),
+    accept: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
     logger.info(f"User {current_user.id} requested to list documents for project {project_id}.")
     try:
-        documents = document_service.get_documents_of_project(project_id, current_user)
+        field_names = parse_fields(ProjectDocumentOut, fields)
+        if accepts_ndjson(accept):
+            documents = document_service.stream_documents_of_project(project_id, current_user, field_names)
+            logger.info(f"User {current_user.id} started streaming documents of project {project_id}.")
+            return ndjson_response(ProjectDocumentOut, documents, field_names)
+        documents = document_service.get_documents_of_project(project_id, current_user, field_names)
         logger.info(f"User {current_user.id} successfully retrieved a list of {len(documents)} documents for project {project_id}.")
-        return documents
+        return orm_list_response(ProjectDocumentOut, documents, field_names)
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to list documents. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except LookupError:
         logger.warning(f"User {current_user.id} failed to list documents. Reason: Project {project_id} not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
@@ -57,18 +131,94 @@ async def list_project_documents(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
 
 
+# Declared before /{document_id} so "archive" is not parsed as a document id.
+@document_router.get("/archive")
+async def download_project_archive(
+    project_id: int,
+    format: Literal["zip", "tar"] = "zip",
+    compression: Literal["stored", "deflate"] = "stored",
+    ids: Optional[List[int]] = Query(None),
+    file_type: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested a {format} archive of project {project_id}.")
+    try:
+        documents = document_service.get_documents_for_archive(project_id, current_user, ids, file_type)
+        entries = [
+            ArchiveEntry(
+                name=document.filename,
+                path=document_service.get_document_path(document),
+                modified_at=document.created_at,
+                encoding=document.content_encoding,
+                size=document.size
+            )
+            for document in documents
+        ]
+        media_type, extension = ARCHIVE_FORMATS[(format, compression)]
+        logger.info(f"User {current_user.id} started downloading {len(entries)} documents of project {project_id} as {format}.")
+        return StreamingResponse(
+            stream_archive(entries, format, compression),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="project-{project_id}.{extension}"'}
+        )
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to download archive. Reason: Project {project_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to download archive. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to view documents for this project")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to download archive of project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+# Declared before /{document_id} so "search" is not parsed as a document id.
+@document_router.get("/search", response_model=DocumentSearchResult)
+async def search_project_documents(
+    project_id: int,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested to search documents of project {project_id}.")
+    try:
+        result = document_service.search_documents(project_id, current_user, q, limit, offset)
+        logger.info(f"User {current_user.id} found {result['total']} documents in project {project_id}.")
+        return result
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to search documents. Reason: Project {project_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to search documents. Reason: Permission denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to view documents for this project")
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to search documents. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to search documents of project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
 @document_router.get("/{document_id}", response_model=ProjectDocumentOut)
 async def get_project_document(
     project_id: int,
     document_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated fields to include, e.g. id,filename"),
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
     logger.info(f"User {current_user.id} requested to view document {document_id} from project {project_id}.")
     try:
+        field_names = parse_fields(ProjectDocumentOut, fields)
         document = document_service.get_project_document(project_id, document_id, current_user)
         logger.info(f"User {current_user.id} successfully accessed document {document_id} from project {project_id}.")
-        return document
+        return orm_response(ProjectDocumentOut, document, field_names)
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to access document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except LookupError:
         logger.warning(f"User {current_user.id} failed to access document {document_id}. Reason: Document or project not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
@@ -84,18 +234,33 @@ async def get_project_document(
 async def download_project_document(
     project_id: int,
     document_id: int,
+    accept_encoding: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
     logger.info(f"User {current_user.id} requested to download document {document_id} from project {project_id}.")
     try:
         document = document_service.get_project_document(project_id, document_id, current_user)
+        path = document_service.get_document_path(document)
         logger.info(f"User {current_user.id} successfully downloaded document {document_id} from project {project_id}.")
-        return FileResponse(
-            path=document_service.get_document_path(document),
-            filename=document.filename,
-            media_type=document.file_type
-        )    
+        if document.content_encoding is None:
+            return FileResponse(path=path, filename=document.filename, media_type=document.file_type)
+
+        # Compressed at rest: send the stored bytes as they are when the client can decode them.
+        if accepts_encoding(accept_encoding, document.content_encoding):
+            return FileResponse(
+                path=path,
+                filename=document.filename,
+                media_type=document.file_type,
+                headers={"Content-Encoding": document.content_encoding, "Vary": "Accept-Encoding"}
+            )
+        headers = {
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(document.filename)}",
+            "Vary": "Accept-Encoding"
+        }
+        if document.size is not None:
+            headers["Content-Length"] = str(document.size)
+        return StreamingResponse(read_chunks(path, document.content_encoding), media_type=document.file_type, headers=headers)
     except LookupError:
         logger.warning(f"User {current_user.id} failed to download document {document_id}. Reason: Document or project not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
@@ -107,17 +272,130 @@ async def download_project_document(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
 
 
-@document_router.put("/{document_id}", response_model=ProjectDocumentOut)
+@document_router.get("/{document_id}/signature", response_model=DocumentSignature)
+async def get_document_signature(
+    project_id: int,
+    document_id: int,
+    block_size: int = Query(DELTA_BLOCK_SIZE, ge=DELTA_MIN_BLOCK_SIZE, le=DELTA_MAX_BLOCK_SIZE),
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested the signature of document {document_id} in project {project_id}.")
+    try:
+        result = await run_in_threadpool(document_service.get_document_signature, project_id, document_id, block_size, current_user)
+        logger.info(f"User {current_user.id} successfully retrieved the signature of document {document_id}.")
+        return ORJSONResponse(result)
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to get the signature of document {document_id}. Reason: Document or project not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to get the signature of document {document_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this document")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to get the signature of document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@document_router.post("/{document_id}/delta", response_model=ProjectDocumentOut)
+async def apply_document_delta(
+    project_id: int,
+    document_id: int,
+    base_version: int = Query(..., description="Version the signature was taken from"),
+    sha256: str = Query(..., pattern="^[0-9a-fA-F]{64}$", description="sha256 of the rebuilt document"),
+    block_size: int = Query(DELTA_BLOCK_SIZE, ge=DELTA_MIN_BLOCK_SIZE, le=DELTA_MAX_BLOCK_SIZE),
+    delta: BinaryIO = Depends(load_request_body),
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested to apply a delta to document {document_id} in project {project_id}.")
+    try:
+        document = await run_in_threadpool(
+            document_service.apply_document_delta, project_id, document_id, base_version, block_size, sha256, delta, current_user)
+        logger.info(f"User {current_user.id} successfully updated document {document_id} to version {document.version} from a delta.")
+        return document
+    except LookupError as e:
+        logger.warning(f"User {current_user.id} failed to apply a delta to document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to apply a delta to document {document_id}. Reason: Permission denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to upload documents to this project")
+    except RuntimeError as e:
+        logger.warning(f"User {current_user.id} failed to apply a delta to document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to apply a delta to document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to apply a delta to document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to apply a delta to document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@document_router.get("/{document_id}/versions", response_model=List[DocumentVersionOut])
+async def list_document_versions(
+    project_id: int,
+    document_id: int,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested the versions of document {document_id} in project {project_id}.")
+    try:
+        versions = document_service.get_document_versions(project_id, document_id, current_user)
+        logger.info(f"User {current_user.id} successfully retrieved {len(versions)} versions of document {document_id}.")
+        return orm_list_response(DocumentVersionOut, versions)
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to list versions of document {document_id}. Reason: Document or project not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to list versions of document {document_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this document")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to list versions of document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@document_router.get("/{document_id}/versions/{version}/download")
+async def download_document_version(
+    project_id: int,
+    document_id: int,
+    version: int,
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested to download version {version} of document {document_id} from project {project_id}.")
+    try:
+        document_version, content = document_service.get_document_version(project_id, document_id, version, current_user)
+        logger.info(f"User {current_user.id} successfully downloaded version {version} of document {document_id}.")
+        headers = {
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(document_version.filename)}",
+            "Content-Length": str(document_version.size),
+            "ETag": f'"{document_version.sha256}"'
+        }
+        return StreamingResponse(content, media_type=document_version.file_type, headers=headers)
+    except LookupError as e:
+        logger.warning(f"User {current_user.id} failed to download version {version} of document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to download version {version} of document {document_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this document")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to download version {version} of document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@document_router.put("/{document_id}", response_model=ProjectDocumentOut, openapi_extra=multipart_openapi("file"))
 async def update_project_document(
     project_id: int,
     document_id: int,
-    file: UploadedDocument = Depends(load_file_stream),
+    file: UploadedDocument = Depends(load_replacement_stream),
     current_user: User = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
     logger.info(f"User {current_user.id} requested to update document {document_id} in project {project_id}.")
     try:
-        updated_document = document_service.update_document_for_project(project_id, document_id, file, current_user)
+        updated_document = await run_in_threadpool(document_service.update_document_for_project, project_id, document_id, file, current_user)
         logger.info(f"User {current_user.id} successfully updated document {document_id} in project {project_id}.")
         return updated_document
     except LookupError as e:
@@ -129,6 +407,9 @@ async def update_project_document(
     except ValueError:
         logger.warning(f"User {current_user.id} failed to update document {document_id}. Reason: This project already has a document with this name.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="This project already has a document with this name")
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to update document {document_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         logger.error(f"User {current_user.id} failed to update document {document_id}. Reason: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
@@ -0,0 +1,24 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import List
+from dependencies import require_profile_token
+from profiling import profile_store
+from schemas import ProfileOut
+
+profile_router = APIRouter(prefix="/admin/profiles", tags=["Admin"], dependencies=[Depends(require_profile_token)])
+logger = logging.getLogger("app")
+
+
+@profile_router.get("", response_model=List[ProfileOut])
+async def list_profiles():
+    return profile_store.list()
+
+
+@profile_router.get("/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        logger.warning(f"Profile {profile_id} was requested but it does not exist or has been evicted.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return PlainTextResponse(profile.collapsed())
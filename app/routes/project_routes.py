@@ -1,10 +1,12 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from dependencies import get_current_user, get_project_service
-from schemas import CreateProjectRequest, ProjectOut, AddParticipantRequest
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
+from dependencies import get_current_user, get_document_service, get_project_service
+from schemas import CreateProjectRequest, DocumentChangeOut, DocumentChanges, ProjectOut, ProjectQuota, ProjectSummary, AddParticipantRequest, BulkParticipantsRequest, BulkParticipantsResponse
 from models import User
-from services import ProjectService
+from services import DocumentService, ProjectService
+from serialization import accepts_ndjson, dump_orm, ndjson_response, orm_list_response, orm_response, parse_fields
 
 project_router = APIRouter(prefix="/projects", tags=["Projects"])
 logger = logging.getLogger("app")
@@ -27,30 +29,87 @@ async def create_project(
 
 @project_router.get("", response_model=List[ProjectOut])
 async def list_projects(
+    fields: Optional[str] = Query(None, description="Comma separated fields to include, e.g. id,name"),
+    accept: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     project_service: ProjectService = Depends(get_project_service)
 ):
     logger.info(f"User {current_user.id} requested to list their projects.")
     try:
-        projects = project_service.get_user_projects(current_user)
+        field_names = parse_fields(ProjectOut, fields)
+        if accepts_ndjson(accept):
+            projects = project_service.stream_user_projects(current_user, field_names)
+            logger.info(f"User {current_user.id} started streaming their projects.")
+            return ndjson_response(ProjectOut, projects, field_names)
+        projects = project_service.get_user_projects(current_user, field_names)
         logger.info(f"User {current_user.id} successfully retrieved a list of {len(projects)} projects.")
-        return projects
+        return orm_list_response(ProjectOut, projects, field_names)
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to list projects. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"User {current_user.id} failed to retriev projects. Reason: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
 
 
+# Declared before /{project_id} so "summary" is not parsed as a project id.
+@project_router.get("/summary", response_model=List[ProjectSummary])
+async def list_project_summaries(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    project_service: ProjectService = Depends(get_project_service)
+):
+    logger.info(f"User {current_user.id} requested a summary of their projects.")
+    try:
+        summaries = project_service.get_project_summaries(current_user, limit, offset)
+        logger.info(f"User {current_user.id} successfully retrieved a summary of {len(summaries)} projects.")
+        return orm_list_response(ProjectSummary, summaries)
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to retrieve project summaries. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+# Declared before /{project_id} so "search" is not parsed as a project id.
+@project_router.get("/search", response_model=List[ProjectOut])
+async def search_projects(
+    q: str = Query(..., min_length=1, max_length=128),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = Query(None, description="Comma separated fields to include, e.g. id,name"),
+    current_user: User = Depends(get_current_user),
+    project_service: ProjectService = Depends(get_project_service)
+):
+    logger.info(f"User {current_user.id} requested to search their projects.")
+    try:
+        field_names = parse_fields(ProjectOut, fields)
+        projects = project_service.search_user_projects(current_user, q, limit, offset, field_names)
+        logger.info(f"User {current_user.id} found {len(projects)} projects.")
+        return orm_list_response(ProjectOut, projects, field_names)
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to search projects. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to search projects. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
 @project_router.get("/{project_id}", response_model=ProjectOut)
 async def get_project(
     project_id: int,
+    fields: Optional[str] = Query(None, description="Comma separated fields to include, e.g. id,name"),
     current_user: User = Depends(get_current_user),
     project_service: ProjectService = Depends(get_project_service)
 ):  
     logger.info(f"User {current_user.id} requested to view project {project_id}.")
     try:
+        field_names = parse_fields(ProjectOut, fields)
         project = project_service.get_project_for_user(project_id, current_user)
         logger.info(f"User {current_user.id} successfully accessed project {project_id}.")
-        return project
+        return orm_response(ProjectOut, project, field_names)
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to access project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except LookupError:
         logger.warning(f"User {current_user.id} failed to access project {project_id}. Reason: Project not found.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
@@ -62,6 +121,56 @@ async def get_project(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
 
 
+@project_router.get("/{project_id}/quota", response_model=ProjectQuota)
+async def get_project_quota(
+    project_id: int,
+    current_user: User = Depends(get_current_user),
+    project_service: ProjectService = Depends(get_project_service)
+):
+    logger.info(f"User {current_user.id} requested the quota usage of project {project_id}.")
+    try:
+        return project_service.get_project_quota(project_id, current_user)
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to get quota usage of project {project_id}. Reason: Project not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to get quota usage of project {project_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this project")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to get quota usage of project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@project_router.get("/{project_id}/changes", response_model=DocumentChanges)
+async def get_project_changes(
+    project_id: int,
+    since: Optional[int] = Query(None, ge=0, description="Cursor returned by the previous call; omit to get the current cursor"),
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: User = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    logger.info(f"User {current_user.id} requested the document changes of project {project_id} since {since}.")
+    try:
+        result = document_service.get_changes(project_id, current_user, since, limit)
+        logger.info(f"User {current_user.id} successfully retrieved {len(result['changes'])} document changes of project {project_id}.")
+        return ORJSONResponse({**result, "changes": dump_orm(DocumentChangeOut, result["changes"])})
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to get document changes of project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        logger.warning(f"User {current_user.id} failed to get document changes of project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to get document changes of project {project_id}. Reason: Project not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to get document changes of project {project_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this project")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to get document changes of project {project_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
 @project_router.put("/{project_id}", response_model=ProjectOut)
 async def update_project(
     project_id: int,
@@ -133,3 +242,28 @@ async def add_participant(
     except Exception as e:
         logger.error(f"User {current_user.id} failed to add participant. Reason: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@project_router.post("/{project_id}/participants/bulk", response_model=BulkParticipantsResponse)
+async def bulk_update_participants(
+    project_id: int,
+    bulk_request: BulkParticipantsRequest,
+    current_user: User = Depends(get_current_user),
+    project_service: ProjectService = Depends(get_project_service)
+):
+    count = len(bulk_request.user_ids) + len(bulk_request.usernames)
+    logger.info(f"User {current_user.id} requested to {bulk_request.action} {count} participants in project {project_id}.")
+    try:
+        results = project_service.bulk_update_participants(project_id, bulk_request, current_user)
+        changed = sum(1 for result in results if result["status"] in ("added", "removed"))
+        logger.info(f"User {current_user.id} successfully changed {changed} participants in project {project_id}.")
+        return {"results": results}
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to update participants. Reason: Project {project_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to update participants. Reason: Permission denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to manage participants")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to update participants. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
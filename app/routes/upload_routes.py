@@ -0,0 +1,159 @@
+import logging
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from concurrency import run_in_threadpool
+from dependencies import get_current_user, get_upload_service, spool_request_body
+from schemas import CreateUploadSessionRequest, ProjectDocumentOut, UploadSessionOut
+from models import User
+from quotas import QuotaExceededError
+from services import UploadService
+
+MAX_CHUNK_SIZE = int(os.getenv("MAX_CHUNK_SIZE", str(64 * 1024 * 1024)))
+
+upload_router = APIRouter(prefix="/projects/{project_id}/uploads", tags=["Uploads"])
+logger = logging.getLogger("app")
+
+
+@upload_router.post("", status_code=status.HTTP_201_CREATED, response_model=UploadSessionOut)
+async def create_upload(
+    project_id: int,
+    upload_data: CreateUploadSessionRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service)
+):
+    logger.info(f"User {current_user.id} requested to start an upload of {upload_data.length} bytes to project {project_id}.")
+    try:
+        upload_session = upload_service.create_session(project_id, upload_data, current_user)
+        logger.info(f"User {current_user.id} successfully started upload {upload_session.id} to project {project_id}.")
+        response.headers["Location"] = f"/projects/{project_id}/uploads/{upload_session.id}"
+        return upload_session
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to start upload. Reason: Project {project_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to start upload. Reason: Permission denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to upload documents to this project")
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to start upload. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to start upload. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to start upload. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@upload_router.get("/{upload_id}", response_model=UploadSessionOut)
+async def get_upload(
+    project_id: int,
+    upload_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service)
+):
+    try:
+        upload_session = upload_service.get_session(project_id, upload_id, current_user)
+        offset = await run_in_threadpool(upload_service.get_offset, upload_session)
+        response.headers["Upload-Offset"] = str(offset)
+        response.headers["Upload-Length"] = str(upload_session.length)
+        return UploadSessionOut.model_validate(upload_session).model_copy(update={"offset": offset})
+    except LookupError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to access upload {upload_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this upload")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to access upload {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@upload_router.patch("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    project_id: int,
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    content_length: Optional[int] = Header(None),
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service)
+):
+    chunk_too_large = f"Chunks are limited to {MAX_CHUNK_SIZE} bytes"
+    if content_length is not None and content_length > MAX_CHUNK_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=chunk_too_large)
+    # Compressed chunks arrive without a Content-Length, so the limit is also enforced while reading.
+    chunk = await spool_request_body(request, MAX_CHUNK_SIZE, chunk_too_large)
+    try:
+        upload_session = await run_in_threadpool(upload_service.write_chunk, project_id, upload_id, upload_offset, chunk, current_user)
+        offset = await run_in_threadpool(upload_service.get_offset, upload_session)
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Upload-Offset": str(offset)})
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to upload chunk. Reason: Upload {upload_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to upload chunk to {upload_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this upload")
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to upload chunk to {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to upload chunk to {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+    finally:
+        chunk.close()
+
+
+@upload_router.post("/{upload_id}/finalize", status_code=status.HTTP_201_CREATED, response_model=ProjectDocumentOut)
+async def finalize_upload(
+    project_id: int,
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service)
+):
+    logger.info(f"User {current_user.id} requested to finalize upload {upload_id} in project {project_id}.")
+    try:
+        document = await run_in_threadpool(upload_service.finalize, project_id, upload_id, current_user)
+        logger.info(f"User {current_user.id} successfully finalized upload {upload_id} into document {document.id}.")
+        return document
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to finalize upload. Reason: Upload {upload_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to finalize upload {upload_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this upload")
+    except RuntimeError as e:
+        logger.warning(f"User {current_user.id} failed to finalize upload {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError:
+        logger.warning(f"User {current_user.id} failed to finalize upload {upload_id}. Reason: This project already has a document with this name.")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This project already has a document with this name")
+    except QuotaExceededError as e:
+        logger.warning(f"User {current_user.id} failed to finalize upload {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to finalize upload {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@upload_router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    project_id: int,
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    upload_service: UploadService = Depends(get_upload_service)
+):
+    logger.info(f"User {current_user.id} requested to abort upload {upload_id}.")
+    try:
+        upload_service.abort(project_id, upload_id, current_user)
+        logger.info(f"User {current_user.id} successfully aborted upload {upload_id}.")
+    except LookupError:
+        logger.warning(f"User {current_user.id} failed to abort upload. Reason: Upload {upload_id} not found.")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    except PermissionError:
+        logger.warning(f"User {current_user.id} failed to abort upload {upload_id}. Reason: Access denied.")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to this upload")
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to abort upload {upload_id}. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
@@ -0,0 +1,60 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+from dependencies import get_current_user, get_project_service, get_user_service
+from schemas import ResolveUsernamesRequest, ResolveUsernamesResponse, StorageUsage, UserSummary
+from models import User
+from services import ProjectService, UserService
+
+user_router = APIRouter(prefix="/users", tags=["Users"])
+logger = logging.getLogger("app")
+
+
+@user_router.get("", response_model=List[UserSummary])
+async def search_users(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    user_service: UserService = Depends(get_user_service)
+):
+    logger.info(f"User {current_user.id} requested to search users by prefix.")
+    try:
+        users = user_service.search_users(prefix, limit, offset)
+        logger.info(f"User {current_user.id} found {len(users)} users.")
+        return users
+    except ValueError as e:
+        logger.warning(f"User {current_user.id} failed to search users. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to search users. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@user_router.post("/resolve", response_model=ResolveUsernamesResponse)
+async def resolve_usernames(
+    request: ResolveUsernamesRequest,
+    current_user: User = Depends(get_current_user),
+    user_service: UserService = Depends(get_user_service)
+):
+    logger.info(f"User {current_user.id} requested to resolve {len(request.usernames)} usernames.")
+    try:
+        result = user_service.resolve_usernames(request.usernames)
+        logger.info(f"User {current_user.id} resolved {len(result['users'])} usernames, {len(result['not_found'])} not found.")
+        return result
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to resolve usernames. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
+
+
+@user_router.get("/me/quota", response_model=StorageUsage)
+async def get_own_quota(
+    current_user: User = Depends(get_current_user),
+    project_service: ProjectService = Depends(get_project_service)
+):
+    logger.info(f"User {current_user.id} requested their quota usage.")
+    try:
+        return project_service.get_user_quota(current_user)
+    except Exception as e:
+        logger.error(f"User {current_user.id} failed to get their quota usage. Reason: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred")
@@ -1,6 +1,7 @@
-from typing import Annotated, Optional
+from typing import Annotated, Any, List, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field, model_validator
+from models.enums import ChangeAction, Role
 
 
 class CreateUserRequest(BaseModel):
@@ -23,6 +24,20 @@ class UserOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserSummary(BaseModel):
+    id: int
+    username: str
+
+
+class ResolveUsernamesRequest(BaseModel):
+    usernames: Annotated[List[str], Field(min_length=1, max_length=5000)]
+
+
+class ResolveUsernamesResponse(BaseModel):
+    users: List[UserSummary]
+    not_found: List[str]
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -48,14 +63,63 @@ class ProjectOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProjectSummary(BaseModel):
+    id: int
+    name: str
+    role: Role
+    member_count: int
+    document_count: int
+    total_bytes: int
+    last_activity_at: datetime
+
+
+class QuotaUsage(BaseModel):
+    used: int
+    limit: Optional[int] = None
+
+
+class StorageUsage(BaseModel):
+    documents: QuotaUsage
+    bytes: QuotaUsage
+
+
+class ProjectQuota(BaseModel):
+    project: StorageUsage
+    owner: StorageUsage
+
+
 class AddParticipantRequest(BaseModel):
     user_id: int
 
 
+class BulkParticipantsRequest(BaseModel):
+    action: Literal["add", "remove"] = "add"
+    user_ids: Annotated[List[int], Field(max_length=5000)] = []
+    usernames: Annotated[List[str], Field(max_length=5000)] = []
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if not self.user_ids and not self.usernames:
+            raise ValueError("Either user_ids or usernames must be given")
+        return self
+
+
+class ParticipantOutcome(BaseModel):
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    status: Literal["added", "already_participant", "removed", "not_participant", "is_admin", "not_found"]
+
+
+class BulkParticipantsResponse(BaseModel):
+    results: List[ParticipantOutcome]
+
+
 class UploadedDocument(BaseModel):
     filename: Optional[Annotated[str, Field(min_length=1, max_length=256)]]
     content_type: Optional[Annotated[str, Field(min_length=1, max_length=64)]]
-    content: bytes
+    content: bytes = b""
+    # File-like object read in chunks instead of `content` when set.
+    stream: Optional[Any] = Field(default=None, exclude=True)
 
 
 class ProjectDocumentOut(BaseModel):
@@ -63,5 +127,101 @@ class ProjectDocumentOut(BaseModel):
     project_id: int
     filename: str
     file_type: str
+    size: Optional[int] = None
+    version: int
     created_at: datetime
     url:  str
+
+
+class BlockSignature(BaseModel):
+    weak: int
+    strong: str
+
+
+class DocumentSignature(BaseModel):
+    version: int
+    size: int
+    block_size: int
+    blocks: List[BlockSignature]
+
+
+class DocumentChangeOut(BaseModel):
+    seq: int
+    document_id: int
+    action: ChangeAction
+    filename: str
+    version: int
+    created_at: datetime
+
+
+class DocumentChanges(BaseModel):
+    changes: List[DocumentChangeOut]
+    cursor: int
+    has_more: bool
+
+
+class DocumentVersionOut(BaseModel):
+    version: int
+    filename: str
+    file_type: str
+    size: int
+    sha256: str
+    created_at: datetime
+
+
+class DocumentUploadResult(BaseModel):
+    filename: Optional[str] = None
+    status: Literal["created", "duplicate"]
+    document: Optional[ProjectDocumentOut] = None
+
+
+class CreateUploadSessionRequest(BaseModel):
+    filename: Annotated[str, Field(min_length=1, max_length=128)]
+    content_type: Annotated[str, Field(min_length=1, max_length=64)] = "application/octet-stream"
+    length: Annotated[int, Field(ge=0)]
+
+
+class UploadSessionOut(BaseModel):
+    id: str
+    project_id: int
+    filename: str
+    content_type: str
+    length: int
+    offset: int = 0
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SkippedImportEntry(BaseModel):
+    filename: str
+    reason: Literal["duplicate", "invalid_name"]
+
+
+class DocumentImportResult(BaseModel):
+    imported: int
+    skipped: List[SkippedImportEntry]
+
+
+class DocumentSearchHit(BaseModel):
+    document: ProjectDocumentOut
+    rank: float
+
+
+class DocumentSearchResult(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    results: List[DocumentSearchHit]
+
+
+class ProfileOut(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: Optional[int] = None
+    started_at: datetime
+    duration: float
+    samples: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,71 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Lines are sent in pieces of about this size rather than one ASGI message per row.
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=None)
+def _field_names(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+def parse_fields(schema: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Turn a comma separated `fields=` query value into field names of `schema`, in schema
+    order. None when no fieldset was requested, ValueError for an empty or unknown one.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise ValueError("No fields requested")
+    unknown = requested.difference(_field_names(schema))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in _field_names(schema) if name in requested)
+
+
+def dump_orm(schema: Type[BaseModel], objects: Iterable[Any], fields: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
+    """
+    Read the fields of `schema` (or the requested subset) straight off ORM objects. The rows
+    come from the database with the declared column types already, so pydantic validation
+    would only copy them.
+    """
+    names = fields or _field_names(schema)
+    return [{name: getattr(obj, name) for name in names} for obj in objects]
+
+
+def orm_response(schema: Type[BaseModel], obj: Any, fields: Optional[Tuple[str, ...]] = None) -> ORJSONResponse:
+    return ORJSONResponse(dump_orm(schema, [obj], fields)[0])
+
+
+def orm_list_response(schema: Type[BaseModel], objects: Iterable[Any], fields: Optional[Tuple[str, ...]] = None) -> ORJSONResponse:
+    """Serialize a list of ORM objects with orjson, skipping the response_model round trip."""
+    return ORJSONResponse(dump_orm(schema, objects, fields))
+
+
+def accepts_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept.lower()
+
+
+def iter_ndjson(schema: Type[BaseModel], objects: Iterable[Any], fields: Optional[Tuple[str, ...]] = None) -> Iterator[bytes]:
+    names = fields or _field_names(schema)
+    buffer = bytearray()
+    for obj in objects:
+        buffer += orjson.dumps({name: getattr(obj, name) for name in names})
+        buffer += b"\n"
+        if len(buffer) >= NDJSON_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def ndjson_response(schema: Type[BaseModel], objects: Iterable[Any], fields: Optional[Tuple[str, ...]] = None) -> StreamingResponse:
+    """Stream ORM objects as newline-delimited JSON, one `schema` object per line."""
+    return StreamingResponse(iter_ndjson(schema, objects, fields), media_type=NDJSON_MEDIA_TYPE)
@@ -2,5 +2,6 @@ from .auth_service import AuthService
 from .user_service import UserService
 from .project_service import ProjectService
 from .document_service import DocumentService
+from .upload_service import UploadService
 
-__all__ = ["AuthService", "UserService", "ProjectService", "DocumentService"]
+__all__ = ["AuthService", "UserService", "ProjectService", "DocumentService", "UploadService"]
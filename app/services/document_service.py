@@ -1,8 +1,12 @@
-from models import User, Document
+import mimetypes
+from pathlib import PurePosixPath
+from archive import iter_archive
+from models import User, Document, DocumentVersion
 from models.enums.role import Role
 from repositories import DocumentRepository
 from services import ProjectService
 from schemas import UploadedDocument
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
 
 
 class DocumentService:
@@ -19,11 +23,106 @@ class DocumentService:
 
         return self.document_repo.create_project_document(project.id, file)
 
-    def get_documents_of_project(self, project_id: int, user: User):
+    def check_quota(self, project_id: int, size: int):
+        """Fail early when one more document of `size` bytes would not fit the storage quotas."""
+        self.document_repo.check_quota(project_id, documents=1, total_bytes=size)
+
+    def get_upload_limit(self, project_id: int, document_id: Optional[int] = None) -> Optional[int]:
+        """
+        Bytes an upload to the project may bring, plus the size of document `document_id` when it
+        is the one being replaced; None without byte quotas.
+        """
+        remaining = self.document_repo.remaining_bytes(project_id)
+        if remaining is not None and document_id is not None:
+            document = self.document_repo.get_project_document_by_id(project_id, document_id)
+            if document:
+                remaining += document.size or 0
+        return remaining
+
+    def create_documents_for_project(self, project_id: int, files: List[UploadedDocument], user: User) -> List[Dict]:
         project = self.project_service.get_project_and_check_permission(
             project_id, user, Role.participant)
 
-        return self.document_repo.get_documents_of_project(project)
+        existing = self.document_repo.get_existing_filenames(project.id, [file.filename for file in files])
+
+        results = []
+        accepted = []
+        for file in files:
+            if file.filename in existing:
+                results.append({"filename": file.filename, "status": "duplicate"})
+                continue
+            existing.add(file.filename)
+            accepted.append(file)
+            results.append({"filename": file.filename, "status": "created"})
+
+        documents = iter(self.document_repo.create_project_documents(project.id, accepted))
+        for result in results:
+            if result["status"] == "created":
+                result["document"] = next(documents)
+        return results
+
+    def import_documents_for_project(self, project_id: int, archive: UploadedDocument, user: User) -> Dict:
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        existing = self.document_repo.get_filenames_of_project(project.id)
+        skipped = []
+
+        def accepted_files():
+            for name, source in iter_archive(archive.stream):
+                # Directories are flattened; only the base name is used inside storage.
+                filename = PurePosixPath(name.replace("\\", "/")).name
+                if not filename or filename in (".", "..") or len(filename) > 128:
+                    skipped.append({"filename": name, "reason": "invalid_name"})
+                    continue
+                if filename in existing:
+                    skipped.append({"filename": name, "reason": "duplicate"})
+                    continue
+                existing.add(filename)
+                yield UploadedDocument(filename=filename, content_type=self._guess_type(filename), stream=source)
+
+        imported = self.document_repo.import_project_documents(project.id, accepted_files())
+        return {"imported": imported, "skipped": skipped}
+
+    @staticmethod
+    def _guess_type(filename: str) -> str:
+        content_type, _ = mimetypes.guess_type(filename)
+        if content_type is None or len(content_type) > 64:
+            return "application/octet-stream"
+        return content_type
+
+    def get_documents_of_project(self, project_id: int, user: User, fields: Optional[Sequence[str]] = None):
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        return self.document_repo.get_documents_of_project(project, fields)
+
+    def stream_documents_of_project(self, project_id: int, user: User, fields: Optional[Sequence[str]] = None) -> Iterator[Document]:
+        # Checked before the first row is sent, while the response can still be an error.
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        return self.document_repo.stream_documents_of_project(project, fields)
+
+    def get_documents_for_archive(self, project_id: int, user: User, document_ids: Optional[List[int]] = None, file_type: Optional[str] = None):
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        return self.document_repo.filter_documents_of_project(project, document_ids, file_type)
+
+    def search_documents(self, project_id: int, user: User, query: str, limit: int, offset: int) -> Dict:
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+        if not query.strip():
+            raise ValueError("Search query must not be empty")
+
+        total, matches = self.document_repo.search_documents(project, query, limit, offset)
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "results": [{"document": document, "rank": rank} for document, rank in matches]
+        }
 
     def get_project_document(self, project_id: int, document_id: int, user: User):
         project = self.project_service.get_project_and_check_permission(
@@ -36,12 +135,68 @@ class DocumentService:
 
         return document
 
+    def get_changes(self, project_id: int, user: User, since: Optional[int], limit: int) -> Dict:
+        """
+        Return up to `limit` changes after cursor `since` and the cursor to continue from. Without
+        `since` only the current cursor is returned, to start following the feed from now on.
+        RuntimeError means changes after `since` were pruned and the client has to resync.
+        """
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        cursor = self.document_repo.get_change_cursor(project.id)
+        if since is None:
+            return {"changes": [], "cursor": cursor, "has_more": False}
+        if since > cursor:
+            raise ValueError("Cursor is ahead of the change feed")
+
+        changes = self.document_repo.get_changes(project.id, since, limit + 1)
+        # Sequence numbers have no gaps, so a missing successor means it was pruned.
+        if since < cursor and (not changes or changes[0].seq != since + 1):
+            raise RuntimeError("Changes after this cursor are no longer available")
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return {
+            "changes": changes,
+            "cursor": changes[-1].seq if changes else since,
+            "has_more": has_more
+        }
+
+    def get_document_versions(self, project_id: int, document_id: int, user: User) -> List[DocumentVersion]:
+        document = self.get_project_document(project_id, document_id, user)
+        return self.document_repo.get_versions(document)
+
+    def get_document_version(self, project_id: int, document_id: int, version: int, user: User) -> Tuple[DocumentVersion, Iterator[bytes]]:
+        """Return an earlier version of a document together with an iterator over its content."""
+        document = self.get_project_document(project_id, document_id, user)
+        document_version = self.document_repo.get_version(document, version)
+        if not document_version:
+            raise LookupError("Document version not found")
+        return document_version, self.document_repo.read_version(document_version)
+
+    def get_document_signature(self, project_id: int, document_id: int, block_size: int, user: User) -> Dict:
+        document = self.get_project_document(project_id, document_id, user)
+        return {"version": document.version, "block_size": block_size, **self.document_repo.get_signature(document, block_size)}
+
+    def apply_document_delta(self, project_id: int, document_id: int, base_version: int, block_size: int, sha256: str, delta: BinaryIO, user: User) -> Document:
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        document = self.document_repo.get_project_document_by_id(project.id, document_id, lock=True)
+        if not document:
+            raise LookupError("Project's document not found")
+        # Block references are only meaningful for the content the signature was taken from.
+        if document.version != base_version:
+            raise RuntimeError(f"Document is at version {document.version}, the delta was built for version {base_version}")
+
+        return self.document_repo.apply_delta(document, delta, block_size, sha256)
+
     def update_document_for_project(self, project_id: int, document_id: int, file: UploadedDocument, user: User):
         project = self.project_service.get_project_and_check_permission(
             project_id, user, Role.participant)
 
-        document = self.document_repo.get_project_document_by_id(
-            project.id, document_id)
+        # Locked until the replacement commits, so concurrent updates and deletes run one after the other.
+        document = self.document_repo.get_project_document_by_id(project.id, document_id, lock=True)
         if not document:
             raise LookupError("Project's document not found")
 
@@ -55,8 +210,7 @@ class DocumentService:
         project = self.project_service.get_project_and_check_permission(
             project_id, user, Role.participant)
 
-        document = self.document_repo.get_project_document_by_id(
-            project.id, document_id)
+        document = self.document_repo.get_project_document_by_id(project.id, document_id, lock=True)
         if not document:
             raise LookupError("Project's document not found")
 
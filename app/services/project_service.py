@@ -1,8 +1,9 @@
+import quotas
 from models import User, Project
 from models.enums.role import Role
 from repositories import ProjectRepository, UserRepository
-from schemas import CreateProjectRequest
-from typing import List 
+from schemas import BulkParticipantsRequest, CreateProjectRequest
+from typing import Dict, Iterator, List, Optional, Sequence
 
 
 class ProjectService:
@@ -13,8 +14,19 @@ class ProjectService:
     def create_for_user(self, project_data: CreateProjectRequest, user: User) -> Project:
         return self.project_repo.create_for_user(project_data, user)
     
-    def get_user_projects(self, user: User) -> List[Project]:
-        return self.project_repo.get_user_projects(user)
+    def get_user_projects(self, user: User, fields: Optional[Sequence[str]] = None) -> List[Project]:
+        return self.project_repo.get_user_projects(user, fields)
+
+    def get_project_summaries(self, user: User, limit: int, offset: int) -> List:
+        return self.project_repo.get_user_project_summaries(user, limit, offset)
+
+    def search_user_projects(self, user: User, query: str, limit: int, offset: int, fields: Optional[Sequence[str]] = None) -> List[Project]:
+        if not query.strip():
+            raise ValueError("Search query must not be empty")
+        return self.project_repo.search_user_projects(user, query.strip(), limit, offset, fields)
+
+    def stream_user_projects(self, user: User, fields: Optional[Sequence[str]] = None) -> Iterator[Project]:
+        return self.project_repo.stream_user_projects(user, fields)
     
     def get_project_for_user(self, project_id: int, user: User):
         return self.get_project_and_check_permission(project_id, user, Role.participant)
@@ -39,6 +51,57 @@ class ProjectService:
         
         self.project_repo.add_participant(project, participant)
 
+    def bulk_update_participants(self, project_id: int, request: BulkParticipantsRequest, user: User) -> List[Dict]:
+        project = self.get_project_and_check_permission(project_id, user, Role.admin)
+
+        rows = self.user_repo.find_by_ids_or_usernames(request.user_ids, request.usernames)
+        ids_by_username = {username: id for id, username in rows}
+        known_ids = {id for id, _ in rows}
+
+        requested = [{"user_id": id} for id in dict.fromkeys(request.user_ids)]
+        requested += [{"username": username} for username in dict.fromkeys(request.usernames)]
+        for outcome in requested:
+            user_id = outcome.get("user_id", ids_by_username.get(outcome.get("username")))
+            outcome["user_id"] = user_id if user_id in known_ids else None
+        target_ids = list(dict.fromkeys(outcome["user_id"] for outcome in requested if outcome["user_id"] is not None))
+
+        if request.action == "add":
+            changed = self.project_repo.add_participants(project, target_ids)
+            roles = {}
+        else:
+            roles = self.project_repo.get_roles(project, target_ids)
+            changed = self.project_repo.remove_participants(project, target_ids)
+
+        statuses = {}
+        for user_id in target_ids:
+            if user_id in changed:
+                statuses[user_id] = "added" if request.action == "add" else "removed"
+            elif request.action == "add":
+                statuses[user_id] = "already_participant"
+            elif roles.get(user_id) == Role.admin:
+                statuses[user_id] = "is_admin"
+            else:
+                statuses[user_id] = "not_participant"
+
+        for outcome in requested:
+            outcome["status"] = statuses.get(outcome["user_id"], "not_found")
+        return requested
+
+    def get_project_quota(self, project_id: int, user: User) -> Dict:
+        """Storage used by a project and by its owner, next to the configured limits."""
+        project = self.get_project_and_check_permission(project_id, user, Role.participant)
+        documents, total_bytes = self.project_repo.get_storage_usage(project.id)
+        owner_id = self.project_repo.get_owner_id(project.id)
+        owner_documents, owner_bytes = self.project_repo.get_owner_storage_usage(owner_id) if owner_id is not None else (0, 0)
+        return {
+            "project": quotas.usage_report(documents, total_bytes, quotas.PROJECT_MAX_DOCUMENTS, quotas.PROJECT_MAX_BYTES),
+            "owner": quotas.usage_report(owner_documents, owner_bytes, quotas.USER_MAX_DOCUMENTS, quotas.USER_MAX_BYTES)
+        }
+
+    def get_user_quota(self, user: User) -> Dict:
+        documents, total_bytes = self.project_repo.get_owner_storage_usage(user.id)
+        return quotas.usage_report(documents, total_bytes, quotas.USER_MAX_DOCUMENTS, quotas.USER_MAX_BYTES)
+
     def get_project_and_check_permission(self, project_id: int, user: User, permission_level: Role):
         project = self.project_repo.get_by_id(project_id)
         if not project:
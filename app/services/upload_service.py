@@ -0,0 +1,71 @@
+import os
+from typing import BinaryIO
+from models import User, UploadSession
+from models.enums.role import Role
+from repositories import UploadRepository
+from services import DocumentService, ProjectService
+from schemas import CreateUploadSessionRequest, UploadedDocument
+
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(50 * 1024 ** 3)))
+
+
+class UploadService:
+    def __init__(self, upload_repo: UploadRepository, document_service: DocumentService, project_service: ProjectService):
+        self.upload_repo = upload_repo
+        self.document_service = document_service
+        self.project_service = project_service
+
+    def create_session(self, project_id: int, upload_data: CreateUploadSessionRequest, user: User) -> UploadSession:
+        project = self.project_service.get_project_and_check_permission(
+            project_id, user, Role.participant)
+
+        if upload_data.length > MAX_UPLOAD_SIZE:
+            raise ValueError(f"Uploads are limited to {MAX_UPLOAD_SIZE} bytes")
+        # Rejected before any bytes are sent; finalizing checks the quota again.
+        self.document_service.check_quota(project.id, upload_data.length)
+
+        return self.upload_repo.create_session(
+            project.id, user.id, upload_data.filename, upload_data.content_type, upload_data.length)
+
+    def get_session(self, project_id: int, upload_id: str, user: User) -> UploadSession:
+        upload_session = self.upload_repo.get_active_session(upload_id)
+        if not upload_session or upload_session.project_id != project_id:
+            raise LookupError("Upload not found")
+        # Only the user who started the upload may continue it.
+        if upload_session.user_id != user.id:
+            raise PermissionError
+        return upload_session
+
+    def get_offset(self, upload_session: UploadSession) -> int:
+        """Number of bytes received without a gap from the start of the file."""
+        ranges = self.upload_repo.get_received_ranges(upload_session)
+        return ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+
+    def write_chunk(self, project_id: int, upload_id: str, offset: int, chunk: BinaryIO, user: User) -> UploadSession:
+        upload_session = self.get_session(project_id, upload_id, user)
+        size = chunk.seek(0, os.SEEK_END)
+        chunk.seek(0)
+        if offset < 0 or offset + size > upload_session.length:
+            raise ValueError("Chunk does not fit into the upload")
+
+        self.upload_repo.write_chunk(upload_session, offset, chunk)
+        return upload_session
+
+    def finalize(self, project_id: int, upload_id: str, user: User):
+        upload_session = self.get_session(project_id, upload_id, user)
+        if self.get_offset(upload_session) < upload_session.length:
+            raise RuntimeError("Upload is incomplete")
+
+        with self.upload_repo.open_staging_file(upload_session) as staging:
+            document = self.document_service.create_document_for_project(
+                project_id,
+                UploadedDocument(filename=upload_session.filename, content_type=upload_session.content_type, stream=staging),
+                user
+            )
+
+        self.upload_repo.delete_session(upload_session)
+        return document
+
+    def abort(self, project_id: int, upload_id: str, user: User):
+        upload_session = self.get_session(project_id, upload_id, user)
+        self.upload_repo.delete_session(upload_session)
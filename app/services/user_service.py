@@ -2,6 +2,7 @@ from models.user import User
 from repositories import UserRepository
 from services import AuthService
 from schemas import CreateUserRequest
+from typing import Dict, List
 
 
 class UserService:
@@ -16,3 +17,18 @@ class UserService:
         hashed_password = AuthService.hash_password(user_data.password)
         user = self.user_repo.create(user_data, hashed_password)
         return user
+
+    def search_users(self, prefix: str, limit: int, offset: int) -> List[Dict]:
+        if not prefix.strip():
+            raise ValueError("Search prefix must not be empty")
+        rows = self.user_repo.search_by_username_prefix(prefix.strip(), limit, offset)
+        return [{"id": user_id, "username": username} for user_id, username in rows]
+
+    def resolve_usernames(self, usernames: List[str]) -> Dict:
+        """Map usernames to user ids, in request order, reporting the names that do not exist."""
+        usernames = list(dict.fromkeys(usernames))
+        ids = {username: user_id for user_id, username in self.user_repo.find_by_ids_or_usernames([], usernames)}
+        return {
+            "users": [{"id": ids[username], "username": username} for username in usernames if username in ids],
+            "not_found": [username for username in usernames if username not in ids]
+        }
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+from loadtest.runner import LoadConfig, run_load
+from loadtest.scenarios import SCENARIOS
+from loadtest.seed import seed
+
+DEFAULT_USERNAME_TEMPLATE = "loaduser{n}"
+DEFAULT_PASSWORD = "loadtest-password"
+
+
+def parse_range(value: str) -> range:
+    first, _, last = value.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="bulk load test data with COPY")
+    seed_parser.add_argument("--users", type=int, default=100_000)
+    seed_parser.add_argument("--projects", type=int, default=50_000)
+    seed_parser.add_argument("--members-per-project", type=int, default=5)
+    seed_parser.add_argument("--documents-per-project", type=int, default=20)
+    seed_parser.add_argument("--username-template", default=DEFAULT_USERNAME_TEMPLATE)
+    seed_parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    seed_parser.add_argument("--seed", type=int, default=0, help="random seed for memberships and file types")
+    seed_parser.add_argument("--storage-dir", help="also write the document files below this storage directory")
+
+    run_parser = commands.add_parser("run", help="generate load against a running API")
+    run_parser.add_argument("--base-url", default="http://localhost:8000")
+    run_parser.add_argument("--in-process", action="store_true",
+                            help="drive the app in this process through ASGI instead of over HTTP (needs PYTHONPATH=app)")
+    run_parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    run_parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    run_parser.add_argument("--duration", type=float, default=60, help="seconds")
+    run_parser.add_argument("--user-range", type=parse_range, default=parse_range("1-1000"),
+                            help="ids of the seeded users to log in as, e.g. 1-100000")
+    run_parser.add_argument("--username-template", default=DEFAULT_USERNAME_TEMPLATE)
+    run_parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    run_parser.add_argument("--file-size", type=int, default=64 * 1024, help="mean upload size in bytes")
+    run_parser.add_argument("--think-time", type=float, default=0, help="mean pause between requests in seconds")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        seed(
+            users=args.users,
+            projects=args.projects,
+            members_per_project=args.members_per_project,
+            documents_per_project=args.documents_per_project,
+            username_template=args.username_template,
+            password=args.password,
+            seed_value=args.seed,
+            storage_dir=args.storage_dir,
+        )
+        return
+
+    config = LoadConfig(
+        base_url="http://loadtest" if args.in_process else args.base_url,
+        scenario=args.scenario,
+        users=args.users,
+        duration=args.duration,
+        username_template=args.username_template,
+        user_range=args.user_range,
+        password=args.password,
+        file_size=args.file_size,
+        think_time=args.think_time,
+    )
+    transport = None
+    if args.in_process:
+        import httpx
+        from main import app
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    stats = asyncio.run(run_load(config, transport))
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+import httpx
+from loadtest.stats import LoadStats
+
+
+@dataclass
+class LoadConfig:
+    base_url: str
+    scenario: str
+    users: int
+    duration: float
+    username_template: str
+    user_range: range
+    password: str
+    file_size: int
+    think_time: float
+
+
+@dataclass
+class VirtualUser:
+    client: httpx.AsyncClient
+    stats: LoadStats
+    config: LoadConfig
+    username: str = ""
+    token: str | None = None
+    project_ids: List[int] = field(default_factory=list)
+    documents: Dict[int, List[int]] = field(default_factory=dict)
+    uploaded: List[tuple[int, int]] = field(default_factory=list)
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        """Send a request and record its latency under the endpoint (route template) name."""
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["token"] = self.token
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - start, ok=False)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - start, ok=response.status_code < 400)
+        return response
+
+    def random_username(self) -> str:
+        return self.config.username_template.format(n=random.choice(self.config.user_range))
+
+    async def login(self, username: str | None = None) -> bool:
+        self.username = username or self.random_username()
+        self.token = None
+        response = await self.request("POST /login", "POST", "/login", json={
+            "username": self.username,
+            "password": self.config.password,
+        })
+        if response is None or response.status_code != 200:
+            return False
+        self.token = response.json()["token"]
+        return True
+
+    async def refresh_projects(self):
+        response = await self.request("GET /projects", "GET", "/projects")
+        if response is not None and response.status_code == 200:
+            self.project_ids = [project["id"] for project in response.json()]
+
+
+Scenario = Callable[[VirtualUser], Awaitable[None]]
+
+
+async def run_virtual_user(client: httpx.AsyncClient, stats: LoadStats, config: LoadConfig, scenario: "Scenario", setup: "Scenario | None", deadline: float):
+    user = VirtualUser(client=client, stats=stats, config=config)
+    if setup is not None:
+        await setup(user)
+    while time.perf_counter() < deadline:
+        await scenario(user)
+        if config.think_time:
+            await asyncio.sleep(random.expovariate(1 / config.think_time))
+
+
+async def run_load(config: LoadConfig, transport: httpx.AsyncBaseTransport | None = None) -> LoadStats:
+    from loadtest.scenarios import SCENARIOS
+
+    setup, scenario = SCENARIOS[config.scenario]
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=config.users, max_keepalive_connections=config.users)
+    async with httpx.AsyncClient(base_url=config.base_url, limits=limits, timeout=60, transport=transport) as client:
+        deadline = time.perf_counter() + config.duration
+        await asyncio.gather(*(
+            run_virtual_user(client, stats, config, scenario, setup, deadline)
+            for _ in range(config.users)
+        ))
+    stats.finish()
+    return stats
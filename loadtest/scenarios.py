@@ -0,0 +1,92 @@
+import os
+import random
+from typing import Dict, Tuple
+from loadtest.runner import Scenario, VirtualUser
+
+
+async def setup_logged_in_user(user: VirtualUser):
+    if await user.login():
+        await user.refresh_projects()
+
+
+async def login_storm(user: VirtualUser):
+    """Every iteration logs in as a random seeded user: bcrypt bound, like a morning login peak."""
+    await user.login()
+
+
+async def document_list_polling(user: VirtualUser):
+    """Sync clients polling the document index of their projects."""
+    if not user.project_ids:
+        await user.refresh_projects()
+        if not user.project_ids:
+            return
+    project_id = random.choice(user.project_ids)
+    response = await user.request(
+        "GET /projects/{project_id}/documents", "GET", f"/projects/{project_id}/documents")
+    if response is not None and response.status_code == 200:
+        user.documents[project_id] = [document["id"] for document in response.json()]
+
+
+async def upload_document(user: VirtualUser):
+    if not user.project_ids:
+        return
+    project_id = random.choice(user.project_ids)
+    filename = f"loadtest-{os.urandom(8).hex()}.bin"
+    content = os.urandom(max(1, int(random.expovariate(1 / user.config.file_size))))
+    response = await user.request(
+        "POST /projects/{project_id}/documents", "POST", f"/projects/{project_id}/documents",
+        files={"file": (filename, content, "application/octet-stream")})
+    if response is not None and response.status_code == 201:
+        user.uploaded.append((project_id, response.json()["id"]))
+
+
+async def download_document(user: VirtualUser):
+    candidates = user.uploaded or [
+        (project_id, document_id)
+        for project_id, document_ids in user.documents.items()
+        for document_id in document_ids
+    ]
+    if not candidates:
+        await document_list_polling(user)
+        return
+    project_id, document_id = random.choice(candidates)
+    await user.request(
+        "GET /projects/{project_id}/documents/{document_id}/download", "GET",
+        f"/projects/{project_id}/documents/{document_id}/download")
+
+
+async def delete_uploaded_document(user: VirtualUser):
+    if not user.uploaded:
+        return
+    project_id, document_id = user.uploaded.pop(random.randrange(len(user.uploaded)))
+    await user.request(
+        "DELETE /projects/{project_id}/documents/{document_id}", "DELETE",
+        f"/projects/{project_id}/documents/{document_id}")
+
+
+async def mixed_uploads_downloads(user: VirtualUser):
+    """Upload heavy traffic: uploads, downloads and cleanup of own uploads."""
+    action = random.choices(
+        [upload_document, download_document, document_list_polling, delete_uploaded_document],
+        weights=[35, 45, 10, 10]
+    )[0]
+    await action(user)
+
+
+async def mixed(user: VirtualUser):
+    """Approximation of production traffic: mostly polling, some file transfer, a few logins."""
+    action = random.choices(
+        [document_list_polling, mixed_uploads_downloads, login_storm],
+        weights=[70, 25, 5]
+    )[0]
+    await action(user)
+    if action is login_storm:
+        await user.refresh_projects()
+
+
+SCENARIOS: Dict[str, Tuple[Scenario | None, Scenario]] = {
+    "login-storm": (None, login_storm),
+    "document-polling": (setup_logged_in_user, document_list_polling),
+    "uploads-downloads": (setup_logged_in_user, mixed_uploads_downloads),
+    "mixed": (setup_logged_in_user, mixed),
+}
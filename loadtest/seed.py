@@ -0,0 +1,161 @@
+import csv
+import io
+import os
+import random
+import time
+from datetime import datetime
+from typing import Iterable, Iterator
+import bcrypt
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FILE_TYPES = ["text/plain", "text/csv", "application/json", "application/pdf", "image/png"]
+
+
+def get_dsn() -> str:
+    return (
+        f"host={os.getenv('POSTGRES_HOST')} port={os.getenv('POSTGRES_PORT')} dbname={os.getenv('POSTGRES_DB')} "
+        f"user={os.getenv('POSTGRES_USER')} password={os.getenv('POSTGRES_PASSWORD')}"
+    )
+
+
+class CsvStream(io.RawIOBase):
+    """File-like object that renders rows to CSV lazily, so COPY streams with constant memory."""
+
+    def __init__(self, rows: Iterable[tuple]) -> None:
+        self.rows: Iterator[tuple] = iter(rows)
+        self.buffer = b""
+        self.text = io.StringIO()
+        self.writer = csv.writer(self.text)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def _next_chunk(self, batch: int = 1000) -> bytes:
+        self.text.seek(0)
+        self.text.truncate()
+        for _ in range(batch):
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.writer.writerow(row)
+        return self.text.getvalue().encode()
+
+
+def copy_rows(cursor, table: str, columns: list[str], rows: Iterable[tuple]):
+    start = time.perf_counter()
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", CsvStream(rows))
+    print(f"  {table}: {cursor.rowcount} rows in {time.perf_counter() - start:.1f}s")
+
+
+def next_id(cursor, table: str) -> int:
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def seed(
+    users: int,
+    projects: int,
+    members_per_project: int,
+    documents_per_project: int,
+    username_template: str,
+    password: str,
+    seed_value: int = 0,
+    storage_dir: str | None = None,
+):
+    """
+    Bulk load users, projects, memberships and documents with COPY, together with the
+    project_stats counters and change feed entries the application would have written.
+
+    Ids are assigned here instead of by the sequences so the association rows
+    can be generated without reading anything back; the sequences are moved
+    past the new ids at the end.
+    """
+    rng = random.Random(seed_value)
+    # One hash for everyone: hashing millions of passwords would dominate the run.
+    password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+    with psycopg2.connect(get_dsn()) as connection, connection.cursor() as cursor:
+        first_user = next_id(cursor, "users")
+        first_project = next_id(cursor, "projects")
+        first_document = next_id(cursor, "documents")
+        user_ids = range(first_user, first_user + users)
+        project_ids = range(first_project, first_project + projects)
+
+        print(f"Seeding {users} users ({username_template.format(n=first_user)} .. "
+              f"{username_template.format(n=user_ids[-1])}), {projects} projects, "
+              f"{projects * members_per_project} memberships, {projects * documents_per_project} documents")
+
+        copy_rows(cursor, "users", ["id", "username", "password"], (
+            (user_id, username_template.format(n=user_id), password_hash) for user_id in user_ids
+        ))
+        copy_rows(cursor, "projects", ["id", "name", "description"], (
+            (project_id, f"Load test project {project_id}", f"Seeded project {project_id}") for project_id in project_ids
+        ))
+        copy_rows(cursor, "user_project", ["user_id", "project_id", "role"], (
+            membership
+            for project_id in project_ids
+            for membership in _memberships(rng, project_id, user_ids, members_per_project)
+        ))
+        copy_rows(cursor, "documents", ["id", "project_id", "filename", "file_type", "size"], (
+            (first_document + index * documents_per_project + n, project_id, f"document-{n}.txt",
+             rng.choice(FILE_TYPES), len(_document_content(project_id, n)))
+            for index, project_id in enumerate(project_ids)
+            for n in range(documents_per_project)
+        ))
+        # What the application keeps up to date on every write: the feed holds one creation
+        # per document and the counters match the rows above.
+        copy_rows(cursor, "document_changes", ["project_id", "seq", "document_id", "action", "filename", "version"], (
+            (project_id, n + 1, first_document + index * documents_per_project + n, "created", f"document-{n}.txt", 1)
+            for index, project_id in enumerate(project_ids)
+            for n in range(documents_per_project)
+        ))
+        members = min(members_per_project, users)
+        seeded_at = datetime.now().isoformat()
+        copy_rows(cursor, "project_stats", ["project_id", "document_count", "member_count", "total_bytes", "last_activity_at", "change_seq"], (
+            (project_id, documents_per_project, members,
+             sum(len(_document_content(project_id, n)) for n in range(documents_per_project)), seeded_at, documents_per_project)
+            for project_id in project_ids
+        ))
+
+        for table in ("users", "projects", "documents"):
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+
+    if storage_dir:
+        _write_document_files(storage_dir, project_ids, documents_per_project)
+
+
+def _memberships(rng: random.Random, project_id: int, user_ids: range, members: int):
+    members = min(members, len(user_ids))
+    chosen = rng.sample(user_ids, members)
+    yield chosen[0], project_id, "admin"
+    for user_id in chosen[1:]:
+        yield user_id, project_id, "participant"
+
+
+def _document_content(project_id: int, n: int) -> bytes:
+    return f"Seeded document {n} of project {project_id}\n".encode()
+
+
+def _write_document_files(storage_dir: str, project_ids: range, documents_per_project: int):
+    start = time.perf_counter()
+    for project_id in project_ids:
+        directory = os.path.join(storage_dir, "documents", str(project_id))
+        os.makedirs(directory, exist_ok=True)
+        for n in range(documents_per_project):
+            with open(os.path.join(directory, f"document-{n}.txt"), "wb") as file:
+                file.write(_document_content(project_id, n))
+    print(f"  files: written in {time.perf_counter() - start:.1f}s")
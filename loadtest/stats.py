@@ -0,0 +1,59 @@
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.started_at = time.perf_counter()
+        self.finished_at: float | None = None
+
+    def record(self, endpoint: str, latency: float, ok: bool):
+        stats = self.endpoints[endpoint]
+        stats.latencies.append(latency)
+        if not ok:
+            stats.errors += 1
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def report(self) -> str:
+        header = f"{'endpoint':<62} {'count':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        lines = [header, "-" * len(header)]
+        total = EndpointStats()
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines.append(self._format_row(endpoint, stats))
+            total.latencies.extend(stats.latencies)
+            total.errors += stats.errors
+        lines.append("-" * len(header))
+        lines.append(self._format_row("total", total))
+        return "\n".join(lines)
+
+    def _format_row(self, endpoint: str, stats: EndpointStats) -> str:
+        count = len(stats.latencies)
+        throughput = count / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{endpoint:<62} {count:>8} {stats.errors:>7} {throughput:>9.1f} "
+            f"{stats.percentile(50) * 1000:>9.1f} {stats.percentile(95) * 1000:>9.1f} "
+            f"{stats.percentile(99) * 1000:>9.1f} {max(stats.latencies, default=0.0) * 1000:>9.1f}"
+        )
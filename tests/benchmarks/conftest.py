@@ -0,0 +1,73 @@
+import pytest
+from fakes import InMemoryDocumentRepository, InMemoryProjectRepository, InMemoryUserRepository
+from factories import make_project_request, make_register_request, make_uploaded_document
+from models import Project, User
+from services import AuthService, DocumentService, ProjectService
+
+USER_COUNT = 1000
+PROJECT_COUNT = 200
+DOCUMENT_COUNT = 500
+
+
+@pytest.fixture
+def in_memory_user_repo():
+    """Fixture for an in-memory UserRepository seeded with users."""
+    repo = InMemoryUserRepository()
+    for n in range(USER_COUNT):
+        repo.create(make_register_request(username=f"user-{n}"), "hashed_password")
+    return repo
+
+
+@pytest.fixture
+def in_memory_project_repo(in_memory_user_repo: InMemoryUserRepository):
+    """Fixture for an in-memory ProjectRepository where every user takes part in the first project."""
+    repo = InMemoryProjectRepository()
+    owner = in_memory_user_repo.get_by_id(1)
+    for n in range(PROJECT_COUNT):
+        repo.create_for_user(make_project_request(name=f"Project {n}"), owner)
+    first_project = repo.get_by_id(1)
+    for user in list(in_memory_user_repo.users.values())[1:]:
+        repo.add_participant(first_project, user)
+    return repo
+
+
+@pytest.fixture
+def in_memory_document_repo():
+    """Fixture for an in-memory DocumentRepository with documents in the first project."""
+    repo = InMemoryDocumentRepository()
+    for n in range(DOCUMENT_COUNT):
+        repo.create_project_document(1, make_uploaded_document(f"document-{n}.txt"))
+    return repo
+
+
+@pytest.fixture
+def fast_project_service(in_memory_project_repo, in_memory_user_repo):
+    """Fixture for a ProjectService backed by in-memory repositories."""
+    return ProjectService(in_memory_project_repo, in_memory_user_repo)
+
+
+@pytest.fixture
+def fast_document_service(in_memory_document_repo, fast_project_service):
+    """Fixture for a DocumentService backed by in-memory repositories."""
+    return DocumentService(in_memory_document_repo, fast_project_service)
+
+
+@pytest.fixture
+def fast_auth_service(in_memory_user_repo):
+    """Fixture for an AuthService backed by an in-memory repository."""
+    return AuthService(in_memory_user_repo)
+
+
+@pytest.fixture
+def project(in_memory_project_repo) -> Project:
+    return in_memory_project_repo.get_by_id(1)
+
+
+@pytest.fixture
+def admin(in_memory_user_repo) -> User:
+    return in_memory_user_repo.get_by_id(1)
+
+
+@pytest.fixture
+def participant(in_memory_user_repo) -> User:
+    return in_memory_user_repo.get_by_id(USER_COUNT)
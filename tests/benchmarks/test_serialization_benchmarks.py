@@ -0,0 +1,52 @@
+import json
+from typing import List
+import orjson
+from pydantic import TypeAdapter
+from schemas import ProjectDocumentOut, ProjectOut
+from serialization import dump_orm
+from fakes import InMemoryDocumentRepository, InMemoryProjectRepository
+
+# What FastAPI does with a response_model: validate from attributes, dump to JSON-able data, json.dumps.
+PROJECTS_ADAPTER = TypeAdapter(List[ProjectOut])
+DOCUMENTS_ADAPTER = TypeAdapter(List[ProjectDocumentOut])
+
+
+def response_model_path(adapter: TypeAdapter, objects) -> bytes:
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(schema, objects) -> bytes:
+    return orjson.dumps(dump_orm(schema, objects))
+
+
+def test_list_projects_response_model(benchmark, in_memory_project_repo: InMemoryProjectRepository):
+    projects = list(in_memory_project_repo.projects.values())
+
+    result = benchmark(response_model_path, PROJECTS_ADAPTER, projects)
+
+    assert len(json.loads(result)) == len(projects)
+
+
+def test_list_projects_fast(benchmark, in_memory_project_repo: InMemoryProjectRepository):
+    projects = list(in_memory_project_repo.projects.values())
+
+    result = benchmark(fast_path, ProjectOut, projects)
+
+    assert json.loads(result) == json.loads(response_model_path(PROJECTS_ADAPTER, projects))
+
+
+def test_list_project_documents_response_model(benchmark, in_memory_document_repo: InMemoryDocumentRepository):
+    documents = list(in_memory_document_repo.documents.values())
+
+    result = benchmark(response_model_path, DOCUMENTS_ADAPTER, documents)
+
+    assert len(json.loads(result)) == len(documents)
+
+
+def test_list_project_documents_fast(benchmark, in_memory_document_repo: InMemoryDocumentRepository):
+    documents = list(in_memory_document_repo.documents.values())
+
+    result = benchmark(fast_path, ProjectDocumentOut, documents)
+
+    assert json.loads(result) == json.loads(response_model_path(DOCUMENTS_ADAPTER, documents))
@@ -0,0 +1,105 @@
+import itertools
+from models import Project, User
+from models.enums import Role
+from services import AuthService, DocumentService, ProjectService
+from fakes import InMemoryDocumentRepository
+from factories import make_uploaded_document
+
+
+def test_get_project_and_check_permission_participant(
+    benchmark,
+    fast_project_service: ProjectService,
+    project: Project,
+    participant: User
+):
+    result = benchmark(fast_project_service.get_project_and_check_permission, project.id, participant, Role.participant)
+
+    assert result is project
+
+
+def test_get_project_and_check_permission_admin(
+    benchmark,
+    fast_project_service: ProjectService,
+    project: Project,
+    admin: User
+):
+    result = benchmark(fast_project_service.get_project_and_check_permission, project.id, admin, Role.admin)
+
+    assert result is project
+
+
+def test_get_documents_of_project(
+    benchmark,
+    fast_document_service: DocumentService,
+    in_memory_document_repo: InMemoryDocumentRepository,
+    project: Project,
+    participant: User
+):
+    result = benchmark(fast_document_service.get_documents_of_project, project.id, participant)
+
+    assert len(result) == len(in_memory_document_repo.documents)
+
+
+def test_get_project_document(
+    benchmark,
+    fast_document_service: DocumentService,
+    project: Project,
+    participant: User
+):
+    result = benchmark(fast_document_service.get_project_document, project.id, 42, participant)
+
+    assert result.id == 42
+
+
+def test_create_document_for_project(
+    benchmark,
+    fast_document_service: DocumentService,
+    project: Project,
+    participant: User
+):
+    filenames = (f"new-document-{n}.txt" for n in itertools.count())
+
+    def create():
+        return fast_document_service.create_document_for_project(
+            project.id, make_uploaded_document(next(filenames)), participant)
+
+    result = benchmark(create)
+
+    assert result.project_id == project.id
+
+
+def test_update_document_for_project(
+    benchmark,
+    fast_document_service: DocumentService,
+    project: Project,
+    participant: User
+):
+    file = make_uploaded_document("renamed-document.txt", b"Updated content.")
+
+    result = benchmark(fast_document_service.update_document_for_project, project.id, 1, file, participant)
+
+    assert result.filename == "renamed-document.txt"
+
+
+def test_delete_project_document(
+    benchmark,
+    fast_document_service: DocumentService,
+    project: Project,
+    participant: User
+):
+    filenames = (f"to-delete-{n}.txt" for n in itertools.count())
+
+    def setup():
+        document = fast_document_service.create_document_for_project(
+            project.id, make_uploaded_document(next(filenames)), participant)
+        return (project.id, document.id, participant), {}
+
+    benchmark.pedantic(fast_document_service.delete_project_document, setup=setup, rounds=200)
+
+
+def test_verify_token(benchmark, admin: User):
+    token = AuthService.create_access_token(admin)
+
+    result = benchmark(AuthService.verify_token, token)
+
+    assert result["userId"] == admin.id
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import Mock
-from repositories import UserRepository, ProjectRepository, DocumentRepository
-from services import UserService, ProjectService, DocumentService
+from repositories import UserRepository, ProjectRepository, DocumentRepository, UploadRepository
+from services import UserService, ProjectService, DocumentService, UploadService
 from schemas import CreateUserRequest, CreateProjectRequest, UploadedDocument
 
 @pytest.fixture
@@ -39,6 +39,21 @@ def document_service(project_service_mock, document_repo_mock):
     """Fixture for the DocumentService."""
     return DocumentService(document_repo_mock, project_service_mock)
 
+@pytest.fixture
+def upload_repo_mock():
+    """Fixture for a mocked UploadRepository."""
+    return Mock(spec=UploadRepository)
+
+@pytest.fixture
+def document_service_mock():
+    """Fixture for a mocked DocumentService."""
+    return Mock(spec=DocumentService)
+
+@pytest.fixture
+def upload_service(upload_repo_mock, document_service_mock, project_service_mock):
+    """Fixture for the UploadService."""
+    return UploadService(upload_repo_mock, document_service_mock, project_service_mock)
+
 @pytest.fixture
 def user_data():
     """Fixture for the CreateUserRequest data."""
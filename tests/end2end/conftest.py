@@ -6,9 +6,11 @@ from alembic import command
 from alembic.config import Config
 from fastapi.testclient import TestClient
 from sqlalchemy import text
-from dependencies import get_document_repository, get_test_document_repository
+from dependencies import get_document_repository, get_test_document_repository, get_test_upload_repository, get_upload_repository
 from main import app
-from db import get_db, get_test_db, TEST_DB_URL, Base
+from cache import project_cache
+from db import get_db, get_test_db, TEST_DB_URL, Base, TestSessionLocal
+from instrumentation import enable_strict_loading
 from models import User, Project
 from factories import create_document, create_project, create_user
 
@@ -22,10 +24,19 @@ def apply_migrations():
     yield
     command.downgrade(alembic_cfg, "base")
 
+@pytest.fixture(scope="session", autouse=True)
+def strict_loading():
+    # Any lazy relationship load in a handler fails the test suite.
+    enable_strict_loading(TestSessionLocal)
+
 @pytest.fixture(scope="session")
 def client(apply_migrations):
     app.dependency_overrides[get_db] = get_test_db
     app.dependency_overrides[get_document_repository] = get_test_document_repository
+    app.dependency_overrides[get_upload_repository] = get_test_upload_repository
+    # The cache listener and background jobs started with the app use the test database too.
+    app.state.session_factory = TestSessionLocal
+    app.state.use_test_dir = True
     with TestClient(app) as c:
         yield c
 
@@ -38,6 +49,8 @@ def truncate_tables(test_db):
         for table in reversed(Base.metadata.sorted_tables):
             conn.execute(table.delete())
         conn.execute(text("SET session_replication_role = DEFAULT;"))
+    # Truncation bypasses the repositories, so nothing announced these rows as gone.
+    project_cache.clear()
 
 @pytest.fixture(autouse=True)
 def delete_files():
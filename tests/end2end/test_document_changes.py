@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import User, Project, Document
+from services import AuthService
+
+
+def test_change_feed_follows_document_writes(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that creations, updates and deletions appear in order after the cursor, page by page.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    url = f"/projects/{project.id}/changes"
+    document_factory(project, filename="old.txt", content="old")
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"changes": [], "cursor": 1, "has_more": False}
+
+    document = document_factory(project, filename="a.txt", content="a")
+    client.put(f"/projects/{project.id}/documents/{document.id}", files={"file": ("b.txt", b"b", "text/plain")}, headers=headers)
+    client.post(f"/projects/{project.id}/documents/batch", files=[("files", ("c.txt", b"c", "text/plain"))], headers=headers)
+    client.delete(f"/projects/{project.id}/documents/{document.id}", headers=headers)
+
+    response = client.get(url, params={"since": 1, "limit": 3}, headers=headers)
+    body = response.json()
+    assert [(c["seq"], c["action"], c["filename"], c["version"]) for c in body["changes"]] == [
+        (2, "created", "a.txt", 1), (3, "updated", "b.txt", 2), (4, "created", "c.txt", 1)]
+    assert (body["cursor"], body["has_more"]) == (4, True)
+
+    body = client.get(url, params={"since": body["cursor"]}, headers=headers).json()
+    assert [(c["action"], c["document_id"]) for c in body["changes"]] == [("deleted", document.id)]
+    assert (body["cursor"], body["has_more"]) == (5, False)
+
+    body = client.get(url, params={"since": 5}, headers=headers).json()
+    assert body == {"changes": [], "cursor": 5, "has_more": False}
+    assert client.get(url, params={"since": 6}, headers=headers).status_code == 400
+
+
+def test_pruned_cursor_requires_resync(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a cursor whose following changes were pruned is answered with 410.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project, filename="a.txt", content="a")
+    document_factory(project, filename="b.txt", content="b")
+    test_db.execute(text("DELETE FROM document_changes WHERE seq = 1"))
+    test_db.commit()
+
+    assert client.get(f"/projects/{project.id}/changes", params={"since": 0}, headers=headers).status_code == 410
+    assert client.get(f"/projects/{project.id}/changes", params={"since": 1}, headers=headers).status_code == 200
+    stranger = {"token": AuthService.create_access_token(user_factory(username="stranger"))}
+    assert client.get(f"/projects/{project.id}/changes", params={"since": 0}, headers=stranger).status_code == 403
@@ -0,0 +1,97 @@
+import hashlib
+import struct
+from fastapi.testclient import TestClient
+from typing import Callable
+from models import User, Project, Document
+from services import AuthService
+
+BLOCK_SIZE = 4096
+
+
+def build_delta(signature: dict, content: bytes) -> bytes:
+    """Block-aligned client side delta: copy blocks the server already has, send the rest."""
+    known = {block["strong"]: index for index, block in enumerate(signature["blocks"])}
+    block_size = signature["block_size"]
+    delta = b""
+    for start in range(0, len(content), block_size):
+        block = content[start:start + block_size]
+        index = known.get(hashlib.sha256(block).hexdigest())
+        if index is not None:
+            delta += b"C" + struct.pack(">QI", index, 1)
+        else:
+            delta += b"L" + struct.pack(">I", len(block)) + block
+    return delta
+
+
+def test_delta_update_rebuilds_document_from_existing_blocks(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a document is updated from its signature and a delta carrying only the changed block.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    original = b"".join(bytes([65 + i]) * BLOCK_SIZE for i in range(4)).decode()
+    document = document_factory(project, filename="big.txt", content=original)
+    url = f"/projects/{project.id}/documents/{document.id}"
+
+    response = client.get(f"{url}/signature", params={"block_size": BLOCK_SIZE}, headers=headers)
+    assert response.status_code == 200
+    signature = response.json()
+    assert (signature["version"], signature["size"], len(signature["blocks"])) == (1, 4 * BLOCK_SIZE, 4)
+
+    updated = original.encode()[:BLOCK_SIZE] + b"Z" * BLOCK_SIZE + original.encode()[2 * BLOCK_SIZE:] + b"tail"
+    delta = build_delta(signature, updated)
+    assert len(delta) < 2 * BLOCK_SIZE
+    response = client.post(
+        f"{url}/delta",
+        params={"base_version": 1, "block_size": BLOCK_SIZE, "sha256": hashlib.sha256(updated).hexdigest()},
+        content=delta,
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.json()["size"] == len(updated)
+    assert client.get(f"{url}/download", headers=headers).content == updated
+    assert client.get(f"{url}/versions/1/download", headers=headers).content == original.encode()
+
+
+def test_delta_with_wrong_hash_or_stale_base_is_rejected(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a result with the wrong sha256 or a delta built for an older version changes nothing.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document = document_factory(project, filename="notes.txt", content="a" * BLOCK_SIZE)
+    url = f"/projects/{project.id}/documents/{document.id}"
+    delta = b"C" + struct.pack(">QI", 0, 1) + b"L" + struct.pack(">I", 3) + b"new"
+
+    response = client.post(
+        f"{url}/delta",
+        params={"base_version": 1, "block_size": BLOCK_SIZE, "sha256": "0" * 64},
+        content=delta,
+        headers=headers
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        f"{url}/delta",
+        params={"base_version": 0, "block_size": BLOCK_SIZE, "sha256": hashlib.sha256(b"a" * BLOCK_SIZE + b"new").hexdigest()},
+        content=delta,
+        headers=headers
+    )
+    assert response.status_code == 409
+
+    response = client.get(url, headers=headers)
+    assert (response.json()["version"], response.json()["size"]) == (1, BLOCK_SIZE)
+    assert client.get(f"{url}/download", headers=headers).content == b"a" * BLOCK_SIZE
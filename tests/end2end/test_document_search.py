@@ -0,0 +1,130 @@
+from fastapi.testclient import TestClient
+from typing import Callable
+from db import TestSessionLocal
+from jobs import index_documents
+from models import User, Project, Document
+from repositories import DocumentRepository
+from services import AuthService
+
+
+def test_search_ranks_matching_documents(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that indexed text documents are found by content, best match first.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project, filename="mention.txt", content="The invoice is attached to the mail.")
+    document_factory(project, filename="invoices.md", content="Invoice numbers, invoice dates and invoice totals.", file_type="text/markdown")
+    document_factory(project, filename="unrelated.txt", content="Meeting notes about the roadmap.")
+
+    assert index_documents(TestSessionLocal, use_test_dir=True) == 3
+
+    response = client.get(f"/projects/{project.id}/documents/search", params={"q": "invoices"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert [hit["document"]["filename"] for hit in response.json()["results"]] == ["invoices.md", "mention.txt"]
+
+
+def test_search_is_paginated(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that limit and offset page through the matches while total counts all of them.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    for n in range(5):
+        document_factory(project, filename=f"report-{n}.txt", content="Quarterly report.")
+    index_documents(TestSessionLocal, use_test_dir=True)
+
+    response = client.get(
+        f"/projects/{project.id}/documents/search",
+        params={"q": "report", "limit": 2, "offset": 4},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 5
+    assert [hit["document"]["filename"] for hit in response.json()["results"]] == ["report-4.txt"]
+
+
+def test_binary_and_updated_documents_are_not_matched(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that binary documents are not indexed and a replaced document is searched by its new content.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project, filename="blob.bin", content="secret words", file_type="application/octet-stream")
+    document = document_factory(project, filename="notes.txt", content="secret words")
+    index_documents(TestSessionLocal, use_test_dir=True)
+
+    client.put(
+        f"/projects/{project.id}/documents/{document.id}",
+        files={"file": ("notes.txt", b"nothing to see", "text/plain")},
+        headers=headers
+    )
+    index_documents(TestSessionLocal, use_test_dir=True)
+
+    response = client.get(f"/projects/{project.id}/documents/search", params={"q": "secret"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"total": 0, "limit": 20, "offset": 0, "results": []}
+
+
+def test_user_cannot_search_another_users_project(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that searching a project the user is not a member of is forbidden.
+    """
+    owner = user_factory(username="owner")
+    non_owner = user_factory(username="non_owner")
+    headers = {"token": AuthService.create_access_token(non_owner)}
+    project = project_factory(user=owner)
+
+    response = client.get(f"/projects/{project.id}/documents/search", params={"q": "anything"}, headers=headers)
+
+    assert response.status_code == 403
+
+
+def test_unreadable_document_does_not_block_indexing(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a document whose file cannot be read is indexed without content and the rest are searchable.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    broken = document_factory(project, filename="broken.txt", content="Quarterly report.")
+    document_factory(project, filename="report.txt", content="Quarterly report.")
+    with open(DocumentRepository(None, True).get_document_path(broken), "wb") as file:
+        file.write(b"\x1f\x8b not really gzip")
+
+    assert index_documents(TestSessionLocal, use_test_dir=True) == 2
+    assert index_documents(TestSessionLocal, use_test_dir=True) == 0
+
+    response = client.get(f"/projects/{project.id}/documents/search", params={"q": "report"}, headers=headers)
+    assert [hit["document"]["filename"] for hit in response.json()["results"]] == ["report.txt"]
@@ -0,0 +1,138 @@
+import os
+import random
+import pytest
+from datetime import timedelta
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy.orm import Session
+from compression import iter_content_blocks
+from db import TestSessionLocal
+from jobs import prune_document_versions, version_retention
+from models import User, Project, Document, Blob, DocumentVersion
+from repositories import DocumentVersionRepository, document_version_repository
+from services import AuthService
+
+
+def test_updates_keep_earlier_versions(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that every replacement keeps the previous content as a downloadable version.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document = document_factory(project, filename="notes.txt", content="first")
+    url = f"/projects/{project.id}/documents/{document.id}"
+
+    client.put(url, files={"file": ("notes.txt", b"second", "text/plain")}, headers=headers)
+    response = client.put(url, files={"file": ("renamed.txt", b"third", "text/plain")}, headers=headers)
+    assert response.json()["version"] == 3
+
+    response = client.get(f"{url}/versions", headers=headers)
+    assert response.status_code == 200
+    assert [(v["version"], v["filename"], v["size"]) for v in response.json()] == [(2, "notes.txt", 6), (1, "notes.txt", 5)]
+
+    response = client.get(f"{url}/versions/1/download", headers=headers)
+    assert response.status_code == 200
+    assert response.content == b"first"
+    assert client.get(f"{url}/download", headers=headers).content == b"third"
+    assert client.get(f"{url}/versions/3/download", headers=headers).status_code == 404
+
+
+def test_versions_share_unchanged_blocks(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that history only stores the blocks that changed between versions, also when a byte
+    is inserted near the start.
+    """
+    monkeypatch.setattr(document_version_repository, "VERSION_BLOCK_SIZE", 4096)
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    first = random.Random(0).randbytes(128 * 1024)
+    second = first[:100] + b"X" + first[100:]
+    response = client.post(f"/projects/{project.id}/documents", files={"file": ("data.bin", first, "application/octet-stream")}, headers=headers)
+    url = f"/projects/{project.id}/documents/{response.json()['id']}"
+
+    client.put(url, files={"file": ("data.bin", second, "application/octet-stream")}, headers=headers)
+    client.put(url, files={"file": ("data.bin", b"third", "application/octet-stream")}, headers=headers)
+
+    # The second version only adds the block holding the inserted byte.
+    first_blocks = set(iter_content_blocks([first], 4096))
+    assert test_db.query(Blob).count() == len(first_blocks) + 1
+    assert client.get(f"{url}/versions/1/download", headers=headers).content == first
+    assert client.get(f"{url}/versions/2/download", headers=headers).content == second
+
+
+def test_retention_prunes_versions_and_unused_blobs(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that the retention job keeps the newest versions and deletes blobs nothing uses.
+    """
+    monkeypatch.setattr(version_retention, "VERSION_RETENTION_COUNT", 1)
+    monkeypatch.setattr(version_retention, "BLOB_GC_GRACE", 0)
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document = document_factory(project, filename="notes.txt", content="first")
+    url = f"/projects/{project.id}/documents/{document.id}"
+    for content in (b"second", b"third"):
+        client.put(url, files={"file": ("notes.txt", content, "text/plain")}, headers=headers)
+    blob_paths = [
+        os.path.join(os.getenv("TEST_STORAGE_DIR", "data-test"), "blobs", blob.hash[:2], blob.hash)
+        for blob in test_db.query(Blob).all()
+    ]
+    assert len(blob_paths) == 2
+
+    assert prune_document_versions(TestSessionLocal, use_test_dir=True) == 1
+
+    test_db.expire_all()
+    assert [version.version for version in test_db.query(DocumentVersion).all()] == [2]
+    assert test_db.query(Blob).count() == 1
+    assert sum(os.path.exists(path) for path in blob_paths) == 1
+    assert client.get(f"{url}/versions/2/download", headers=headers).content == b"second"
+
+
+def test_garbage_collection_keeps_blobs_a_pending_version_reuses(
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that an unreferenced blob being reused by an uncommitted version survives garbage
+    collection, and that a blob whose file went missing is written again on reuse.
+    """
+    project = project_factory(user=user_factory())
+    document = document_factory(project, filename="notes.txt", content="first")
+    storage_dir = os.getenv("TEST_STORAGE_DIR", "data-test")
+    versions = DocumentVersionRepository(test_db, storage_dir)
+    versions.create_version(document.id, 1, "notes.txt", "text/plain", [b"shared"])
+    test_db.commit()
+    versions.prune(keep=0, max_age=timedelta(0), limit=10)
+    blob = test_db.query(Blob).one()
+    path = versions.get_blob_path(blob.hash)
+    os.remove(path)
+
+    versions.create_version(document.id, 2, "notes.txt", "text/plain", [b"shared"])
+    with TestSessionLocal() as collector:
+        assert DocumentVersionRepository(collector, storage_dir).collect_garbage(timedelta(0), 10) == 0
+    test_db.commit()
+
+    assert test_db.query(Blob).count() == 1
+    assert b"".join(versions.read_version(versions.get_version(document.id, 2))) == b"shared"
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from db import test_engine
+from instrumentation import RequestStats, current_request_stats
+from models import User, Project
+from services import AuthService
+
+
+def test_metrics_endpoint_exposes_prometheus_format(client: TestClient):
+    """
+    Test that the metrics endpoint returns metrics in the Prometheus text format.
+    """
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+
+
+def test_metrics_are_recorded_per_route_template(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that latency, query count and response size are labelled with the route template, not the raw path.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+
+    client.get(f"/projects/{project.id}", headers=headers)
+    response = client.get("/metrics")
+
+    assert 'http_request_duration_seconds_count{method="GET",route="/projects/{project_id}",status="200"}' in response.text
+    assert 'http_request_db_queries_count{method="GET",route="/projects/{project_id}"}' in response.text
+    assert 'http_response_size_bytes_count{method="GET",route="/projects/{project_id}"}' in response.text
+    assert f"/projects/{project.id}\"" not in response.text
+
+
+def test_db_queries_are_counted(
+    client: TestClient,
+    user_factory: Callable[..., User]
+):
+    """
+    Test that queries executed while handling a request are counted.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+
+    client.get("/projects", headers=headers)
+    response = client.get("/metrics")
+
+    sum_line = next(
+        line for line in response.text.splitlines()
+        if line.startswith('http_request_db_queries_sum{method="GET",route="/projects"}')
+    )
+    assert float(sum_line.split()[-1]) > 0
+
+
+def test_failed_query_does_not_skew_later_timings():
+    """
+    Test that a statement that fails leaves no timing behind for the next one on the connection.
+    """
+    stats = RequestStats()
+    token = current_request_stats.set(stats)
+    try:
+        with test_engine.connect() as connection:
+            with pytest.raises(DBAPIError):
+                connection.execute(text("SELECT pg_sleep(0.2), 1 / 0"))
+            connection.rollback()
+            connection.execute(text("SELECT 1"))
+    finally:
+        current_request_stats.reset(token)
+
+    assert stats.query_count == 1
+    assert stats.db_time < 0.2
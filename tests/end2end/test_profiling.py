@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+from typing import Callable
+from models import User, Project
+from profiling import create_profile_token
+from services import AuthService
+
+
+def test_request_with_profile_token_is_profiled(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a request carrying a valid profile token is profiled and its stacks can be retrieved.
+    """
+    user = user_factory()
+    profile_token = create_profile_token()
+    headers = {"token": AuthService.create_access_token(user), "X-Profile-Token": profile_token}
+    project = project_factory(user=user)
+
+    response = client.get(f"/projects/{project.id}", headers=headers)
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    profile_response = client.get(f"/admin/profiles/{profile_id}", headers={"X-Profile-Token": profile_token})
+    assert profile_response.status_code == 200
+    assert profile_response.headers["content-type"].startswith("text/plain")
+
+    list_response = client.get("/admin/profiles", headers={"X-Profile-Token": profile_token})
+    assert list_response.status_code == 200
+    assert any(profile["id"] == profile_id for profile in list_response.json())
+
+
+def test_request_without_profile_token_is_not_profiled(client: TestClient):
+    """
+    Test that ordinary requests are not profiled when sampling is disabled.
+    """
+    response = client.get("/metrics")
+
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_request_with_invalid_profile_token_is_not_profiled(client: TestClient):
+    """
+    Test that a forged profile token does not enable profiling.
+    """
+    response = client.get("/metrics", headers={"X-Profile-Token": "forged"})
+
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_profiles_require_profile_token(client: TestClient):
+    """
+    Test that the stored profiles can not be listed without a valid profile token.
+    """
+    assert client.get("/admin/profiles").status_code == 401
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": "forged"}).status_code == 403
+
+
+def test_get_non_existent_profile(client: TestClient):
+    """
+    Test that an attempt to retrieve an unknown profile returns a 404.
+    """
+    response = client.get("/admin/profiles/unknown", headers={"X-Profile-Token": create_profile_token()})
+
+    assert response.status_code == 404
@@ -0,0 +1,120 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from cache import ProjectCache, ProjectCacheListener, project_cache
+from models import User, Project
+from services import AuthService
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def active_project_cache(client: TestClient):
+    assert wait_until(lambda: project_cache.active)
+    yield project_cache
+
+
+def test_project_is_cached_after_first_read(
+    client: TestClient,
+    active_project_cache: ProjectCache,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that reading a project stores it and the caller's role in the cache.
+    """
+    user = user_factory()
+    project = project_factory(user=user)
+    headers = {"token": AuthService.create_access_token(user)}
+
+    response = client.get(f"/projects/{project.id}", headers=headers)
+
+    assert response.status_code == 200
+    assert active_project_cache.get_project(project.id)["name"] == project.name
+    assert active_project_cache.get_role(project.id, user.id)[0]
+
+
+def test_update_is_visible_on_next_read(
+    client: TestClient,
+    active_project_cache: ProjectCache,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a cached project is not served after it has been updated.
+    """
+    user = user_factory()
+    project = project_factory(user=user)
+    headers = {"token": AuthService.create_access_token(user)}
+    client.get(f"/projects/{project.id}", headers=headers)
+
+    client.put(f"/projects/{project.id}", headers=headers, json={"name": "renamed", "description": "new"})
+    response = client.get(f"/projects/{project.id}", headers=headers)
+
+    assert response.json()["name"] == "renamed"
+
+
+def test_new_participant_gains_access_to_cached_project(
+    client: TestClient,
+    active_project_cache: ProjectCache,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a cached non-membership is dropped once the user is added to the project.
+    """
+    admin = user_factory()
+    participant = user_factory(username="participant")
+    project = project_factory(user=admin)
+    participant_headers = {"token": AuthService.create_access_token(participant)}
+    assert client.get(f"/projects/{project.id}", headers=participant_headers).status_code == 403
+
+    client.post(
+        f"/projects/{project.id}/participants",
+        headers={"token": AuthService.create_access_token(admin)},
+        json={"user_id": participant.id}
+    )
+    response = client.get(f"/projects/{project.id}", headers=participant_headers)
+
+    assert response.status_code == 200
+
+
+def test_listener_applies_notifications_from_other_workers(test_db: Session):
+    """
+    Test that a NOTIFY published on another connection invalidates the cached project.
+    """
+    cache = ProjectCache(max_size=10, ttl=60)
+    listener = ProjectCacheListener(cache, test_db.get_bind().url.render_as_string(hide_password=False))
+    listener.start()
+    try:
+        assert wait_until(lambda: cache.active)
+        cache.set_project(1, {"id": 1}, cache.version)
+
+        test_db.execute(text("SELECT pg_notify('project_cache', '1')"))
+        test_db.commit()
+
+        assert wait_until(lambda: cache.get_project(1) is None)
+    finally:
+        listener.stop()
+
+
+def test_app_listener_follows_the_test_database(active_project_cache: ProjectCache, test_db: Session):
+    """
+    Test that the listener started with the app listens on the database the app is pointed at.
+    """
+    active_project_cache.set_project(1, {"id": 1}, active_project_cache.version)
+
+    test_db.execute(text("SELECT pg_notify('project_cache', '1')"))
+    test_db.commit()
+
+    assert wait_until(lambda: active_project_cache.get_project(1) is None)
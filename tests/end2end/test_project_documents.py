@@ -1,3 +1,7 @@
+import io
+import os
+import tarfile
+import zipfile
 
 from fastapi.testclient import TestClient
 from typing import Callable
@@ -142,6 +146,68 @@ def test_user_can_list_project_documents(
     assert documents[0].filename == "document-0.txt"
 
 
+def test_user_can_stream_project_documents_as_ndjson(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that documents are streamed one JSON object per line when NDJSON is accepted.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user), "Accept": "application/x-ndjson"}
+    project = project_factory(user=user)
+    count = 5
+    for n in range(count):
+        document_factory(project, filename=f"document-{n}.txt")
+
+    response = client.get(f"/projects/{project.id}/documents", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    documents = [ProjectDocumentOut.model_validate_json(line) for line in response.text.splitlines()]
+    assert [document.filename for document in documents] == [f"document-{n}.txt" for n in range(count)]
+
+
+def test_user_cannot_stream_another_users_project_documents(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that the access check happens before an NDJSON stream is started.
+    """
+    owner = user_factory(username="owner")
+    non_owner = user_factory(username="non_owner")
+    headers = {"token": AuthService.create_access_token(non_owner), "Accept": "application/x-ndjson"}
+    project = project_factory(user=owner)
+
+    response = client.get(f"/projects/{project.id}/documents", headers=headers)
+
+    assert response.status_code == 403
+
+
+def test_user_can_list_project_documents_with_sparse_fieldset(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that fields= returns only the requested fields, with url still derived from the row.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document = document_factory(project, filename="document.txt")
+
+    response = client.get(f"/projects/{project.id}/documents", params={"fields": "url,filename"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == [{"filename": "document.txt", "url": f"/projects/{project.id}/documents/{document.id}"}]
+
+
 def test_user_gets_no_documents_if_none_exist(
     client: TestClient, 
     user_factory: Callable[..., User], 
@@ -585,3 +651,318 @@ def test_unauthenticated_user_cannot_delete_document(
     response = client.delete(f"/projects/{project.id}/documents/{document.id}") # No auth token
 
     assert response.status_code == 401
+
+
+def test_user_can_upload_many_documents_at_once(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a batch upload stores every new file and reports duplicates per file.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project=project, filename="existing.txt")
+    files = [
+        ("files", ("build.log", io.BytesIO(b"log output"), "text/plain")),
+        ("files", ("existing.txt", io.BytesIO(b"ignored"), "text/plain")),
+        ("files", ("artifact.bin", io.BytesIO(b"\x00" * 3_000_000), "application/octet-stream")),
+    ]
+
+    response = client.post(f"/projects/{project.id}/documents/batch", files=files, headers=headers)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["status"] for result in results] == ["created", "duplicate", "created"]
+    artifact_id = results[2]["document"]["id"]
+    download = client.get(f"/projects/{project.id}/documents/{artifact_id}/download", headers=headers)
+    assert download.content == b"\x00" * 3_000_000
+    listed = client.get(f"/projects/{project.id}/documents", headers=headers).json()
+    assert sorted(document["filename"] for document in listed) == ["artifact.bin", "build.log", "existing.txt"]
+
+
+def test_user_cannot_batch_upload_to_another_users_project(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a batch upload to a project the user is not part of is rejected.
+    """
+    owner = user_factory(username="owner")
+    other = user_factory(username="other")
+    project = project_factory(user=owner)
+    headers = {"token": AuthService.create_access_token(other)}
+
+    response = client.post(
+        f"/projects/{project.id}/documents/batch",
+        files=[("files", ("a.txt", io.BytesIO(b"a"), "text/plain"))],
+        headers=headers
+    )
+
+    assert response.status_code == 403
+
+
+def test_user_can_download_project_archive(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that all documents of a project are streamed as one zip.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project=project, filename="a.txt", content="first")
+    document_factory(project=project, filename="b.txt", content="second")
+
+    response = client.get(f"/projects/{project.id}/documents/archive", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["a.txt", "b.txt"]
+    assert archive.read("b.txt") == b"second"
+
+
+def test_project_archive_can_be_filtered(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a gzipped tar holds only the requested documents of the requested type.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    text_document = document_factory(project=project, filename="a.txt")
+    document_factory(project=project, filename="b.csv", file_type="text/csv")
+    document_factory(project=project, filename="c.txt")
+
+    response = client.get(
+        f"/projects/{project.id}/documents/archive",
+        params={"format": "tar", "compression": "deflate", "ids": [text_document.id], "file_type": "text/plain"},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    assert 'filename="project-' in response.headers["content-disposition"]
+    archive = tarfile.open(fileobj=io.BytesIO(response.content), mode="r:gz")
+    assert archive.getnames() == ["a.txt"]
+
+
+def test_user_cannot_download_archive_of_another_users_project(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a user outside the project cannot download its archive.
+    """
+    owner = user_factory(username="owner")
+    other = user_factory(username="other")
+    project = project_factory(user=owner)
+    headers = {"token": AuthService.create_access_token(other)}
+
+    response = client.get(f"/projects/{project.id}/documents/archive", headers=headers)
+
+    assert response.status_code == 403
+
+
+def test_user_can_import_zip_archive(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that every file of an uploaded zip becomes a document of the project.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project=project, filename="existing.txt")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("notes/a.txt", "first")
+        archive.writestr("existing.txt", "ignored")
+        archive.writestr("data.csv", "x,y")
+
+    response = client.post(
+        f"/projects/{project.id}/documents/import",
+        files={"file": ("export.zip", buffer.getvalue(), "application/zip")},
+        headers=headers
+    )
+
+    assert response.status_code == 201
+    assert response.json() == {"imported": 2, "skipped": [{"filename": "existing.txt", "reason": "duplicate"}]}
+    documents = {document["filename"]: document for document in client.get(f"/projects/{project.id}/documents", headers=headers).json()}
+    assert documents["data.csv"]["file_type"] == "text/csv"
+    download = client.get(f"/projects/{project.id}/documents/{documents['a.txt']['id']}/download", headers=headers)
+    assert download.content == b"first"
+
+
+def test_user_can_import_compressed_tar_archive(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a gzipped tar is unpacked the same way as a zip.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name in ["one.txt", "two.txt"]:
+            info = tarfile.TarInfo(name)
+            info.size = 3
+            archive.addfile(info, io.BytesIO(b"abc"))
+
+    response = client.post(
+        f"/projects/{project.id}/documents/import",
+        files={"file": ("export.tar.gz", buffer.getvalue(), "application/gzip")},
+        headers=headers
+    )
+
+    assert response.status_code == 201
+    assert response.json()["imported"] == 2
+
+
+def test_user_can_import_archive_with_many_files(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that an archive with more than ten thousand files is imported whole.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for n in range(10_050):
+            archive.writestr(f"files/{n}.txt", str(n))
+
+    response = client.post(
+        f"/projects/{project.id}/documents/import",
+        files={"file": ("export.zip", buffer.getvalue(), "application/zip")},
+        headers=headers
+    )
+
+    assert response.status_code == 201
+    assert response.json() == {"imported": 10_050, "skipped": []}
+
+
+def test_import_rejects_files_that_are_not_archives(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that uploading something other than a zip or tar is a bad request.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+
+    response = client.post(
+        f"/projects/{project.id}/documents/import",
+        files={"file": ("notes.txt", b"just some text", "text/plain")},
+        headers=headers
+    )
+
+    assert response.status_code == 400
+
+
+def test_text_documents_are_stored_compressed(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a text upload is gzipped at rest and served as is to clients accepting gzip.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    content = b"timestamp,level,message\n" * 10_000
+    document = client.post(
+        f"/projects/{project.id}/documents",
+        files=make_document_request(filename="log.csv", file_content=content, file_type="text/csv"),
+        headers=headers
+    ).json()
+    stored_path = os.path.join(os.getenv("TEST_STORAGE_DIR", "data-test"), "documents", str(project.id), "log.csv")
+
+    response = client.get(
+        f"/projects/{project.id}/documents/{document['id']}/download",
+        headers={**headers, "Accept-Encoding": "gzip"}
+    )
+
+    assert document["size"] == len(content)
+    assert os.path.getsize(stored_path) < len(content) // 10
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == content
+
+
+def test_compressed_document_is_decompressed_for_other_clients(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that clients without gzip support get the original bytes.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    content = b"plain text line\n" * 1000
+    document = client.post(
+        f"/projects/{project.id}/documents",
+        files=make_document_request(filename="notes.txt", file_content=content),
+        headers=headers
+    ).json()
+
+    with client.stream(
+        "GET",
+        f"/projects/{project.id}/documents/{document['id']}/download",
+        headers={**headers, "Accept-Encoding": "identity"}
+    ) as response:
+        raw = response.read()
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == str(len(content))
+    assert raw == content
+
+
+def test_binary_documents_are_stored_raw(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that content types that do not compress well are stored untouched.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    content = os.urandom(10_000)
+    document = client.post(
+        f"/projects/{project.id}/documents",
+        files=make_document_request(filename="image.png", file_content=content, file_type="image/png"),
+        headers=headers
+    ).json()
+
+    response = client.get(f"/projects/{project.id}/documents/{document['id']}/download", headers=headers)
+
+    assert "content-encoding" not in response.headers
+    assert response.content == content
@@ -0,0 +1,93 @@
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from db import TestSessionLocal
+from jobs import reconcile_project_stats
+from models import User, Project, Document, ProjectStats
+from services import AuthService
+
+
+def get_stats(db: Session, project: Project) -> tuple:
+    db.expire_all()
+    stats = db.query(ProjectStats).filter(ProjectStats.project_id == project.id).one()
+    return stats.document_count, stats.member_count, stats.total_bytes
+
+
+def test_counters_follow_documents_and_members(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that uploads, replacements, deletions and membership changes update the counters.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user, participants=[user_factory(username="participant")])
+    document = document_factory(project, filename="a.txt", content="12345")
+    assert get_stats(test_db, project) == (1, 2, 5)
+
+    client.post(f"/projects/{project.id}/documents", files={"file": ("b.txt", b"1234567", "text/plain")}, headers=headers)
+    client.put(f"/projects/{project.id}/documents/{document.id}", files={"file": ("a.txt", b"12", "text/plain")}, headers=headers)
+    assert get_stats(test_db, project) == (2, 2, 9)
+
+    client.delete(f"/projects/{project.id}/documents/{document.id}", headers=headers)
+    newcomer = user_factory(username="newcomer")
+    client.post(f"/projects/{project.id}/participants/bulk", json={"usernames": ["newcomer"]}, headers=headers)
+    assert get_stats(test_db, project) == (1, 3, 7)
+
+    client.post(f"/projects/{project.id}/participants/bulk", json={"action": "remove", "user_ids": [newcomer.id]}, headers=headers)
+    assert get_stats(test_db, project) == (1, 2, 7)
+
+
+def test_reconciliation_corrects_drifted_counters(
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that the reconciliation job recounts drifted and missing counters and leaves correct ones alone.
+    """
+    user = user_factory()
+    drifted = project_factory(user=user, name="drifted")
+    missing = project_factory(user=user, name="missing")
+    correct = project_factory(user=user, name="correct")
+    document_factory(drifted, content="123")
+    document_factory(missing, content="12")
+    document_factory(correct, content="1")
+    test_db.execute(text("UPDATE project_stats SET document_count = 40, total_bytes = 0 WHERE project_id = :id"), {"id": drifted.id})
+    test_db.execute(text("DELETE FROM project_stats WHERE project_id = :id"), {"id": missing.id})
+    test_db.commit()
+
+    assert reconcile_project_stats(TestSessionLocal) == 2
+
+    assert get_stats(test_db, drifted) == (1, 1, 3)
+    assert get_stats(test_db, missing) == (1, 1, 2)
+    assert get_stats(test_db, correct) == (1, 1, 1)
+
+
+def test_reconciliation_fills_in_missing_document_sizes(
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that documents stored before sizes were recorded are measured from their files and counted.
+    """
+    project = project_factory(user=user_factory())
+    compressed = document_factory(project, filename="a.txt", content="12345")
+    plain = document_factory(project, filename="b.bin", content="123", file_type="application/octet-stream")
+    test_db.execute(text("UPDATE documents SET size = NULL WHERE project_id = :id"), {"id": project.id})
+    test_db.execute(text("UPDATE project_stats SET total_bytes = 0 WHERE project_id = :id"), {"id": project.id})
+    test_db.commit()
+
+    assert reconcile_project_stats(TestSessionLocal, use_test_dir=True) == 1
+
+    test_db.expire_all()
+    assert (compressed.size, plain.size) == (5, 3)
+    assert get_stats(test_db, project) == (2, 1, 8)
@@ -1,6 +1,9 @@
+from datetime import datetime
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from db import test_engine
 from typing import Callable
-from models import User, Project
+from models import User, Project, Document
 from factories import make_project_request
 from services import AuthService
 from schemas import ProjectOut
@@ -68,6 +71,143 @@ def test_user_can_get_their_projects(
     assert projects[0].name == "Test Project 0"
 
 
+def test_user_can_stream_their_projects_as_ndjson(
+        client: TestClient,
+        user_factory: Callable[..., User],
+        project_factory: Callable[..., Project],
+    ):
+    """
+    Test that projects are streamed one JSON object per line when NDJSON is accepted.
+    """
+    user = user_factory()
+    other_user = user_factory(username="other")
+    headers = {"token": AuthService.create_access_token(user), "Accept": "application/x-ndjson"}
+    for n in range(3):
+        project_factory(user=user, name=f"Test Project {n}")
+    project_factory(user=other_user, name="Other Project")
+
+    response = client.get("/projects", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    projects = [ProjectOut.model_validate_json(line) for line in response.text.splitlines()]
+    assert [project.name for project in projects] == ["Test Project 0", "Test Project 1", "Test Project 2"]
+
+
+def test_user_can_list_projects_with_sparse_fieldset(
+        client: TestClient,
+        user_factory: Callable[..., User],
+        project_factory: Callable[..., Project],
+    ):
+    """
+    Test that fields= trims the response and keeps unrequested columns out of the SELECT.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project_factory(user=user, name="Dashboard Project", description="A long description")
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/projects", params={"fields": "name,id"}, headers=headers)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Dashboard Project"
+    assert set(response.json()[0]) == {"id", "name"}
+    listing = [statement for statement in statements if "JOIN user_project " in statement]
+    assert listing and "projects.description" not in listing[0]
+
+
+def test_unknown_field_is_rejected(client: TestClient, user_factory: Callable[..., User]):
+    """
+    Test that a fieldset naming a field the response does not have returns a 400.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+
+    response = client.get("/projects", params={"fields": "id,owner"}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: owner"
+
+
+def test_user_can_search_their_projects_by_name(
+        client: TestClient,
+        user_factory: Callable[..., User],
+        project_factory: Callable[..., Project],
+    ):
+    """
+    Test that name search matches substrings case-insensitively, prefixes and shorter names first,
+    and only among the user's own projects.
+    """
+    user = user_factory()
+    other_user = user_factory(username="other")
+    headers = {"token": AuthService.create_access_token(user)}
+    for name in ["Old Budget Review", "Budget 2026 planning", "budget", "Roadmap"]:
+        project_factory(user=user, name=name)
+    project_factory(user=other_user, name="Budget of someone else")
+
+    response = client.get("/projects/search", params={"q": "BUDGET"}, headers=headers)
+
+    assert response.status_code == 200
+    assert [project["name"] for project in response.json()] == ["budget", "Budget 2026 planning", "Old Budget Review"]
+
+
+def test_project_search_treats_wildcards_literally(
+        client: TestClient,
+        user_factory: Callable[..., User],
+        project_factory: Callable[..., Project],
+    ):
+    """
+    Test that LIKE wildcards in the query match only themselves.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project_factory(user=user, name="100% done")
+    project_factory(user=user, name="100 items")
+
+    response = client.get("/projects/search", params={"q": "100%", "fields": "name"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == [{"name": "100% done"}]
+
+
+def test_project_summary_aggregates_members_and_documents(
+        client: TestClient,
+        user_factory: Callable[..., User],
+        project_factory: Callable[..., Project],
+        document_factory: Callable[..., Document],
+    ):
+    """
+    Test that the summary reports role, member and document counts and stored bytes per project.
+    """
+    user = user_factory()
+    owner = user_factory(username="owner")
+    headers = {"token": AuthService.create_access_token(user)}
+    own_project = project_factory(user=user, name="Own")
+    shared_project = project_factory(user=owner, name="Shared", participants=[user, user_factory(username="third")])
+    project_factory(user=owner, name="Not a member")
+    document_factory(own_project, filename="a.txt", content="12345")
+    last_document = document_factory(own_project, filename="b.txt", content="123")
+
+    response = client.get("/projects/summary", headers=headers)
+
+    assert response.status_code == 200
+    summaries = {summary["name"]: summary for summary in response.json()}
+    assert set(summaries) == {"Own", "Shared"}
+    assert summaries["Own"]["role"] == "admin"
+    assert (summaries["Own"]["member_count"], summaries["Own"]["document_count"], summaries["Own"]["total_bytes"]) == (1, 2, 8)
+    assert summaries["Shared"]["role"] == "participant"
+    assert (summaries["Shared"]["member_count"], summaries["Shared"]["document_count"], summaries["Shared"]["total_bytes"]) == (3, 0, 0)
+    assert datetime.fromisoformat(summaries["Own"]["last_activity_at"]) == last_document.created_at
+    assert summaries["Shared"]["id"] == shared_project.id
+
+
 def test_user_gets_no_projects_if_none_exist(client: TestClient, user_factory: Callable[..., User]):
     """
     Test that a user gets an empty list if they have no projects.
@@ -434,3 +574,96 @@ def test_unauthenticated_user_cannot_add_participant(
     )
 
     assert response.status_code == 401
+
+
+def test_project_owner_can_bulk_add_participants(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that the owner can add several participants at once and gets an outcome per user.
+    """
+    owner = user_factory(username="owner")
+    existing = user_factory(username="existing")
+    new_by_id = user_factory(username="new_by_id")
+    user_factory(username="new_by_name")
+    headers = {"token": AuthService.create_access_token(owner)}
+    project = project_factory(user=owner, participants=[existing])
+
+    response = client.post(
+        f"/projects/{project.id}/participants/bulk",
+        json={"user_ids": [new_by_id.id, existing.id, 999999], "usernames": ["new_by_name"]},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [
+        "added", "already_participant", "not_found", "added"
+    ]
+    projects = client.get("/projects", headers={"token": AuthService.create_access_token(new_by_id)}).json()
+    assert [p["id"] for p in projects] == [project.id]
+
+
+def test_project_owner_can_bulk_remove_participants(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that bulk removal drops participants but never the project admin.
+    """
+    owner = user_factory(username="owner")
+    participant = user_factory(username="participant")
+    headers = {"token": AuthService.create_access_token(owner)}
+    project = project_factory(user=owner, participants=[participant])
+
+    response = client.post(
+        f"/projects/{project.id}/participants/bulk",
+        json={"action": "remove", "user_ids": [participant.id, owner.id]},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == ["removed", "is_admin"]
+    participant_headers = {"token": AuthService.create_access_token(participant)}
+    assert client.get(f"/projects/{project.id}", headers=participant_headers).status_code == 403
+
+
+def test_non_owner_cannot_bulk_add_participants(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a participant cannot manage the participants of a project.
+    """
+    owner = user_factory(username="owner")
+    participant = user_factory(username="participant")
+    headers = {"token": AuthService.create_access_token(participant)}
+    project = project_factory(user=owner, participants=[participant])
+
+    response = client.post(
+        f"/projects/{project.id}/participants/bulk",
+        json={"user_ids": [owner.id]},
+        headers=headers
+    )
+
+    assert response.status_code == 403
+
+
+def test_bulk_participants_request_needs_users(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a bulk request without any user ids or usernames is rejected.
+    """
+    owner = user_factory(username="owner")
+    headers = {"token": AuthService.create_access_token(owner)}
+    project = project_factory(user=owner)
+
+    response = client.post(f"/projects/{project.id}/participants/bulk", json={}, headers=headers)
+
+    assert response.status_code == 422
@@ -0,0 +1,71 @@
+import pytest
+import instrumentation
+from unittest.mock import Mock
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+from models import User, Project
+from services import AuthService
+
+
+def test_lazy_loading_raises_in_strict_mode(
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that touching an unloaded relationship raises instead of emitting a hidden query.
+    """
+    user = user_factory()
+    project_id = project_factory(user=user).id
+    test_db.expunge_all()
+
+    loaded_project = test_db.query(Project).filter(Project.id == project_id).one()
+
+    with pytest.raises(InvalidRequestError):
+        loaded_project.documents
+
+
+def test_request_exceeding_query_budget_fails_in_raise_mode(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a handler running more queries than the budget allows fails in raise mode.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET", 1)
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "raise")
+
+    response = client.get(f"/projects/{project.id}", headers=headers)
+
+    assert response.status_code == 500
+
+
+def test_request_exceeding_query_budget_is_logged_in_log_mode(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a handler running more queries than the budget allows is logged but still served in log mode.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET", 1)
+    monkeypatch.setattr(instrumentation, "QUERY_BUDGET_MODE", "log")
+    logger_mock = Mock()
+    monkeypatch.setattr(instrumentation, "logger", logger_mock)
+
+    response = client.get(f"/projects/{project.id}", headers=headers)
+
+    assert response.status_code == 200
+    logger_mock.warning.assert_called_once()
+    assert "exceeding the budget of 1" in logger_mock.warning.call_args.args[0]
@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+from typing import Callable
+from models import User, Project, Document
+from services import AuthService
+
+
+def test_large_document_list_is_gzip_compressed(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document]
+):
+    """
+    Test that a document list above the size threshold is sent gzip encoded.
+    """
+    user = user_factory()
+    token = AuthService.create_access_token(user)
+    project = project_factory(user=user)
+    for n in range(30):
+        document_factory(project=project, filename=f"document-{n}.txt")
+
+    response = client.get(f"/projects/{project.id}/documents", headers={"token": token, "Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert [document["filename"] for document in response.json()] == [f"document-{n}.txt" for n in range(30)]
+
+
+def test_small_response_is_not_compressed(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a response below the size threshold is sent as is.
+    """
+    user = user_factory()
+    token = AuthService.create_access_token(user)
+    project_factory(user=user)
+
+    response = client.get("/projects", headers={"token": token, "Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 1
+
+
+def test_response_is_not_compressed_without_accept_encoding(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a large response is sent uncompressed to a client that does not accept gzip.
+    """
+    user = user_factory()
+    token = AuthService.create_access_token(user)
+    for n in range(30):
+        project_factory(user=user, name=f"project-{n}")
+
+    response = client.get("/projects", headers={"token": token, "Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 30
@@ -0,0 +1,245 @@
+import io
+import os
+import threading
+import pytest
+import dependencies
+import quotas
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy.orm import Session
+from db import TestSessionLocal
+from models import User, Project, Document, ProjectStats
+from repositories import DocumentRepository, ProjectStatsRepository, document_repository
+from schemas import UploadedDocument
+from services import AuthService
+
+
+def get_usage(db: Session, project: Project) -> tuple:
+    db.expire_all()
+    stats = db.query(ProjectStats).filter(ProjectStats.project_id == project.id).one()
+    return stats.document_count, stats.total_bytes
+
+
+def stored_files(project: Project) -> list:
+    directory = DocumentRepository.STORAGE_PATH.format(
+        storage_directory=os.getenv("TEST_STORAGE_DIR", "data-test"), project_id=project.id)
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def test_upload_over_project_byte_quota_is_rejected(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that an upload crossing the byte quota fails with 413 and leaves nothing behind.
+    """
+    monkeypatch.setattr(quotas, "PROJECT_MAX_BYTES", 10)
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document_factory(project, filename="a.txt", content="123456")
+
+    response = client.post(f"/projects/{project.id}/documents", files={"file": ("b.bin", b"x" * 5, "application/octet-stream")}, headers=headers)
+    assert response.status_code == 413
+    assert get_usage(test_db, project) == (1, 6)
+    assert stored_files(project) == ["a.txt"]
+
+    response = client.post(f"/projects/{project.id}/documents", files={"file": ("b.bin", b"x" * 4, "application/octet-stream")}, headers=headers)
+    assert response.status_code == 201
+    assert get_usage(test_db, project) == (2, 10)
+
+
+def test_upload_larger_than_remaining_quota_is_refused_before_parsing(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that bodies over the remaining quota are refused from Content-Length, and bodies
+    without one once the received bytes cross it.
+    """
+    monkeypatch.setattr(quotas, "PROJECT_MAX_BYTES", 10)
+    monkeypatch.setattr(dependencies, "MULTIPART_OVERHEAD", 1024)
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+
+    response = client.post(f"/projects/{project.id}/documents", files={"file": ("a.bin", b"x" * 4096, "application/octet-stream")}, headers=headers)
+    assert response.status_code == 413
+
+    boundary = "quota-boundary"
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="a.bin"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n".encode() + b"x" * 4096 + f"\r\n--{boundary}--\r\n".encode()
+    )
+    response = client.post(
+        f"/projects/{project.id}/documents",
+        content=(body[start:start + 512] for start in range(0, len(body), 512)),
+        headers={**headers, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
+    assert get_usage(test_db, project) == (0, 0)
+    assert stored_files(project) == []
+
+
+def test_replacement_over_quota_keeps_the_stored_version(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that a replacement may reuse the space of the old content but not exceed the quota.
+    """
+    monkeypatch.setattr(quotas, "PROJECT_MAX_BYTES", 10)
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    document = document_factory(project, filename="a.txt", content="123456")
+
+    response = client.put(f"/projects/{project.id}/documents/{document.id}", files={"file": ("a.txt", b"x" * 11, "text/plain")}, headers=headers)
+    assert response.status_code == 413
+    response = client.get(f"/projects/{project.id}/documents/{document.id}/download", headers=headers)
+    assert response.content == b"123456"
+
+    response = client.put(f"/projects/{project.id}/documents/{document.id}", files={"file": ("a.txt", b"x" * 10, "text/plain")}, headers=headers)
+    assert response.status_code == 200
+    assert get_usage(test_db, project) == (1, 10)
+    assert stored_files(project) == ["a.txt"]
+
+
+def test_user_quotas_cover_all_owned_projects(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that document and byte limits per user count every project the user owns, including
+    uploads from participants and resumable uploads.
+    """
+    monkeypatch.setattr(quotas, "USER_MAX_DOCUMENTS", 2)
+    monkeypatch.setattr(quotas, "USER_MAX_BYTES", 100)
+    owner = user_factory()
+    participant = user_factory(username="participant")
+    first = project_factory(user=owner, name="first")
+    second = project_factory(user=owner, name="second", participants=[participant])
+    document_factory(first, filename="a.txt", content="x" * 60)
+
+    participant_headers = {"token": AuthService.create_access_token(participant)}
+    response = client.post(f"/projects/{second.id}/uploads", json={"filename": "large.bin", "length": 41}, headers=participant_headers)
+    assert response.status_code == 413
+
+    response = client.post(f"/projects/{second.id}/documents", files={"file": ("b.txt", b"x" * 40, "text/plain")}, headers=participant_headers)
+    assert response.status_code == 201
+    response = client.post(f"/projects/{second.id}/documents", files={"file": ("c.txt", b"", "text/plain")}, headers=participant_headers)
+    assert response.status_code == 413
+    assert get_usage(test_db, second) == (1, 40)
+
+    response = client.get("/users/me/quota", headers={"token": AuthService.create_access_token(owner)})
+    assert response.status_code == 200
+    assert response.json() == {"documents": {"used": 2, "limit": 2}, "bytes": {"used": 100, "limit": 100}}
+
+
+def test_project_quota_usage(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    document_factory: Callable[..., Document],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that participants see the usage of the project and of its owner next to the limits.
+    """
+    monkeypatch.setattr(quotas, "PROJECT_MAX_DOCUMENTS", 5)
+    owner = user_factory()
+    participant = user_factory(username="participant")
+    project = project_factory(user=owner, participants=[participant])
+    other = project_factory(user=owner, name="other")
+    document_factory(project, filename="a.txt", content="12345")
+    document_factory(other, filename="b.txt", content="123")
+
+    response = client.get(f"/projects/{project.id}/quota", headers={"token": AuthService.create_access_token(participant)})
+    assert response.status_code == 200
+    assert response.json() == {
+        "project": {"documents": {"used": 1, "limit": 5}, "bytes": {"used": 5, "limit": None}},
+        "owner": {"documents": {"used": 2, "limit": None}, "bytes": {"used": 8, "limit": None}}
+    }
+
+    response = client.get(f"/projects/{project.id}/quota", headers={"token": AuthService.create_access_token(user_factory(username="stranger"))})
+    assert response.status_code == 403
+
+
+def test_batch_files_share_the_remaining_quota(
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that the files of a batch draw on one remaining quota, so a batch going over it stops
+    reading instead of storing every file up to the full remaining size.
+    """
+    monkeypatch.setattr(quotas, "PROJECT_MAX_BYTES", 3 * 1024 * 1024)
+    monkeypatch.setattr(document_repository, "UPLOAD_CONCURRENCY", 1)
+    project = project_factory(user=user_factory())
+    streams = [io.BytesIO(b"x" * (2 * 1024 * 1024)) for _ in range(3)]
+    files = [UploadedDocument(filename=f"{n}.bin", content_type="application/octet-stream", stream=stream)
+             for n, stream in enumerate(streams)]
+
+    with pytest.raises(quotas.QuotaExceededError):
+        DocumentRepository(test_db, True).create_project_documents(project.id, files)
+
+    # The first file uses 2 MiB, the second stops after its second MiB and the third at once.
+    assert [stream.tell() for stream in streams] == [2 * 1024 * 1024, 2 * 1024 * 1024, 1024 * 1024]
+    assert stored_files(project) == []
+
+
+def test_uploads_to_projects_of_one_owner_wait_for_each_other(
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project],
+    monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that a write to another project of the same owner waits for a pending write and is then
+    checked against the owner's usage including it.
+    """
+    monkeypatch.setattr(quotas, "USER_MAX_BYTES", 100)
+    owner = user_factory()
+    first = project_factory(user=owner, name="first")
+    second = project_factory(user=owner, name="second")
+    pending, waiting = TestSessionLocal(), TestSessionLocal()
+    outcome = []
+
+    def add_to_second():
+        try:
+            ProjectStatsRepository(waiting).add(second.id, documents=1, total_bytes=60, enforce_quota=True)
+            outcome.append("added")
+        except quotas.QuotaExceededError:
+            outcome.append("refused")
+        finally:
+            waiting.rollback()
+
+    try:
+        ProjectStatsRepository(pending).add(first.id, documents=1, total_bytes=60, enforce_quota=True)
+        thread = threading.Thread(target=add_to_second)
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        pending.commit()
+        thread.join(5)
+    finally:
+        pending.close()
+        waiting.close()
+
+    assert outcome == ["refused"]
@@ -0,0 +1,165 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from db import TestSessionLocal
+from jobs import expire_upload_sessions
+from routes import upload_routes
+from models import User, Project
+from services import AuthService
+
+
+def start_upload(client: TestClient, project: Project, headers: dict, length: int, filename: str = "large.bin"):
+    response = client.post(
+        f"/projects/{project.id}/uploads",
+        json={"filename": filename, "length": length},
+        headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def send_chunk(client: TestClient, project: Project, headers: dict, upload_id: str, offset: int, data: bytes):
+    return client.patch(
+        f"/projects/{project.id}/uploads/{upload_id}",
+        content=data,
+        headers={**headers, "Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"}
+    )
+
+
+def test_chunks_in_any_order_finalize_into_document(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that chunks sent out of order are assembled into one document.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    content = os.urandom(300_000)
+    upload_id = start_upload(client, project, headers, len(content))
+
+    response = send_chunk(client, project, headers, upload_id, 200_000, content[200_000:])
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == "0"
+    send_chunk(client, project, headers, upload_id, 0, content[:100_000])
+    status = client.get(f"/projects/{project.id}/uploads/{upload_id}", headers=headers)
+    assert status.json()["offset"] == 100_000
+    response = send_chunk(client, project, headers, upload_id, 100_000, content[100_000:200_000])
+    assert response.headers["Upload-Offset"] == "300000"
+
+    response = client.post(f"/projects/{project.id}/uploads/{upload_id}/finalize", headers=headers)
+
+    assert response.status_code == 201
+    document_id = response.json()["id"]
+    download = client.get(f"/projects/{project.id}/documents/{document_id}/download", headers=headers)
+    assert download.content == content
+    assert client.get(f"/projects/{project.id}/uploads/{upload_id}", headers=headers).status_code == 404
+
+
+def test_incomplete_upload_cannot_be_finalized(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that finalizing with bytes missing is a conflict.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    upload_id = start_upload(client, project, headers, 10)
+    send_chunk(client, project, headers, upload_id, 0, b"12345")
+
+    response = client.post(f"/projects/{project.id}/uploads/{upload_id}/finalize", headers=headers)
+
+    assert response.status_code == 409
+
+
+def test_chunk_past_the_end_is_rejected(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a chunk overflowing the declared length is refused.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    upload_id = start_upload(client, project, headers, 10)
+
+    response = send_chunk(client, project, headers, upload_id, 8, b"12345")
+
+    assert response.status_code == 409
+
+
+def test_chunk_without_length_is_limited_while_read(
+    monkeypatch: pytest.MonkeyPatch,
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that a chunk sent without a Content-Length is refused once it passes the chunk limit,
+    and that a chunk sent in pieces under the limit is stored whole.
+    """
+    monkeypatch.setattr(upload_routes, "MAX_CHUNK_SIZE", 1000)
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    upload_id = start_upload(client, project, headers, 2000)
+    chunk_headers = {**headers, "Upload-Offset": "0", "Content-Type": "application/offset+octet-stream"}
+
+    response = client.patch(f"/projects/{project.id}/uploads/{upload_id}", content=iter([b"a" * 600] * 2), headers=chunk_headers)
+    assert response.status_code == 413
+
+    response = client.patch(f"/projects/{project.id}/uploads/{upload_id}", content=iter([b"a" * 400] * 2), headers=chunk_headers)
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == "800"
+
+
+def test_other_user_cannot_write_to_upload(
+    client: TestClient,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that another participant cannot write to someone else's upload.
+    """
+    owner = user_factory(username="owner")
+    participant = user_factory(username="participant")
+    project = project_factory(user=owner, participants=[participant])
+    upload_id = start_upload(client, project, {"token": AuthService.create_access_token(owner)}, 10)
+
+    response = send_chunk(client, project, {"token": AuthService.create_access_token(participant)}, upload_id, 0, b"1")
+
+    assert response.status_code == 403
+
+
+def test_abandoned_uploads_expire(
+    client: TestClient,
+    test_db: Session,
+    user_factory: Callable[..., User],
+    project_factory: Callable[..., Project]
+):
+    """
+    Test that the expiry job removes sessions past their deadline together with the staging file.
+    """
+    user = user_factory()
+    headers = {"token": AuthService.create_access_token(user)}
+    project = project_factory(user=user)
+    upload_id = start_upload(client, project, headers, 10)
+    staging_path = os.path.join(os.getenv("TEST_STORAGE_DIR", "data-test"), "uploads", upload_id)
+    assert os.path.exists(staging_path)
+    test_db.execute(text("UPDATE upload_sessions SET expires_at = now() - interval '1 second'"))
+    test_db.commit()
+
+    assert expire_upload_sessions(TestSessionLocal, use_test_dir=True) == 1
+
+    assert not os.path.exists(staging_path)
+    assert client.get(f"/projects/{project.id}/uploads/{upload_id}", headers=headers).status_code == 404
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from typing import Callable
+from models import User
+from services import AuthService
+
+
+def test_user_search_matches_username_prefix(client: TestClient, user_factory: Callable[..., User]):
+    """
+    Test that users are found by username prefix, ignoring case, in alphabetical order and paginated.
+    """
+    user = user_factory(username="searcher")
+    headers = {"token": AuthService.create_access_token(user)}
+    for username in ["Martha", "marcus", "mark_one", "markus", "tamara"]:
+        user_factory(username=username)
+
+    response = client.get("/users", params={"prefix": "MAR"}, headers=headers)
+    page = client.get("/users", params={"prefix": "mar", "limit": 2, "offset": 2}, headers=headers)
+
+    assert response.status_code == 200
+    assert [found["username"] for found in response.json()] == ["marcus", "mark_one", "markus", "Martha"]
+    assert [found["username"] for found in page.json()] == ["markus", "Martha"]
+    assert set(response.json()[0]) == {"id", "username"}
+
+
+def test_user_search_treats_underscore_literally(client: TestClient, user_factory: Callable[..., User]):
+    """
+    Test that a LIKE wildcard in the prefix only matches itself.
+    """
+    user = user_factory(username="searcher")
+    headers = {"token": AuthService.create_access_token(user)}
+    user_factory(username="mark_one")
+    user_factory(username="markxone")
+
+    response = client.get("/users", params={"prefix": "mark_"}, headers=headers)
+
+    assert [found["username"] for found in response.json()] == ["mark_one"]
+
+
+def test_usernames_resolve_to_ids(client: TestClient, user_factory: Callable[..., User]):
+    """
+    Test that a batch of usernames resolves to ids, with unknown names listed separately.
+    """
+    user = user_factory(username="admin_user")
+    headers = {"token": AuthService.create_access_token(user)}
+    alice = user_factory(username="alice")
+    bob = user_factory(username="bobby")
+
+    response = client.post("/users/resolve", json={"usernames": ["bobby", "ghost", "alice"]}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "users": [{"id": bob.id, "username": "bobby"}, {"id": alice.id, "username": "alice"}],
+        "not_found": ["ghost"]
+    }
+
+
+def test_unauthenticated_user_cannot_search_users(client: TestClient):
+    """
+    Test that the user directory requires authentication.
+    """
+    response = client.get("/users", params={"prefix": "a"})
+
+    assert response.status_code == 401
@@ -1,6 +1,6 @@
 import io
 from typing import List
-from models import Project, Document, User
+from models import Project, Document, User, UploadSession
 from repositories import UserRepository, ProjectRepository, DocumentRepository
 from services import AuthService
 from schemas import CreateProjectRequest, CreateUserRequest, UploadedDocument
@@ -18,9 +18,15 @@ def make_document(id: int = 1, filename: str = "test.txt", file_type: str = "tex
 def make_register_request(username: str = "testuser", password: str = "strongtestpassword") -> CreateUserRequest:
     return CreateUserRequest(username=username, password=password, password_confirm=password)
 
+def make_upload_session(id: str = "a" * 32, project_id: int = 1, user_id: int = 1, filename: str = "large.bin", length: int = 100) -> UploadSession:
+    return UploadSession(id=id, project_id=project_id, user_id=user_id, filename=filename, content_type="application/octet-stream", length=length)
+
 def make_project_request(name: str = "testproject", description: str = "Describing the test project") -> CreateProjectRequest:
     return CreateProjectRequest(name=name, description=description)
 
+def make_uploaded_document(filename: str = "test.txt", content: bytes = b"Test text in test.txt file", content_type: str = "text/plain") -> UploadedDocument:
+    return UploadedDocument(filename=filename, content_type=content_type, content=content)
+
 def make_document_request(filename: str = "test_document.txt", file_content = b"This is the content of the test document.", file_type: str = "text/plain"):
     return {"file": (filename, io.BytesIO(file_content), file_type)}
 
@@ -0,0 +1,209 @@
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from models import Document, Project, User
+from models.enums import Role
+from schemas import CreateProjectRequest, CreateUserRequest, UploadedDocument
+
+
+class InMemoryUserRepository:
+    """Dict backed stand-in for UserRepository."""
+
+    def __init__(self) -> None:
+        self.users: Dict[int, User] = {}
+        self.users_by_username: Dict[str, User] = {}
+
+    def get_by_username(self, username):
+        return self.users_by_username.get(username)
+
+    def get_by_id(self, id):
+        return self.users.get(id)
+
+    def find_by_ids_or_usernames(self, ids: List[int], usernames: List[str]) -> List[tuple]:
+        return [
+            (user.id, user.username) for user in self.users.values()
+            if user.id in ids or user.username in usernames
+        ]
+
+    def search_by_username_prefix(self, prefix: str, limit: int, offset: int) -> List[tuple]:
+        matches = sorted(
+            (user.username.lower(), user.id, user.username) for user in self.users.values()
+            if user.username.lower().startswith(prefix.lower())
+        )
+        return [(user_id, username) for _, user_id, username in matches[offset:offset + limit]]
+
+    def create(self, user_data: CreateUserRequest, hashed_password: str):
+        new_user = User(
+            id=len(self.users) + 1,
+            username=user_data.username,
+            password=hashed_password,
+            created_at=datetime.now()
+        )
+        self.users[new_user.id] = new_user
+        self.users_by_username[new_user.username] = new_user
+        return new_user
+
+
+class InMemoryProjectRepository:
+    """Dict backed stand-in for ProjectRepository."""
+
+    def __init__(self) -> None:
+        self.projects: Dict[int, Project] = {}
+        self.roles: Dict[Tuple[int, int], Role] = {}
+        self.next_id = 1
+
+    def get_by_id(self, project_id: int) -> Project|None:
+        return self.projects.get(project_id)
+
+    def create_for_user(self, project_data: CreateProjectRequest, user: User):
+        now = datetime.now()
+        new_project = Project(
+            id=self.next_id,
+            name=project_data.name,
+            description=project_data.description,
+            created_at=now,
+            updated_at=now
+        )
+        self.next_id += 1
+        self.projects[new_project.id] = new_project
+        self.roles[(new_project.id, user.id)] = Role.admin
+        return new_project
+
+    def get_user_projects(self, user: User, fields: Optional[Sequence[str]] = None) -> List[Project]:
+        return [self.projects[project_id] for (project_id, user_id) in self.roles if user_id == user.id]
+
+    def search_user_projects(self, user: User, query: str, limit: int, offset: int, fields: Optional[Sequence[str]] = None) -> List[Project]:
+        query = query.lower()
+        matches = [project for project in self.get_user_projects(user) if query in project.name.lower()]
+        matches.sort(key=lambda project: (not project.name.lower().startswith(query), len(project.name), project.id))
+        return matches[offset:offset + limit]
+
+    def stream_user_projects(self, user: User, fields: Optional[Sequence[str]] = None) -> Iterator[Project]:
+        return iter(self.get_user_projects(user))
+
+    def update(self, project: Project, project_data: CreateProjectRequest) -> Project:
+        project.name = project_data.name
+        project.description = project_data.description
+        return project
+
+    def delete(self, project: Project):
+        del self.projects[project.id]
+        for key in [key for key in self.roles if key[0] == project.id]:
+            del self.roles[key]
+
+    def add_participant(self, project: Project, participant: User):
+        self.roles[(project.id, participant.id)] = Role.participant
+
+    def add_participants(self, project: Project, user_ids: List[int]) -> Set[int]:
+        added = {user_id for user_id in user_ids if (project.id, user_id) not in self.roles}
+        for user_id in added:
+            self.roles[(project.id, user_id)] = Role.participant
+        return added
+
+    def remove_participants(self, project: Project, user_ids: List[int]) -> Set[int]:
+        removed = {user_id for user_id in user_ids if self.roles.get((project.id, user_id)) == Role.participant}
+        for user_id in removed:
+            del self.roles[(project.id, user_id)]
+        return removed
+
+    def get_roles(self, project: Project, user_ids: List[int]) -> Dict[int, Role]:
+        return {user_id: self.roles[(project.id, user_id)] for user_id in user_ids if (project.id, user_id) in self.roles}
+
+    def is_user_participant(self, project: Project, user: User) -> bool:
+        return self.get_user_role(project, user) is not None
+
+    def is_user_admin(self, project: Project, user: User) -> bool:
+        return self.get_user_role(project, user) == Role.admin
+
+    def get_user_role(self, project: Project, user: User) -> Role|None:
+        return self.roles.get((project.id, user.id))
+
+
+class InMemoryDocumentRepository:
+    """Dict backed stand-in for DocumentRepository that keeps file contents in memory."""
+
+    def __init__(self) -> None:
+        self.documents: Dict[int, Document] = {}
+        self.documents_by_filename: Dict[Tuple[int, str], Document] = {}
+        self.contents: Dict[int, bytes] = {}
+        self.next_id = 1
+
+    def get_project_document_by_id(self, project_id: int, document_id: int, lock: bool = False) -> Document:
+        document = self.documents.get(document_id)
+        return document if document is not None and document.project_id == project_id else None
+
+    def get_project_document_by_filename(self, project_id: int, filename):
+        return self.documents_by_filename.get((project_id, filename))
+
+    def get_documents_of_project(self, project: Project, fields: Optional[Sequence[str]] = None):
+        return [document for document in self.documents.values() if document.project_id == project.id]
+
+    def stream_documents_of_project(self, project: Project, fields: Optional[Sequence[str]] = None) -> Iterator[Document]:
+        return iter(self.get_documents_of_project(project))
+
+    def check_quota(self, project_id: int, documents: int = 0, total_bytes: int = 0):
+        pass
+
+    def remaining_bytes(self, project_id: int) -> Optional[int]:
+        return None
+
+    def create_project_document(self, project_id: int, file: UploadedDocument):
+        new_document = Document(
+            id=self.next_id,
+            project_id=project_id,
+            filename=file.filename,
+            file_type=file.content_type,
+            version=1,
+            created_at=datetime.now()
+        )
+        self.next_id += 1
+        self.documents[new_document.id] = new_document
+        self.documents_by_filename[(project_id, new_document.filename)] = new_document
+        self.contents[new_document.id] = file.stream.read() if file.stream is not None else file.content
+        return new_document
+
+    def filter_documents_of_project(self, project: Project, document_ids: List[int] = None, file_type: str = None):
+        return [
+            document for document in self.get_documents_of_project(project)
+            if (not document_ids or document.id in document_ids) and (not file_type or document.file_type == file_type)
+        ]
+
+    def search_documents(self, project: Project, query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[Document, float]]]:
+        terms = query.lower().split()
+        matches = [
+            (document, float(sum(self.contents[document.id].lower().count(term.encode()) for term in terms)))
+            for document in self.get_documents_of_project(project)
+            if all(term.encode() in self.contents[document.id].lower() for term in terms)
+        ]
+        matches.sort(key=lambda match: (-match[1], match[0].id))
+        return len(matches), matches[offset:offset + limit]
+
+    def get_filenames_of_project(self, project_id: int) -> Set[str]:
+        return {filename for (document_project_id, filename) in self.documents_by_filename if document_project_id == project_id}
+
+    def import_project_documents(self, project_id: int, files: Iterable[UploadedDocument]) -> int:
+        return len([self.create_project_document(project_id, file) for file in files])
+
+    def get_existing_filenames(self, project_id: int, filenames: List[str]) -> Set[str]:
+        return {filename for filename in filenames if (project_id, filename) in self.documents_by_filename}
+
+    def create_project_documents(self, project_id: int, files: List[UploadedDocument]) -> List[Document]:
+        return [self.create_project_document(project_id, file) for file in files]
+
+    def update_project_document(self, document: Document, file: UploadedDocument):
+        del self.documents_by_filename[(document.project_id, document.filename)]
+        if file.filename is not None:
+            document.filename = file.filename
+        if file.content_type is not None:
+            document.file_type = file.content_type
+        self.documents_by_filename[(document.project_id, document.filename)] = document
+        self.contents[document.id] = file.content
+        document.version += 1
+        return document
+
+    def delete_project_document(self, document: Document):
+        del self.documents[document.id]
+        del self.documents_by_filename[(document.project_id, document.filename)]
+        del self.contents[document.id]
+
+    def get_document_path(self, document: Document) -> str:
+        return f"memory://documents/{document.project_id}/{document.filename}"
@@ -0,0 +1,106 @@
+import io
+import os
+import tarfile
+import zipfile
+import pytest
+from datetime import datetime
+from pathlib import Path
+import archive
+from archive import ArchiveEntry, iter_archive, stream_archive
+
+
+@pytest.fixture
+def entries(tmp_path: Path):
+    small = tmp_path / "small"
+    small.write_bytes(b"hello")
+    large = tmp_path / "large"
+    large.write_bytes(os.urandom(3 * 1024 * 1024 + 7))
+    return [
+        ArchiveEntry(name="small.txt", path=str(small), modified_at=datetime(2024, 1, 2, 3, 4, 6)),
+        ArchiveEntry(name="nested/large.bin", path=str(large)),
+        ArchiveEntry(name="gone.txt", path=str(tmp_path / "missing")),
+    ]
+
+
+class TestStreamArchive:
+    """
+    Unit tests for the stream_archive generator.
+    """
+
+    @pytest.mark.parametrize("compression", ["stored", "deflate"])
+    def test_zip_round_trip(self, entries, compression: str) -> None:
+        """
+        Test that the streamed zip can be read back and skips files missing from storage.
+        """
+        data = b"".join(stream_archive(entries, "zip", compression))
+
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        assert archive.namelist() == ["small.txt", "nested/large.bin"]
+        assert archive.testzip() is None
+        assert archive.read("small.txt") == b"hello"
+        assert archive.getinfo("small.txt").date_time == (2024, 1, 2, 3, 4, 6)
+
+    @pytest.mark.parametrize("compression", ["stored", "deflate"])
+    def test_tar_round_trip(self, entries, compression: str) -> None:
+        """
+        Test that the streamed tar can be read back by tarfile.
+        """
+        data = b"".join(stream_archive(entries, "tar", compression))
+
+        archive = tarfile.open(fileobj=io.BytesIO(data))
+        assert archive.getnames() == ["small.txt", "nested/large.bin"]
+        assert archive.extractfile("small.txt").read() == b"hello"
+        assert archive.extractfile("nested/large.bin").read() == Path(entries[1].path).read_bytes()
+
+    @pytest.mark.parametrize("format", ["zip", "tar"])
+    def test_chunks_stay_bounded(self, entries, format: str) -> None:
+        """
+        Test that no chunk is much larger than the read size, whatever the file size.
+        """
+        chunks = list(stream_archive(entries, format, "stored"))
+
+        assert len(chunks) > 3
+        assert max(len(chunk) for chunk in chunks) < 1024 * 1024 + 1024
+
+
+def zip_of(files) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as target:
+        for name, content in files:
+            target.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class TestIterArchive:
+    """
+    Unit tests for the iter_archive generator.
+    """
+
+    def test_reads_every_file(self) -> None:
+        """
+        Test that the files of an archive are yielded with their content.
+        """
+        files = [(name, source.read()) for name, source in iter_archive(zip_of([("a.txt", b"a"), ("b/c.txt", b"c")]))]
+
+        assert files == [("a.txt", b"a"), ("b/c.txt", b"c")]
+
+    def test_rejects_archive_expanding_beyond_ratio(self) -> None:
+        """
+        Test that a small, highly compressed archive is stopped once it expands too far.
+        """
+        bomb = zip_of([("zeros.bin", b"\0" * (8 * 1024 * 1024))])
+
+        with pytest.raises(ValueError):
+            for _, source in iter_archive(bomb):
+                while source.read(64 * 1024):
+                    pass
+
+    def test_rejects_too_many_files(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Test that archives with more files than allowed are refused.
+        """
+        monkeypatch.setattr(archive, "MAX_IMPORT_ENTRIES", 2)
+
+        with pytest.raises(ValueError):
+            list(iter_archive(zip_of([(f"{n}.txt", b"x") for n in range(3)])))
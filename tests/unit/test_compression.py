@@ -0,0 +1,109 @@
+import io
+import logging
+import random
+import pytest
+import compression
+from compression import StreamDecompressor, accepts_encoding, check_storage_compression, decompress_stream, iter_content_blocks, storage_encoding, supported_encodings, write_chunks
+
+
+class TestCompression:
+    """
+    Unit tests for the at-rest compression helpers.
+    """
+
+    @pytest.mark.parametrize("content_type, encoding", [
+        ("text/plain", "gzip"),
+        ("text/csv; charset=utf-8", "gzip"),
+        ("application/json", "gzip"),
+        ("application/vnd.api+json", "gzip"),
+        ("image/png", None),
+        ("application/octet-stream", None),
+        (None, None),
+    ])
+    def test_storage_encoding_depends_on_content_type(self, content_type, encoding) -> None:
+        """
+        Test that only compressible content types are compressed at rest.
+        """
+        assert storage_encoding(content_type) == encoding
+
+    def test_missing_zstandard_is_reported(self, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+        """
+        Test that zstd storage without the zstandard package falls back to gzip with a warning.
+        """
+        monkeypatch.setattr(compression, "STORAGE_COMPRESSION", "zstd")
+        monkeypatch.setattr(compression, "zstandard", None)
+
+        with caplog.at_level(logging.WARNING, logger="app"):
+            check_storage_compression()
+
+        assert storage_encoding("text/plain") == "gzip"
+        assert "zstandard" in caplog.text
+
+    @pytest.mark.parametrize("header, accepted", [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("identity", False),
+        (None, False),
+    ])
+    def test_accepts_encoding(self, header, accepted: bool) -> None:
+        """
+        Test that Accept-Encoding q-values are honoured.
+        """
+        assert accepts_encoding(header, "gzip") is accepted
+
+    def test_content_blocks_survive_an_insertion(self) -> None:
+        """
+        Test that content blocks rebuild the input within their size bounds, and that inserting a
+        byte near the start only changes the block around it.
+        """
+        original = random.Random(0).randbytes(256 * 1024)
+        edited = original[:100] + b"!" + original[100:]
+
+        blocks = list(iter_content_blocks([original[:5000], original[5000:]], 4096))
+        edited_blocks = list(iter_content_blocks([edited], 4096))
+
+        assert b"".join(blocks) == original
+        assert all(1024 <= len(block) <= 16 * 1024 for block in blocks[:-1])
+        assert len(blocks) > 16
+        assert len(set(edited_blocks) - set(blocks)) == 1
+
+    def test_gzip_round_trip_in_bounded_chunks(self) -> None:
+        """
+        Test that highly compressible data is written compressed and read back in bounded chunks.
+        """
+        original = b"0" * (5 * 1024 * 1024)
+        target = io.BytesIO()
+
+        size = write_chunks(target, [original[:1000], original[1000:]], "gzip")
+
+        assert size == len(original)
+        assert len(target.getvalue()) < len(original) // 100
+        target.seek(0)
+        chunks = list(decompress_stream(target, "gzip"))
+        assert b"".join(chunks) == original
+        assert max(len(chunk) for chunk in chunks) <= 1024 * 1024
+
+    @pytest.mark.parametrize("encoding", ["gzip", "zstd"])
+    def test_stream_decompressor_detects_truncated_input(self, encoding: str) -> None:
+        """
+        Test that input fed in pieces is decoded in bounded reads and a body cut short is reported.
+        """
+        if encoding not in supported_encodings():
+            pytest.skip(f"{encoding} is not available")
+        original = b"0123456789" * 100_000
+        target = io.BytesIO()
+        write_chunks(target, [original], encoding)
+        compressed = target.getvalue()
+
+        for body, truncated in ((compressed, False), (compressed[:len(compressed) // 2], True)):
+            decompressor = StreamDecompressor(encoding)
+            output = bytearray()
+            for start in range(0, len(body), 1000):
+                decompressor.feed(body[start:start + 1000])
+                while data := decompressor.read(64 * 1024):
+                    assert len(data) <= 64 * 1024
+                    output += data
+            assert decompressor.truncated() is truncated
+            assert original.startswith(output) and (truncated or output == original)
@@ -0,0 +1,93 @@
+import hashlib
+import io
+import struct
+import pytest
+import delta as delta_module
+from compression import read_chunks, write_chunks
+from delta import BaseReader, ChunkReader, apply_delta, signature, weak_checksum
+
+
+def copy(block: int, count: int) -> bytes:
+    return b"C" + struct.pack(">QI", block, count)
+
+
+def literal(data: bytes) -> bytes:
+    return b"L" + struct.pack(">I", len(data)) + data
+
+
+class TestDelta:
+    """
+    Unit tests for the delta signature and reconstruction helpers.
+    """
+
+    def test_signature_covers_every_block(self) -> None:
+        """
+        Test that the signature has one checksum pair per block, the last block shorter.
+        """
+        size, blocks = signature([b"aaaab", b"bbbcc"], 4)
+
+        assert size == 10
+        assert [block["weak"] for block in blocks] == [weak_checksum(b"aaaa"), weak_checksum(b"bbbb"), weak_checksum(b"cc")]
+        assert blocks[2]["strong"] == hashlib.sha256(b"cc").hexdigest()
+
+    @pytest.mark.parametrize("encoding", [None, "gzip"])
+    def test_apply_delta_rebuilds_from_blocks_and_literals(self, tmp_path, encoding) -> None:
+        """
+        Test that copies (also backwards, from compressed files) and literals rebuild the content.
+        """
+        path = tmp_path / "base"
+        with open(path, "wb") as target:
+            write_chunks(target, [b"aaaabbbbcccc"], encoding)
+        expected = b"ccccXYaaaabbbb"
+        delta = io.BytesIO(copy(2, 1) + literal(b"XY") + copy(0, 2))
+
+        with BaseReader(str(path), encoding) as base:
+            result = ChunkReader(apply_delta(delta, base, 4, hashlib.sha256(expected).hexdigest())).read()
+
+        assert result == expected
+
+    def test_backward_copies_decompress_the_base_once(self, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Test that copying the blocks of a compressed base in reverse order reads it only once.
+        """
+        path = tmp_path / "base"
+        content = bytes(range(256)) * 64
+        with open(path, "wb") as target:
+            write_chunks(target, [content], "gzip")
+        blocks = [content[n:n + 256] for n in range(0, len(content), 256)]
+        expected = b"".join(reversed(blocks))
+        delta = io.BytesIO(b"".join(copy(index, 1) for index in reversed(range(len(blocks)))))
+        opened = []
+
+        def counting_read_chunks(*args):
+            opened.append(args)
+            return read_chunks(*args)
+
+        monkeypatch.setattr(delta_module, "read_chunks", counting_read_chunks)
+
+        with BaseReader(str(path), "gzip") as base:
+            result = ChunkReader(apply_delta(delta, base, 256, hashlib.sha256(expected).hexdigest())).read()
+
+        assert result == expected
+        assert len(opened) == 1
+
+    def test_apply_delta_rejects_a_wrong_result(self, tmp_path) -> None:
+        """
+        Test that a result not matching the expected sha256 fails once the delta is consumed.
+        """
+        path = tmp_path / "base"
+        path.write_bytes(b"aaaabbbb")
+
+        with BaseReader(str(path)) as base, pytest.raises(ValueError):
+            list(apply_delta(io.BytesIO(copy(0, 2)), base, 4, hashlib.sha256(b"other").hexdigest()))
+
+    @pytest.mark.parametrize("delta", [copy(5, 1), b"C\x00", literal(b"abc")[:-1], b"X"])
+    def test_apply_delta_rejects_malformed_deltas(self, tmp_path, delta) -> None:
+        """
+        Test that copies past the end, truncated instructions and unknown instructions fail.
+        """
+        path = tmp_path / "base"
+        path.write_bytes(b"aaaabbbb")
+
+        with BaseReader(str(path)) as base, pytest.raises(ValueError):
+            list(apply_delta(io.BytesIO(delta), base, 4, "0" * 64))
@@ -1,8 +1,10 @@
+import io
+import zipfile
 import pytest
 from unittest.mock import Mock
 from models.enums.role import Role
 from services import DocumentService
-from factories import make_document, make_project, make_user
+from factories import make_document, make_project, make_uploaded_document, make_user
 from schemas import UploadedDocument
 
 
@@ -35,6 +37,40 @@ class TestDocumentService:
         document_repo_mock.create_project_document.assert_called_once_with(project.id, document_data)
         assert result is document
     
+    def test_create_documents_for_project_skips_duplicates(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that a batch upload stores only new filenames and reports every file
+        """
+        user = make_user()
+        project = make_project()
+        files = [
+            make_uploaded_document(filename="a.txt"),
+            make_uploaded_document(filename="existing.txt"),
+            make_uploaded_document(filename="a.txt"),
+            make_uploaded_document(filename="b.txt"),
+        ]
+        documents = [make_document(id=1, filename="a.txt"), make_document(id=2, filename="b.txt")]
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_repo_mock.get_existing_filenames.return_value = {"existing.txt"}
+        document_repo_mock.create_project_documents.return_value = documents
+
+        result = document_service.create_documents_for_project(project.id, files, user)
+
+        document_repo_mock.get_existing_filenames.assert_called_once_with(
+            project.id, ["a.txt", "existing.txt", "a.txt", "b.txt"])
+        document_repo_mock.create_project_documents.assert_called_once_with(project.id, [files[0], files[3]])
+        assert result == [
+            {"filename": "a.txt", "status": "created", "document": documents[0]},
+            {"filename": "existing.txt", "status": "duplicate"},
+            {"filename": "a.txt", "status": "duplicate"},
+            {"filename": "b.txt", "status": "created", "document": documents[1]},
+        ]
+
     def test_create_document_for_project_not_found(
         self,
         project_service_mock: Mock,
@@ -112,9 +148,121 @@ class TestDocumentService:
         result = document_service.get_documents_of_project(project.id, user)
 
         project_service_mock.get_project_and_check_permission.assert_called_once_with(project.id, user, Role.participant)
-        document_repo_mock.get_documents_of_project.assert_called_once_with(project)
+        document_repo_mock.get_documents_of_project.assert_called_once_with(project, None)
+        assert result == documents
+
+    def test_search_documents(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that search returns the page of ranked matches with the total count.
+        """
+        user = make_user()
+        project = make_project()
+        document = make_document()
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_repo_mock.search_documents.return_value = (11, [(document, 0.5)])
+
+        result = document_service.search_documents(project.id, user, "quarterly report", 10, 10)
+
+        project_service_mock.get_project_and_check_permission.assert_called_once_with(project.id, user, Role.participant)
+        document_repo_mock.search_documents.assert_called_once_with(project, "quarterly report", 10, 10)
+        assert result == {"total": 11, "limit": 10, "offset": 10, "results": [{"document": document, "rank": 0.5}]}
+
+    def test_search_documents_rejects_blank_query(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that a query of only whitespace raises a ValueError without searching.
+        """
+        user = make_user()
+        project = make_project()
+        project_service_mock.get_project_and_check_permission.return_value = project
+
+        with pytest.raises(ValueError):
+            document_service.search_documents(project.id, user, "   ", 20, 0)
+
+        document_repo_mock.search_documents.assert_not_called()
+
+    def test_stream_documents_of_project_checks_permission_first(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that streaming is refused before the repository is queried when access is denied.
+        """
+        user = make_user()
+        project = make_project()
+        project_service_mock.get_project_and_check_permission.side_effect = PermissionError
+
+        with pytest.raises(PermissionError):
+            document_service.stream_documents_of_project(project.id, user)
+
+        document_repo_mock.stream_documents_of_project.assert_not_called()
+
+    def test_get_documents_for_archive_applies_filters(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that the archive selection is filtered by ids and type in the repository.
+        """
+        user = make_user()
+        project = make_project()
+        documents = [make_document()]
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_repo_mock.filter_documents_of_project.return_value = documents
+
+        result = document_service.get_documents_for_archive(project.id, user, [1, 2], "text/plain")
+
+        project_service_mock.get_project_and_check_permission.assert_called_once_with(project.id, user, Role.participant)
+        document_repo_mock.filter_documents_of_project.assert_called_once_with(project, [1, 2], "text/plain")
         assert result == documents
 
+    def test_import_documents_for_project_flattens_and_skips_existing(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that archive entries are stored under their base name and known names are skipped.
+        """
+        user = make_user()
+        project = make_project()
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("docs/readme.md", "# readme")
+            archive.writestr("existing.txt", "old")
+            archive.writestr("other/readme.md", "# again")
+        imported = []
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_repo_mock.get_filenames_of_project.return_value = {"existing.txt"}
+        document_repo_mock.import_project_documents.side_effect = lambda project_id, files: len(
+            [imported.append((file.filename, file.content_type, file.stream.read())) for file in files])
+
+        result = document_service.import_documents_for_project(
+            project.id, UploadedDocument(filename="a.zip", content_type="application/zip", stream=buffer), user)
+
+        assert imported == [("readme.md", "text/markdown", b"# readme")]
+        assert result == {
+            "imported": 1,
+            "skipped": [
+                {"filename": "existing.txt", "reason": "duplicate"},
+                {"filename": "other/readme.md", "reason": "duplicate"},
+            ]
+        }
+
     def test_get_documents_of_project_not_found(
         self,
         project_service_mock: Mock,
@@ -230,7 +378,7 @@ class TestDocumentService:
         result = document_service.update_document_for_project(project.id, document.id, document_data, user)
 
         project_service_mock.get_project_and_check_permission.assert_called_once_with(project.id, user, Role.participant)
-        document_repo_mock.get_project_document_by_id.assert_called_once_with(project.id, document.id)
+        document_repo_mock.get_project_document_by_id.assert_called_once_with(project.id, document.id, lock=True)
         document_repo_mock.get_project_document_by_filename.assert_called_once_with(project.id, document.filename)
         document_repo_mock.update_project_document.assert_called_once_with(document, document_data)
         assert result is document
@@ -315,7 +463,7 @@ class TestDocumentService:
         result = document_service.delete_project_document(project.id, document.id, user)
 
         project_service_mock.get_project_and_check_permission.assert_called_once_with(project.id, user, Role.participant)
-        document_repo_mock.get_project_document_by_id.assert_called_once_with(project.id, document.id)
+        document_repo_mock.get_project_document_by_id.assert_called_once_with(project.id, document.id, lock=True)
         document_repo_mock.delete_project_document.assert_called_once_with(document)
         assert result is None
     
@@ -377,3 +525,62 @@ class TestDocumentService:
 
         document_repo_mock.delete_project_document.assert_not_called()
 
+
+    def test_get_document_version_not_found(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that it raises an Error if the document has no such version.
+        """
+        user = make_user()
+        project = make_project()
+        document = make_document()
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_repo_mock.get_project_document_by_id.return_value = document
+        document_repo_mock.get_version.return_value = None
+
+        with pytest.raises(LookupError):
+            document_service.get_document_version(project.id, document.id, 7, user)
+
+        document_repo_mock.get_version.assert_called_once_with(document, 7)
+        document_repo_mock.read_version.assert_not_called()
+
+    def test_get_changes_pages_after_cursor(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that one more change than requested is read to tell whether more are waiting.
+        """
+        user = make_user()
+        project = make_project()
+        changes = [Mock(seq=seq) for seq in (4, 5, 6)]
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_repo_mock.get_change_cursor.return_value = 9
+        document_repo_mock.get_changes.return_value = changes
+
+        result = document_service.get_changes(project.id, user, 3, 2)
+
+        document_repo_mock.get_changes.assert_called_once_with(project.id, 3, 3)
+        assert result == {"changes": changes[:2], "cursor": 5, "has_more": True}
+
+    def test_get_changes_after_pruned_cursor(
+        self,
+        project_service_mock: Mock,
+        document_repo_mock: Mock,
+        document_service: DocumentService
+    ) -> None:
+        """
+        Test that it raises an Error if the changes right after the cursor are gone.
+        """
+        project_service_mock.get_project_and_check_permission.return_value = make_project()
+        document_repo_mock.get_change_cursor.return_value = 9
+        document_repo_mock.get_changes.return_value = [Mock(seq=7)]
+
+        with pytest.raises(RuntimeError):
+            document_service.get_changes(1, make_user(), 3, 10)
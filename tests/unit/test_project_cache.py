@@ -0,0 +1,101 @@
+from cache import ProjectCache
+from models.enums import Role
+
+
+def active_cache(**kwargs) -> ProjectCache:
+    cache = ProjectCache(**kwargs)
+    cache.activate()
+    return cache
+
+
+class TestProjectCache:
+    """
+    Unit tests for the ProjectCache class.
+    """
+
+    def test_returns_stored_project(self) -> None:
+        """
+        Test that a stored project snapshot is returned on the next lookup.
+        """
+        cache = active_cache(max_size=10, ttl=60)
+
+        cache.set_project(1, {"id": 1, "name": "cached"}, cache.version)
+
+        assert cache.get_project(1) == {"id": 1, "name": "cached"}
+
+    def test_evicts_least_recently_used_project(self) -> None:
+        """
+        Test that the least recently used project is evicted once the cache is full.
+        """
+        cache = active_cache(max_size=2, ttl=60)
+        cache.set_project(1, {"id": 1}, cache.version)
+        cache.set_project(2, {"id": 2}, cache.version)
+        cache.get_project(1)
+
+        cache.set_project(3, {"id": 3}, cache.version)
+
+        assert cache.get_project(1) is not None
+        assert cache.get_project(2) is None
+        assert cache.get_project(3) is not None
+
+    def test_expired_project_is_a_miss(self) -> None:
+        """
+        Test that an entry older than the ttl is not served.
+        """
+        cache = active_cache(max_size=10, ttl=-1)
+
+        cache.set_project(1, {"id": 1}, cache.version)
+
+        assert cache.get_project(1) is None
+
+    def test_ignores_rows_read_before_an_invalidation(self) -> None:
+        """
+        Test that a row read before a concurrent invalidation is not stored.
+        """
+        cache = active_cache(max_size=10, ttl=60)
+        version = cache.version
+
+        cache.invalidate(1)
+        cache.set_project(1, {"id": 1, "name": "stale"}, version)
+
+        assert cache.get_project(1) is None
+
+    def test_caches_roles_including_non_membership(self) -> None:
+        """
+        Test that both a member's role and a known non-member are cached per project.
+        """
+        cache = active_cache(max_size=10, ttl=60)
+        cache.set_project(1, {"id": 1}, cache.version)
+
+        cache.set_role(1, 10, Role.admin, cache.version)
+        cache.set_role(1, 11, None, cache.version)
+
+        assert cache.get_role(1, 10) == (True, Role.admin)
+        assert cache.get_role(1, 11) == (True, None)
+        assert cache.get_role(1, 12) == (False, None)
+
+    def test_invalidate_drops_project_and_roles(self) -> None:
+        """
+        Test that invalidating a project also forgets its membership roles.
+        """
+        cache = active_cache(max_size=10, ttl=60)
+        cache.set_project(1, {"id": 1}, cache.version)
+        cache.set_role(1, 10, Role.participant, cache.version)
+
+        cache.invalidate(1)
+
+        assert cache.get_project(1) is None
+        assert cache.get_role(1, 10) == (False, None)
+
+    def test_inactive_cache_never_serves(self) -> None:
+        """
+        Test that nothing is cached while no listener delivers invalidations.
+        """
+        cache = active_cache(max_size=10, ttl=60)
+        cache.set_project(1, {"id": 1}, cache.version)
+
+        cache.deactivate()
+        cache.set_project(2, {"id": 2}, cache.version)
+
+        assert cache.get_project(1) is None
+        assert cache.get_project(2) is None
@@ -3,7 +3,7 @@ from unittest.mock import Mock
 from models.enums.role import Role
 from services import ProjectService
 from factories import make_project, make_user
-from schemas import CreateProjectRequest
+from schemas import BulkParticipantsRequest, CreateProjectRequest
 
 
 class TestProjectService:
@@ -44,9 +44,56 @@ class TestProjectService:
 
         result = project_service.get_user_projects(user)
 
-        project_repo_mock.get_user_projects.assert_called_once_with(user)
+        project_repo_mock.get_user_projects.assert_called_once_with(user, None)
         assert result == [project, project2]
 
+    def test_get_project_summaries(
+        self,
+        project_repo_mock: Mock,
+        project_service: ProjectService
+    ) -> None:
+        """
+        Testing that the dashboard summary page is read from the repository in one call.
+        """
+        user = make_user()
+        summaries = [Mock()]
+        project_repo_mock.get_user_project_summaries.return_value = summaries
+
+        result = project_service.get_project_summaries(user, 50, 100)
+
+        project_repo_mock.get_user_project_summaries.assert_called_once_with(user, 50, 100)
+        assert result is summaries
+
+    def test_search_user_projects_strips_query(
+        self,
+        project_repo_mock: Mock,
+        project_service: ProjectService
+    ) -> None:
+        """
+        Testing that the search query is trimmed before it reaches the repository.
+        """
+        user = make_user()
+        project = make_project()
+        project_repo_mock.search_user_projects.return_value = [project]
+
+        result = project_service.search_user_projects(user, "  test ", 20, 0)
+
+        project_repo_mock.search_user_projects.assert_called_once_with(user, "test", 20, 0, None)
+        assert result == [project]
+
+    def test_search_user_projects_rejects_blank_query(
+        self,
+        project_repo_mock: Mock,
+        project_service: ProjectService
+    ) -> None:
+        """
+        Testing that a query of only whitespace raises a ValueError.
+        """
+        with pytest.raises(ValueError):
+            project_service.search_user_projects(make_user(), "   ", 20, 0)
+
+        project_repo_mock.search_user_projects.assert_not_called()
+
     def test_get_project_for_user_success(
         self,
         project_repo_mock: Mock,
@@ -325,6 +372,76 @@ class TestProjectService:
 
         project_repo_mock.add_participant.assert_not_called()
 
+    def test_bulk_add_participants_reports_per_user_outcomes(
+        self,
+        project_repo_mock: Mock,
+        user_repo_mock: Mock,
+        project_service: ProjectService,
+    ) -> None:
+        """
+        Testing that bulk add resolves ids and usernames in one lookup and reports each outcome
+        """
+        user = make_user()
+        project = make_project()
+        project_repo_mock.get_by_id.return_value = project
+        project_repo_mock.is_user_admin.return_value = True
+        user_repo_mock.find_by_ids_or_usernames.return_value = [(2, "new"), (3, "member")]
+        project_repo_mock.add_participants.return_value = {2}
+        request = BulkParticipantsRequest(user_ids=[2, 99], usernames=["member"])
+
+        result = project_service.bulk_update_participants(project.id, request, user)
+
+        user_repo_mock.find_by_ids_or_usernames.assert_called_once_with([2, 99], ["member"])
+        project_repo_mock.add_participants.assert_called_once_with(project, [2, 3])
+        assert result == [
+            {"user_id": 2, "status": "added"},
+            {"user_id": None, "status": "not_found"},
+            {"username": "member", "user_id": 3, "status": "already_participant"},
+        ]
+
+    def test_bulk_remove_participants_keeps_admins(
+        self,
+        project_repo_mock: Mock,
+        user_repo_mock: Mock,
+        project_service: ProjectService,
+    ) -> None:
+        """
+        Testing that bulk remove reports admins and non-members instead of removing them
+        """
+        user = make_user()
+        project = make_project()
+        project_repo_mock.get_by_id.return_value = project
+        project_repo_mock.is_user_admin.return_value = True
+        user_repo_mock.find_by_ids_or_usernames.return_value = [(1, "testuser"), (2, "participant"), (3, "outsider")]
+        project_repo_mock.get_roles.return_value = {1: Role.admin, 2: Role.participant}
+        project_repo_mock.remove_participants.return_value = {2}
+        request = BulkParticipantsRequest(action="remove", user_ids=[1, 2, 3])
+
+        result = project_service.bulk_update_participants(project.id, request, user)
+
+        project_repo_mock.remove_participants.assert_called_once_with(project, [1, 2, 3])
+        assert [outcome["status"] for outcome in result] == ["is_admin", "removed", "not_participant"]
+
+    def test_bulk_update_participants_permission_denied(
+        self,
+        project_repo_mock: Mock,
+        user_repo_mock: Mock,
+        project_service: ProjectService,
+    ) -> None:
+        """
+        Testing that it raises an Error if user doesn't have permission
+        """
+        user = make_user()
+        project = make_project()
+        project_repo_mock.get_by_id.return_value = project
+        project_repo_mock.is_user_admin.return_value = False
+
+        with pytest.raises(PermissionError):
+            project_service.bulk_update_participants(project.id, BulkParticipantsRequest(user_ids=[2]), user)
+
+        user_repo_mock.find_by_ids_or_usernames.assert_not_called()
+        project_repo_mock.add_participants.assert_not_called()
+
     def test_get_project_and_check_permission_participant_success(
         self,
         project_repo_mock: Mock,
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+import anyio.to_thread
+import pytest
+from starlette.concurrency import run_in_threadpool
+from profiling import Profile, ProfileStore, SamplingProfiler, current_profiler, instrument_threadpool, new_profile, profile_thread
+
+
+def busy_wait(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler:
+    """
+    Unit tests for the SamplingProfiler class.
+    """
+
+    def test_records_stacks_of_busy_thread(self) -> None:
+        """
+        Test that the stack of a busy function is sampled in collapsed format.
+        """
+        profiler = SamplingProfiler(interval=0.001)
+
+        profiler.start()
+        with profiler.attach_thread():
+            busy_wait(0.05)
+        stacks = profiler.stop()
+
+        assert any(stack.endswith("test_sampling_profiler.py:busy_wait") for stack in stacks)
+
+    def test_ignores_threads_of_other_work(self) -> None:
+        """
+        Test that threads not attached to the profiler, e.g. serving other requests, are not sampled.
+        """
+        profiler = SamplingProfiler(interval=0.001)
+        other = threading.Thread(target=busy_wait, args=(0.05,))
+
+        profiler.start()
+        other.start()
+        other.join()
+        stacks = profiler.stop()
+
+        assert not stacks
+
+    def test_samples_event_loop_only_for_own_tasks(self) -> None:
+        """
+        Test that the event loop thread is sampled while it runs the profiled task, not other tasks.
+        """
+        async def own_request() -> None:
+            busy_wait(0.05)
+            await asyncio.sleep(0)
+
+        async def other_request() -> None:
+            busy_wait(0.05)
+
+        async def main() -> SamplingProfiler:
+            profiler = SamplingProfiler(interval=0.001, loop=asyncio.get_running_loop())
+            own = asyncio.create_task(own_request())
+            profiler.add_task(own)
+            profiler.start()
+            await asyncio.gather(own, asyncio.create_task(other_request()))
+            return profiler
+
+        stacks = asyncio.run(main()).stop()
+
+        assert any("own_request" in stack for stack in stacks)
+        assert not any("other_request" in stack for stack in stacks)
+
+    def test_profile_thread_attaches_to_the_current_profiler(self) -> None:
+        """
+        Test that work handed to another thread is sampled once the thread attaches itself.
+        """
+        profiler = SamplingProfiler(interval=0.001)
+        token = current_profiler.set(profiler)
+        try:
+            profiler.start()
+            with profile_thread():
+                busy_wait(0.05)
+            stacks = profiler.stop()
+        finally:
+            current_profiler.reset(token)
+
+        assert any(stack.endswith("test_sampling_profiler.py:busy_wait") for stack in stacks)
+
+    def test_instrumented_threadpool_samples_work_of_the_profiled_request(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Test that work Starlette hands to the threadpool itself, like sync dependencies, is sampled.
+        """
+        monkeypatch.setattr(anyio.to_thread, "run_sync", anyio.to_thread.run_sync)
+        instrument_threadpool()
+
+        async def main() -> SamplingProfiler:
+            profiler = SamplingProfiler(interval=0.001)
+            profiler.start()
+            token = current_profiler.set(profiler)
+            try:
+                await run_in_threadpool(busy_wait, 0.05)
+            finally:
+                current_profiler.reset(token)
+            # Work of requests that are not profiled stays out of the profile.
+            await run_in_threadpool(other_work, 0.05)
+            return profiler
+
+        def other_work(seconds: float) -> None:
+            busy_wait(seconds)
+
+        stacks = asyncio.run(main()).stop()
+
+        assert any(stack.endswith("test_sampling_profiler.py:busy_wait") for stack in stacks)
+        assert not any("other_work" in stack for stack in stacks)
+
+
+class TestProfileStore:
+    """
+    Unit tests for the ProfileStore class.
+    """
+
+    def test_keeps_only_the_most_recent_profiles(self) -> None:
+        """
+        Test that the oldest profile is evicted once the store is full.
+        """
+        store = ProfileStore(max_size=2)
+        profiles = [new_profile("GET", f"/projects/{n}") for n in range(3)]
+
+        for profile in profiles:
+            store.add(profile)
+
+        assert store.get(profiles[0].id) is None
+        assert [profile.id for profile in store.list()] == [profiles[2].id, profiles[1].id]
+
+    def test_collapsed_output(self) -> None:
+        """
+        Test that stacks are rendered as 'frame;frame count' lines, most frequent first.
+        """
+        profile: Profile = new_profile("GET", "/projects")
+        profile.stacks.update({"main.py:a;service.py:b": 1, "main.py:a": 3})
+
+        assert profile.collapsed() == "main.py:a 3\nmain.py:a;service.py:b 1"
+        assert profile.samples == 4
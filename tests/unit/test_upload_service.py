@@ -0,0 +1,160 @@
+import io
+import pytest
+from unittest.mock import ANY, Mock
+from models.enums.role import Role
+from services import UploadService
+from factories import make_document, make_project, make_upload_session, make_user
+from schemas import CreateUploadSessionRequest
+from quotas import QuotaExceededError
+
+
+class TestUploadService:
+    """
+    Unit tests for the UploadService class.
+    """
+
+    def test_create_session(
+        self,
+        project_service_mock: Mock,
+        upload_repo_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that a session is created for a project the user takes part in.
+        """
+        user = make_user()
+        project = make_project()
+        upload_session = make_upload_session()
+        project_service_mock.get_project_and_check_permission.return_value = project
+        upload_repo_mock.create_session.return_value = upload_session
+        upload_data = CreateUploadSessionRequest(filename="large.bin", length=100)
+
+        result = upload_service.create_session(project.id, upload_data, user)
+
+        project_service_mock.get_project_and_check_permission.assert_called_once_with(project.id, user, Role.participant)
+        upload_repo_mock.create_session.assert_called_once_with(project.id, user.id, "large.bin", "application/octet-stream", 100)
+        assert result is upload_session
+
+    def test_create_session_over_quota_is_rejected(
+        self,
+        project_service_mock: Mock,
+        document_service_mock: Mock,
+        upload_repo_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that an upload that would not fit the storage quota is refused before it starts.
+        """
+        project = make_project()
+        project_service_mock.get_project_and_check_permission.return_value = project
+        document_service_mock.check_quota.side_effect = QuotaExceededError("Projects are limited to 10 bytes")
+
+        with pytest.raises(QuotaExceededError):
+            upload_service.create_session(project.id, CreateUploadSessionRequest(filename="large.bin", length=100), make_user())
+
+        document_service_mock.check_quota.assert_called_once_with(project.id, 100)
+        upload_repo_mock.create_session.assert_not_called()
+
+    def test_get_session_of_another_user_is_denied(
+        self,
+        upload_repo_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that only the user who started an upload can continue it.
+        """
+        upload_repo_mock.get_active_session.return_value = make_upload_session(user_id=2)
+
+        with pytest.raises(PermissionError):
+            upload_service.get_session(1, "a" * 32, make_user(id=1))
+
+    def test_get_session_of_another_project_is_not_found(
+        self,
+        upload_repo_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that an upload is only reachable through the project it belongs to.
+        """
+        upload_repo_mock.get_active_session.return_value = make_upload_session(project_id=2)
+
+        with pytest.raises(LookupError):
+            upload_service.get_session(1, "a" * 32, make_user())
+
+    def test_write_chunk_outside_of_upload_is_rejected(
+        self,
+        upload_repo_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that a chunk ending past the declared length is not written.
+        """
+        upload_repo_mock.get_active_session.return_value = make_upload_session(length=10)
+
+        with pytest.raises(ValueError):
+            upload_service.write_chunk(1, "a" * 32, 8, io.BytesIO(b"abc"), make_user())
+
+        upload_repo_mock.write_chunk.assert_not_called()
+
+    @pytest.mark.parametrize("ranges, offset", [
+        ([], 0),
+        ([(0, 40)], 40),
+        ([(0, 40), (60, 100)], 40),
+        ([(20, 100)], 0),
+    ])
+    def test_get_offset_is_end_of_contiguous_prefix(
+        self,
+        upload_repo_mock: Mock,
+        upload_service: UploadService,
+        ranges,
+        offset: int
+    ) -> None:
+        """
+        Test that the offset ignores chunks received after a gap.
+        """
+        upload_repo_mock.get_received_ranges.return_value = ranges
+
+        assert upload_service.get_offset(make_upload_session()) == offset
+
+    def test_finalize_creates_document_from_staging_file(
+        self,
+        upload_repo_mock: Mock,
+        document_service_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that a complete upload becomes a document and its session is removed.
+        """
+        user = make_user()
+        upload_session = make_upload_session(length=3)
+        document = make_document()
+        upload_repo_mock.get_active_session.return_value = upload_session
+        upload_repo_mock.get_received_ranges.return_value = [(0, 3)]
+        upload_repo_mock.open_staging_file.return_value = io.BytesIO(b"abc")
+        document_service_mock.create_document_for_project.return_value = document
+
+        result = upload_service.finalize(1, upload_session.id, user)
+
+        document_service_mock.create_document_for_project.assert_called_once_with(1, ANY, user)
+        uploaded = document_service_mock.create_document_for_project.call_args.args[1]
+        assert uploaded.filename == "large.bin"
+        upload_repo_mock.delete_session.assert_called_once_with(upload_session)
+        assert result is document
+
+    def test_finalize_incomplete_upload_fails(
+        self,
+        upload_repo_mock: Mock,
+        document_service_mock: Mock,
+        upload_service: UploadService
+    ) -> None:
+        """
+        Test that an upload with missing bytes cannot be finalized.
+        """
+        upload_repo_mock.get_active_session.return_value = make_upload_session(length=100)
+        upload_repo_mock.get_received_ranges.return_value = [(0, 50)]
+
+        with pytest.raises(RuntimeError):
+            upload_service.finalize(1, "a" * 32, make_user())
+
+        document_service_mock.create_document_for_project.assert_not_called()
+        upload_repo_mock.delete_session.assert_not_called()
@@ -55,4 +55,37 @@ class TestUserService:
 
         user_repo_mock.get_by_username.assert_called_once_with(user_data.username)
         mock_hash_password.assert_not_called() 
-        user_repo_mock.create.assert_not_called()
\ No newline at end of file
+        user_repo_mock.create.assert_not_called()
+
+    def test_search_users(
+        self,
+        user_repo_mock: Mock,
+        user_service: UserService
+    ) -> None:
+        """
+        Test that prefix search returns id and username of each match.
+        """
+        user_repo_mock.search_by_username_prefix.return_value = [(1, "alice"), (2, "alicia")]
+
+        result = user_service.search_users(" ali", 20, 0)
+
+        user_repo_mock.search_by_username_prefix.assert_called_once_with("ali", 20, 0)
+        assert result == [{"id": 1, "username": "alice"}, {"id": 2, "username": "alicia"}]
+
+    def test_resolve_usernames(
+        self,
+        user_repo_mock: Mock,
+        user_service: UserService
+    ) -> None:
+        """
+        Test that usernames resolve in request order, once each, with unknown names reported.
+        """
+        user_repo_mock.find_by_ids_or_usernames.return_value = [(7, "bob"), (3, "alice")]
+
+        result = user_service.resolve_usernames(["alice", "ghost", "bob", "alice"])
+
+        user_repo_mock.find_by_ids_or_usernames.assert_called_once_with([], ["alice", "ghost", "bob"])
+        assert result == {
+            "users": [{"id": 3, "username": "alice"}, {"id": 7, "username": "bob"}],
+            "not_found": ["ghost"]
+        }